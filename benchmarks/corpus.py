@@ -0,0 +1,133 @@
+"""A local HTTP server with a synthetic corpus of news articles.
+
+The articles are generated from their number, so the same URL always returns the same page.
+The server listens on several loopback addresses (127.0.0.1, 127.0.0.2, ...), so the
+articles are spread over several hosts as on the real websites.
+
+    python benchmarks/corpus.py --hosts 16 --latency 0.05 --error-rate 0.01
+"""
+
+import asyncio
+import random
+
+import typer
+from aiohttp import web
+
+TOPICS: dict[str, list[str]] = {
+    "Economy": ["inflation", "markets", "growth", "trade", "budget", "employment"],
+    "Politics": ["election", "parliament", "government", "policy", "vote", "minister"],
+    "Technology": ["software", "chips", "startup", "internet", "robots", "data"],
+    "Climate": ["emissions", "weather", "energy", "drought", "renewables", "carbon"],
+    "Health": ["hospital", "vaccine", "research", "patients", "doctors", "disease"],
+    "Sports": ["championship", "team", "coach", "season", "tournament", "players"],
+    "Science": ["telescope", "physics", "discovery", "laboratory", "genome", "space"],
+    "Culture": ["festival", "museum", "film", "music", "literature", "theatre"],
+}
+
+FILLER = (
+    "the a report said officials on monday after new week analysts expected further "
+    "changes while residents and experts across the region described the situation "
+    "as part of a broader trend that has been developing over the past several years"
+)
+WORDS = FILLER.split()
+
+
+def article_topics(number: int) -> list[str]:
+    """Return the topics of the article: one or two of the known ones."""
+    names = list(TOPICS)
+    first = names[number % len(names)]
+    second = names[(number // len(names)) % len(names)]
+    return [first] if first == second else [first, second]
+
+
+def article_html(number: int, paragraphs: int) -> str:
+    rng = random.Random(number)
+    topics = article_topics(number)
+    keywords = [word for topic in topics for word in TOPICS[topic]]
+
+    title = f"{' '.join(rng.sample(keywords, 3)).capitalize()}: article {number}"
+    body = "".join(
+        "<p>"
+        + " ".join(
+            rng.choice(keywords) if rng.random() < 0.3 else rng.choice(WORDS)
+            for _ in range(rng.randint(40, 80))
+        ).capitalize()
+        + ".</p>"
+        for _ in range(paragraphs)
+    )
+
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>{title}</title>"
+        f'<meta name="author" content="Reporter {number % 97}">'
+        f'<meta name="description" content="{title}">'
+        '<meta charset="utf-8">'
+        "</head><body><nav><a href='/'>Home</a></nav>"
+        f"<article><h1>{title}</h1>{body}</article>"
+        "<footer>Copyright Benchmark News</footer></body></html>"
+    )
+
+
+def create_app(
+    latency: float, jitter: float, error_rate: float, paragraphs: int
+) -> web.Application:
+    async def article(request: web.Request) -> web.Response:
+        number = int(request.match_info["number"])
+
+        await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+
+        if random.random() < error_rate:
+            return web.Response(status=503, headers={"Retry-After": "0.1"})
+
+        etag = f'"article-{number}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+
+        return web.Response(
+            text=article_html(number, paragraphs),
+            content_type="text/html",
+            charset="utf-8",
+            headers={"ETag": etag},
+        )
+
+    app = web.Application()
+    app.router.add_get("/articles/{number:\\d+}.html", article)
+    return app
+
+
+def urls(count: int, port: int, hosts: int) -> list[str]:
+    """Return the URLs of the first `count` articles, spread over the hosts."""
+    return [
+        f"http://127.0.0.{number % hosts + 1}:{port}/articles/{number}.html"
+        for number in range(count)
+    ]
+
+
+async def serve(app: web.Application, port: int, hosts: int) -> None:
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+
+    for host in range(1, hosts + 1):
+        await web.TCPSite(runner, f"127.0.0.{host}", port).start()
+
+    print(f"Serving the corpus on 127.0.0.1-{hosts}:{port}", flush=True)
+    await asyncio.Event().wait()
+
+
+def main(
+    port: int = typer.Option(8701, help="The port to listen on."),
+    hosts: int = typer.Option(
+        16, help="The number of loopback addresses to listen on.", min=1, max=254
+    ),
+    latency: float = typer.Option(0.05, help="The mean response delay (seconds)."),
+    jitter: float = typer.Option(0.02, help="The maximum deviation of the delay."),
+    error_rate: float = typer.Option(
+        0.0, help="The share of the responses failed with 503."
+    ),
+    paragraphs: int = typer.Option(12, help="The number of paragraphs per article."),
+):
+    asyncio.run(serve(create_app(latency, jitter, error_rate, paragraphs), port, hosts))
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,142 @@
+"""A fake OpenAI-compatible server for the benchmarks.
+
+`/v1/chat/completions` returns a valid `ArticleSummarization` JSON after a configurable delay:
+the summary is the beginning of the article and the topics are the corpus topics
+whose keywords appear in the prompt. `/v1/embeddings` returns deterministic hashed bag-of-words
+vectors, so the `openai` embeddings backend works without downloading a model.
+
+    python benchmarks/fake_llm.py --delay 0.5 --error-rate 0.02
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import re
+import time
+
+import numpy as np
+import typer
+from aiohttp import web
+from corpus import TOPICS
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def summarize(prompt: str) -> dict:
+    words = set(WORD_PATTERN.findall(prompt.lower()))
+    topics = [
+        topic for topic, keywords in TOPICS.items() if words.intersection(keywords)
+    ]
+
+    # The article content is at the end of the prompt.
+    summary = " ".join(prompt.split()[-60:])[:400]
+    return {"summary": summary, "topics": topics or ["General"]}
+
+
+def embed(text: str, dimensions: int) -> np.ndarray:
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for word in WORD_PATTERN.findall(text.lower()):
+        vector[
+            int.from_bytes(hashlib.md5(word.encode()).digest()[:4]) % dimensions
+        ] += 1
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector + 1 / np.sqrt(dimensions)
+
+
+def create_app(
+    delay: float, jitter: float, error_rate: float, dimensions: int
+) -> web.Application:
+    async def chat(request: web.Request) -> web.Response:
+        data = await request.json()
+
+        await asyncio.sleep(max(0.0, delay + random.uniform(-jitter, jitter)))
+
+        if random.random() < error_rate:
+            return web.json_response(
+                {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                status=429,
+                headers={"Retry-After": "0.5"},
+            )
+
+        prompt = "\n".join(str(message["content"]) for message in data["messages"])
+        content = json.dumps(summarize(prompt))
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+
+        return web.json_response(
+            {
+                "id": f"chatcmpl-{random.getrandbits(64):x}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": data["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+        )
+
+    async def embeddings(request: web.Request) -> web.Response:
+        data = await request.json()
+
+        texts = data["input"] if isinstance(data["input"], list) else [data["input"]]
+        vectors = [embed(text, dimensions) for text in texts]
+
+        # The official client asks for base64 to decode the vectors faster.
+        if data.get("encoding_format") == "base64":
+            encoded = [
+                base64.b64encode(vector.tobytes()).decode() for vector in vectors
+            ]
+        else:
+            encoded = [vector.tolist() for vector in vectors]
+
+        return web.json_response(
+            {
+                "object": "list",
+                "model": data["model"],
+                "data": [
+                    {"object": "embedding", "index": index, "embedding": embedding}
+                    for index, embedding in enumerate(encoded)
+                ],
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            }
+        )
+
+    app = web.Application(client_max_size=64 * 1024**2)
+    app.router.add_post("/v1/chat/completions", chat)
+    app.router.add_post("/v1/embeddings", embeddings)
+    return app
+
+
+def main(
+    port: int = typer.Option(8702, help="The port to listen on."),
+    delay: float = typer.Option(0.5, help="The mean delay of a completion (seconds)."),
+    jitter: float = typer.Option(0.2, help="The maximum deviation of the delay."),
+    error_rate: float = typer.Option(
+        0.0, help="The share of the completions failed with 429."
+    ),
+    dimensions: int = typer.Option(384, help="The size of the embedding vectors."),
+):
+    print(f"Serving the fake LLM on 127.0.0.1:{port}", flush=True)
+    web.run_app(
+        create_app(delay, jitter, error_rate, dimensions),
+        host="127.0.0.1",
+        port=port,
+        access_log=None,
+        print=None,
+    )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,301 @@
+"""Run the end-to-end ingestion and search benchmark without network access.
+
+The corpus is served by `corpus.py` and the LLM and the embeddings by `fake_llm.py`,
+both started by the driver. For every size a fresh database is created, the `extract` command
+ingests that many articles and the `search` queries are run against the result.
+The results are written as JSON, so the runs can be compared between commits:
+
+    python benchmarks/run.py run --size 1000 --size 10000 --output benchmark.json
+
+The peak RSS is the largest resident set of the `extract` process and its extraction workers.
+"""
+
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import typer
+from corpus import TOPICS, urls
+
+ROOT = Path(__file__).resolve().parent.parent
+BENCHMARKS = Path(__file__).resolve().parent
+
+# The files of the Chroma data: its SQLite database (with the journal) and the vector segments,
+# which are stored in the directories named by their UUID. The caches and the indexes of the
+# application kept next to them aren't counted.
+CHROMA_FILE = "chroma.sqlite3"
+SEGMENT_PATTERN = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+)
+
+app = typer.Typer(add_completion=False)
+
+
+def start_server(script: str, *args: str) -> subprocess.Popen:
+    """Start the server and wait until it reports that it is listening."""
+    process = subprocess.Popen(
+        [sys.executable, str(BENCHMARKS / script), *args],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    if not process.stdout.readline():
+        raise RuntimeError(f"The server {script} failed to start.")
+    return process
+
+
+def directory_size(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+
+def chroma_size(path: Path) -> int:
+    return sum(
+        directory_size(entry) if entry.is_dir() else entry.stat().st_size
+        for entry in path.iterdir()
+        if entry.name.startswith(CHROMA_FILE)
+        or (entry.is_dir() and SEGMENT_PATTERN.match(entry.name))
+    )
+
+
+def write_config(directory: Path, llm_port: int) -> None:
+    (directory / "config.toml").write_text(
+        f"""[storage]
+path = "{directory / "data"}"
+
+[search]
+# The hashed bag-of-words vectors of the fake server are far apart, unlike the real embeddings.
+topics_distance_threshold = 0.9
+summaries_distance_threshold = 0.9
+articles_distance_threshold = 0.9
+
+[llm]
+base_url = "http://127.0.0.1:{llm_port}/v1"
+model = "benchmark"
+
+[embeddings]
+backend = "openai"
+model = "benchmark-embedding"
+base_url = "http://127.0.0.1:{llm_port}/v1"
+"""
+    )
+
+
+def run_extract(directory: Path) -> dict:
+    """Run the `extract` command and return its stats with the wall time and the peak RSS."""
+    stats_file = directory / "extract-stats.json"
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            str(ROOT / "main.py"),
+            "extract",
+            "--urls-file",
+            str(directory / "urls.txt"),
+            "--stats-file",
+            str(stats_file),
+        ],
+        cwd=directory,
+        stdout=subprocess.DEVNULL,
+        env={**os.environ, "OPENAI_API_KEY": "benchmark"},
+    )
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - started
+
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"The extract command failed in {directory}.")
+
+    stats = json.loads(stats_file.read_text())
+    stats["wall_time"] = elapsed
+    stats["throughput"] = stats["processed"] / elapsed if elapsed else 0.0
+    # `ru_maxrss` is measured in kilobytes on Linux.
+    stats["peak_rss_bytes"] = usage.ru_maxrss * 1024
+    return stats
+
+
+def run_search(directory: Path, queries: int) -> dict:
+    """Run the search queries in a separate process and the `search` command once."""
+    stats_file = directory / "search-stats.json"
+    env = {**os.environ, "OPENAI_API_KEY": "benchmark"}
+
+    subprocess.run(
+        [
+            sys.executable,
+            str(BENCHMARKS / "run.py"),
+            "search-worker",
+            "--queries",
+            str(queries),
+            "--output",
+            str(stats_file),
+        ],
+        cwd=directory,
+        stdout=subprocess.DEVNULL,
+        env=env,
+        check=True,
+    )
+    stats = json.loads(stats_file.read_text())
+
+    # The whole command, as it is run from the shell, including the startup.
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(ROOT / "main.py"), "search", "inflation markets"],
+        cwd=directory,
+        stdout=subprocess.DEVNULL,
+        env=env,
+        check=True,
+    )
+    stats["command_time"] = time.perf_counter() - started
+    return stats
+
+
+@app.command()
+def run(
+    sizes: list[int] = typer.Option(
+        [1000, 10000, 100000], "--size", help="The numbers of articles to ingest."
+    ),
+    queries: int = typer.Option(100, help="The number of search queries per size."),
+    hosts: int = typer.Option(16, help="The number of hosts serving the corpus."),
+    latency: float = typer.Option(0.05, help="The mean delay of the corpus server."),
+    error_rate: float = typer.Option(
+        0.01, help="The share of the corpus responses failed with 503."
+    ),
+    llm_delay: float = typer.Option(0.5, help="The mean delay of a completion."),
+    llm_error_rate: float = typer.Option(
+        0.01, help="The share of the completions failed with 429."
+    ),
+    corpus_port: int = typer.Option(8701, help="The port of the corpus server."),
+    llm_port: int = typer.Option(8702, help="The port of the fake LLM server."),
+    workdir: Path | None = typer.Option(
+        None, help="The directory for the databases. A temporary one by default."
+    ),
+    output: Path | None = typer.Option(
+        None, help="Path to the JSON file with the results. Printed by default."
+    ),
+):
+    workdir = workdir or Path(tempfile.mkdtemp(prefix="news-scraper-benchmark-"))
+
+    commit = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    ).stdout.strip()
+    results = {
+        "commit": commit or None,
+        "python": sys.version.split()[0],
+        "parameters": {
+            "hosts": hosts,
+            "latency": latency,
+            "error_rate": error_rate,
+            "llm_delay": llm_delay,
+            "llm_error_rate": llm_error_rate,
+            "queries": queries,
+        },
+        "runs": [],
+    }
+
+    servers = [
+        start_server(
+            "corpus.py",
+            f"--port={corpus_port}",
+            f"--hosts={hosts}",
+            f"--latency={latency}",
+            f"--error-rate={error_rate}",
+        ),
+        start_server(
+            "fake_llm.py",
+            f"--port={llm_port}",
+            f"--delay={llm_delay}",
+            f"--error-rate={llm_error_rate}",
+        ),
+    ]
+
+    try:
+        for size in sizes:
+            directory = workdir / str(size)
+            directory.mkdir(parents=True, exist_ok=True)
+
+            write_config(directory, llm_port)
+            (directory / "urls.txt").write_text(
+                "\n".join(urls(size, corpus_port, hosts))
+            )
+
+            print(f"Ingesting {size} articles in {directory}...", file=sys.stderr)
+            extract = run_extract(directory)
+
+            print(f"Searching {size} articles...", file=sys.stderr)
+            search = run_search(directory, queries)
+
+            data = directory / "data"
+            results["runs"].append(
+                {
+                    "size": size,
+                    "extract": extract,
+                    "search": search,
+                    "storage": {
+                        "chroma_bytes": chroma_size(data),
+                        "total_bytes": directory_size(data),
+                    },
+                }
+            )
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+
+    report = json.dumps(results, indent=2)
+    if output:
+        output.write_text(report)
+    else:
+        print(report)
+
+
+@app.command(hidden=True)
+def search_worker(queries: int = typer.Option(100), output: Path = typer.Option(...)):
+    """Run the search queries against the database of the current directory."""
+    sys.path.insert(0, str(ROOT))
+
+    from src.metrics import percentile
+    from src.storage import get_database
+
+    rng = random.Random(0)
+    keywords = [keyword for words in TOPICS.values() for keyword in words]
+    texts = [" ".join(rng.sample(keywords, 2)) for _ in range(queries)]
+
+    started = time.perf_counter()
+    database = get_database()
+    opened = time.perf_counter() - started
+
+    latencies: list[float] = []
+    results: list[int] = []
+    started = time.perf_counter()
+    for text in texts:
+        query_started = time.perf_counter()
+        results.append(len(database.search(text)))
+        latencies.append(time.perf_counter() - query_started)
+    elapsed = time.perf_counter() - started
+
+    output.write_text(
+        json.dumps(
+            {
+                "queries": queries,
+                "open_time": opened,
+                "elapsed": elapsed,
+                "throughput": queries / elapsed if elapsed else 0.0,
+                "latency_p50": percentile(latencies, 50),
+                "latency_p99": percentile(latencies, 99),
+                "mean_results": sum(results) / len(results) if results else 0.0,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    app()
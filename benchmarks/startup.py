@@ -0,0 +1,165 @@
+"""Measure the startup time of the CLI commands and fail when a command exceeds its time budget.
+
+The commands are run in fresh interpreters, as they are run from cron and shell pipelines.
+For every command the slowest top-level imports are reported from `python -X importtime`.
+
+    python benchmarks/startup.py --repeat 5
+    python benchmarks/startup.py --query "climate" --budget-scale 2
+"""
+
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import typer
+
+MAIN = Path(__file__).resolve().parent.parent / "main.py"
+
+# The command arguments and the budget (seconds) of its median wall-clock time.
+COMMANDS: list[tuple[list[str], float]] = [
+    (["--help"], 0.6),
+    (["extract", "--help"], 0.6),
+    (["search", "--help"], 0.6),
+    (["explore", "--help"], 0.6),
+    (["serve", "--help"], 0.6),
+    (["watch", "--help"], 0.6),
+    # Opens the database, but doesn't read the articles.
+    (["explore", "--limit", "0"], 2.5),
+]
+
+SEARCH_BUDGET = 3.0
+
+
+def run(args: list[str], cwd: Path, importtime: bool = False) -> tuple[float, str]:
+    """Run the CLI command and return its wall-clock time and stderr."""
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += [str(MAIN), *args]
+
+    start = time.perf_counter()
+    process = subprocess.run(
+        command,
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    elapsed = time.perf_counter() - start
+
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"Command {' '.join(args)!r} failed with the code {process.returncode}:\n{process.stderr[-2000:]}"
+        )
+
+    return elapsed, process.stderr
+
+
+def slowest_imports(stderr: str, top: int) -> list[tuple[str, float]]:
+    """Return the top-level imports with the highest cumulative time (seconds)."""
+    imports: list[tuple[str, float]] = []
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        # The nested imports are indented, only the ones imported directly are reported.
+        if name.startswith("  "):
+            continue
+
+        imports.append((name.strip(), int(cumulative) / 1_000_000))
+
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:top]
+
+
+def measure(
+    commands: list[tuple[list[str], float]],
+    cwd: Path,
+    repeat: int,
+    top: int,
+    budget_scale: float,
+) -> tuple[list[dict], bool]:
+    """Run every command and return the results and whether any command exceeded its budget."""
+    results: list[dict] = []
+    exceeded = False
+
+    for args, budget in commands:
+        budget *= budget_scale
+        timings = [run(args, cwd)[0] for _ in range(repeat)]
+        _, stderr = run(args, cwd, importtime=True)
+
+        median = statistics.median(timings)
+        imports = slowest_imports(stderr, top)
+        passed = median <= budget
+        exceeded |= not passed
+
+        print(
+            f"{'OK  ' if passed else 'SLOW'} {' '.join(args):<24} "
+            f"median {median:.3f}s, min {min(timings):.3f}s, budget {budget:.2f}s"
+        )
+        for name, seconds in imports:
+            print(f"       {seconds:7.3f}s  {name}")
+
+        results.append(
+            {
+                "command": args,
+                "median": median,
+                "min": min(timings),
+                "max": max(timings),
+                "budget": budget,
+                "passed": passed,
+                "imports": dict(imports),
+            }
+        )
+
+    return results, exceeded
+
+
+def main(
+    repeat: int = typer.Option(5, help="The number of runs of every command.", min=1),
+    top: int = typer.Option(5, help="The number of the slowest imports to report."),
+    budget_scale: float = typer.Option(
+        1.0, help="The multiplier of the budgets, for slower machines."
+    ),
+    query: str | None = typer.Option(
+        None, help="If set, the `search` command is measured with this query as well."
+    ),
+    cwd: Path | None = typer.Option(
+        None,
+        help="The directory the commands are run in (with the `config.toml` to use). "
+        "By default a temporary directory with a copy of the `config.toml` of the repository.",
+    ),
+    output: Path | None = typer.Option(
+        None, help="Path to the JSON file to write the results to."
+    ),
+):
+    commands = list(COMMANDS)
+    if query:
+        commands.append((["search", query], SEARCH_BUDGET))
+
+    # The commands create the database, so they are run outside of the repository by default.
+    with tempfile.TemporaryDirectory(prefix="startup-") as directory:
+        if cwd is None:
+            cwd = Path(directory)
+            config = MAIN.parent / "config.toml"
+            if config.exists():
+                shutil.copy(config, cwd)
+
+        results, exceeded = measure(commands, cwd, repeat, top, budget_scale)
+
+    if output:
+        output.write_text(json.dumps(results, indent=2))
+
+    if exceeded:
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,3 +1,5 @@
+import json
+import sys
 from pathlib import Path
 
 import typer
@@ -20,64 +22,307 @@ async def extract(
         None, help="A URL or a list of URLs to extract news from."
     ),
     urls_file: Path | None = typer.Option(
-        None, help="Path to the file containing the list of URLs to extract news from."
+        None,
+        help="Path to the file containing the list of URLs to extract news from. It can be gzip-compressed (.gz) or `-` for the standard input.",
     ),
     dry_run: bool = typer.Option(
         False, help="If set, the saving of the extracted news will not be done."
     ),
+    resume: str | None = typer.Option(
+        None,
+        help="The ID of an interrupted job to continue. Only the URLs it didn't finish are processed.",
+    ),
+    retry_failed: bool = typer.Option(
+        False,
+        help="If set with --resume, only the URLs that failed in the job are processed.",
+    ),
+    refresh_older_than: str | None = typer.Option(
+        None,
+        help="Fetch again the stored articles saved earlier than this (e.g. 12h, 7d). By default the stored articles are skipped.",
+    ),
+    processes: int | None = typer.Option(
+        None,
+        min=1,
+        help="The number of worker processes. With more than one, the URLs are sharded by hostname across the workers and a separate process writes to the database. Defaults to `ingestion.processes`.",
+    ),
+    stats_file: Path | None = typer.Option(
+        None,
+        help="Path to the JSON file to write the throughput, the latency and the metrics of every stage to.",
+    ),
+    prometheus_file: Path | None = typer.Option(
+        None, help="Path to the Prometheus textfile to write the metrics to."
+    ),
+    profile_file: Path | None = typer.Option(
+        None, "--profile", help="Path to the cProfile stats file of the run."
+    ),
 ):
-    from langchain_openai import ChatOpenAI
+    import time
+    from collections.abc import Iterable
+    from io import TextIOBase
 
-    from src.scraping import scrape_urls, validate_urls
+    from src.ingestion import (
+        IngestionPipeline,
+        Journal,
+        ShardedIngestion,
+        UrlsReader,
+        open_urls_file,
+        parse_duration,
+    )
+    from src.metrics import metrics, profile
     from src.settings import settings
-    from src.storage import database
-    from src.summarization import summarize
+    from src.summarization import create_llm
 
-    if not urls and not urls_file:
-        raise typer.Abort(
-            "No URL or file with URLs provided. Please provide either a URL or a file with URLs."
-        )
+    if retry_failed and not resume:
+        raise typer.Abort("--retry-failed requires the job to resume with --resume.")
 
-    if urls and urls_file:
-        raise typer.Abort(
-            "Both URL and file with URLs provided. Please provide only one."
+    try:
+        max_age = parse_duration(refresh_older_than) if refresh_older_than else None
+    except ValueError as e:
+        raise typer.Abort(str(e))
+
+    journal: Journal | None = None
+    # The URLs of the resumed job that it didn't finish.
+    resumed: list[str] = []
+    # The input of the job that isn't read yet.
+    lines: Iterable[str] | None = None
+    path: Path | None = None
+    offset = 0
+
+    if resume:
+        if urls or urls_file:
+            raise typer.Abort(
+                "The URLs of a resumed job are read from its journal. Please don't provide them."
+            )
+
+        try:
+            journal = Journal.open(resume)
+        except FileNotFoundError as e:
+            raise typer.Abort(str(e))
+
+        print(journal.status())
+        resumed = journal.failed() if retry_failed else journal.pending()
+        print(
+            f"Resuming the job {journal.job} with {len(resumed)} {'failed' if retry_failed else 'unfinished'} URLs."
         )
 
-    if urls_file:
+        # The job was interrupted before its input was read entirely, so the rest of it is read now.
+        if not retry_failed and journal.input and not journal.input.complete:
+            if journal.input.path is None:
+                raise typer.Abort(
+                    f"The job {journal.job} was interrupted after reading {journal.input.lines} lines of its input. "
+                    "Its URLs were given with --urls or the standard input, which can't be read again. "
+                    "Please start a new job with the same URLs instead, the stored articles are skipped."
+                )
+
+            path = Path(journal.input.path)
+            offset = journal.input.lines
+            print(f"Continuing to read '{path}' from the line {offset + 1}.")
+    else:
+        if not urls and not urls_file:
+            raise typer.Abort(
+                "No URL or file with URLs provided. Please provide either a URL or a file with URLs."
+            )
+
+        if urls and urls_file:
+            raise typer.Abort(
+                "Both URL and file with URLs provided. Please provide only one."
+            )
+
+        path = urls_file
+        lines = urls
+
+        if settings.ingestion.journal:
+            journal = Journal.create()
+            print(
+                f"Started the job {journal.job}. If it's interrupted, continue it with `--resume {journal.job}`."
+            )
+
+    if path is not None:
         try:
-            with open(urls_file, "r") as f:
-                urls = f.readlines()
+            # The file is read in chunks while the pipeline is working, so it's never loaded entirely.
+            lines = open_urls_file(path)
         except FileNotFoundError:
             raise typer.Abort(
-                f"Unable to read the file: {urls_file}. Please make sure the file exists and it can be read."
+                f"Unable to read the file: {path}. Please make sure the file exists and it can be read."
             )
 
-    urls = validate_urls(urls)
-    print(f"Validated {len(urls)} URLs.")
+    processes = processes or settings.ingestion.processes
+    ingestion: IngestionPipeline | ShardedIngestion = (
+        ShardedIngestion(processes, dry_run=dry_run, journal=journal)
+        if processes > 1
+        else IngestionPipeline(create_llm(), dry_run=dry_run, journal=journal)
+    )
 
-    documents = await scrape_urls(urls)
+    # Only a file can be read again when the job is resumed.
+    reader: UrlsReader | None = None
+    if lines is not None:
+        reader = UrlsReader(
+            lines,
+            path=str(path.resolve()) if path is not None and str(path) != "-" else None,
+            offset=offset,
+            journal=journal,
+            refresh_older_than=max_age,
+            # The sharded ingestion looks the stored URLs up in its writer process.
+            database=ingestion.database,
+        )
 
-    llm: ChatOpenAI = ChatOpenAI(
-        base_url=settings.llm.base_url,
-        model=settings.llm.model,
-    )
+    queued = 0
+
+    started = time.perf_counter()
+    try:
+        with profile(profile_file):
+            async with ingestion:
+                for url in resumed:
+                    await ingestion.put(url)
+                queued += len(resumed)
+
+                if reader is not None:
+                    async for chunk in reader.chunks(
+                        settings.ingestion.input_chunk_size
+                    ):
+                        queued += len(chunk)
+                        for url in chunk:
+                            await ingestion.put(url)
+    finally:
+        if isinstance(lines, TextIOBase) and lines is not sys.stdin:
+            lines.close()
+    elapsed = time.perf_counter() - started
+
+    if reader is not None:
+        validator = reader.validator
+        print(
+            f"Validated {validator.valid} URLs: {validator.duplicates} duplicates and {validator.invalid} invalid URLs skipped."
+        )
+        if reader.stored:
+            print(
+                f"Skipped {reader.stored} URLs that are already stored"
+                + (
+                    f" and newer than {refresh_older_than}."
+                    if max_age is not None
+                    else "."
+                )
+            )
+        if not validator.valid and not resumed:
+            print("No valid URLs provided.")
+
+    if isinstance(ingestion, ShardedIngestion):
+        # The stages, the LLM and the embeddings run in the child processes, which report them.
+        print(ingestion.report())
+        stats = {
+            "urls": queued,
+            "processed": ingestion.processed,
+            "failed": ingestion.failed,
+            "elapsed": elapsed,
+            "restarts": ingestion.restarts,
+            "workers": ingestion.stats(),
+        }
+    else:
+        print(
+            f"Processed {ingestion.pipeline.processed} articles, {ingestion.pipeline.failed} failed."
+        )
+        print(ingestion.summarizer.report())
+        stats = {
+            "urls": queued,
+            "processed": ingestion.pipeline.processed,
+            "failed": ingestion.pipeline.failed,
+            "elapsed": elapsed,
+            "stages": ingestion.pipeline.stats(),
+            "llm": ingestion.summarizer.stats(),
+        }
+    print(metrics.report())
+    if journal is not None:
+        print(journal.report())
+
+    if not dry_run and not isinstance(ingestion, ShardedIngestion):
+        from src.storage import database
 
-    for i, document in enumerate(documents):
-        print(f"[{i}] Summarizing document '{document.metadata['url']}'...")
-        summarization = await summarize(document, llm)
+        print(database.embedding_function.report())
+        stats["embeddings"] = database.embedding_function.stats()
 
-        print(f"[{i}] Saving summarization to the database...")
-        database.add(document, summarization)
+    if stats_file:
+        metrics.write_json(stats_file, **stats)
+
+    if prometheus_file:
+        metrics.write_prometheus(prometheus_file)
 
 
 @app.command(
     short_help="Search for related articles in the database of extracted content",
     help="Search for related articles in the database of extracted content. The search is based on the semantic similarity of the articles.",
 )
-def search(query: str):
+def search(
+    query: str | None = typer.Argument(
+        None, help="The search query. Not needed with --queries-file."
+    ),
+    queries_file: Path | None = typer.Option(
+        None,
+        help="Path to the file with a query per line (or `-` for the standard input) to search for in batches. The results are printed as JSON lines.",
+    ),
+    stats_file: Path | None = typer.Option(
+        None, help="Path to the JSON file to write the metrics of the search to."
+    ),
+    prometheus_file: Path | None = typer.Option(
+        None, help="Path to the Prometheus textfile to write the metrics to."
+    ),
+    profile_file: Path | None = typer.Option(
+        None, "--profile", help="Path to the cProfile stats file of the search."
+    ),
+):
+    from src.metrics import metrics, profile
     from src.storage import database
 
-    articles = database.search(query)
+    if (query is None) == (queries_file is None):
+        raise typer.Abort("Please provide either a query or a file with queries.")
+
+    if queries_file is not None:
+        from src.ingestion import open_urls_file
+        from src.ingestion.reader import chunks
+        from src.settings import settings
+
+        try:
+            lines = open_urls_file(queries_file)
+        except FileNotFoundError:
+            raise typer.Abort(
+                f"Unable to read the file: {queries_file}. Please make sure the file exists and it can be read."
+            )
+
+        queries = 0
+        with profile(profile_file), lines:
+            for chunk in chunks(
+                (line.strip() for line in lines if line.strip()),
+                settings.search.batch_size,
+            ):
+                for batch_query, articles in zip(
+                    chunk, database.search_many(chunk), strict=True
+                ):
+                    print(
+                        json.dumps(
+                            {
+                                "query": batch_query,
+                                "results": [
+                                    article.model_dump(exclude={"content"})
+                                    for article in articles
+                                ],
+                            },
+                            ensure_ascii=False,
+                        )
+                    )
+                sys.stdout.flush()
+                queries += len(chunk)
+
+        if stats_file:
+            metrics.write_json(stats_file, queries=queries)
+        if prometheus_file:
+            metrics.write_prometheus(prometheus_file)
+        return
+
+    with profile(profile_file):
+        articles = database.search(query)
+
+    if stats_file:
+        metrics.write_json(stats_file, query=query, results=len(articles))
+    if prometheus_file:
+        metrics.write_prometheus(prometheus_file)
 
     if not articles:
         return
@@ -91,10 +336,15 @@ def search(query: str):
     short_help="Print all existing topics, articles and their summaries.",
     help="Explore the current data, printing all existing topics, articles and their summaries.",
 )
-def explore():
+def explore(
+    limit: int | None = typer.Option(
+        None, help="The maximum number of articles to print."
+    ),
+    offset: int = typer.Option(0, help="The number of articles to skip."),
+):
     from src.storage import database
 
-    topics, articles = database.get_all()
+    topics = database.get_topics()
     if not topics:
         print("No topics found in the database.")
     else:
@@ -102,12 +352,116 @@ def explore():
         for code, topic in topics.items():
             print(f" - '{topic}' ({code})")
 
-    if not articles:
+    count = database.count_articles()
+    if not count:
         print("No articles found in the database.")
     else:
-        print(f"\nFound {len(articles)} articles in the database.")
-        for i, article in enumerate(articles):
-            print(f"[{i + 1}] {article}")
+        print(f"\nFound {count} articles in the database.")
+        for i, article in enumerate(
+            database.iter_articles(limit=limit, offset=offset, topics=topics)
+        ):
+            print(f"[{offset + i + 1}] {article}")
+
+
+@app.command(
+    short_help="Watch pages, RSS/Atom feeds and sitemaps and ingest their new articles",
+    help="""Watch the sources (HTML listing pages, RSS/Atom feeds and sitemaps) and ingest their new articles until interrupted.
+
+        Every source is polled on its own interval, which adapts to how often it yields new articles
+        (see the `watch` settings). Only the article URLs that are not stored yet are ingested.
+        """,
+)
+async def watch(
+    sources: list[str] | None = typer.Option(
+        None, help="A URL or a list of URLs of the sources to watch."
+    ),
+    sources_file: Path | None = typer.Option(
+        None,
+        help="Path to the file containing the list of the source URLs. It can be gzip-compressed (.gz) or `-` for the standard input.",
+    ),
+    dry_run: bool = typer.Option(
+        False, help="If set, the saving of the extracted news will not be done."
+    ),
+):
+    from src.ingestion import IngestionPipeline, Journal, Watcher, open_urls_file
+    from src.scraping import UrlValidator
+    from src.settings import settings
+    from src.summarization import create_llm
+
+    if not sources and not sources_file:
+        raise typer.Abort(
+            "No source or file with sources provided. Please provide either a URL or a file with URLs."
+        )
+    if sources and sources_file:
+        raise typer.Abort(
+            "Both sources and file with sources provided. Please provide only one."
+        )
+
+    validator = UrlValidator()
+    if sources_file:
+        try:
+            with open_urls_file(sources_file) as lines:
+                urls = validator.validate(lines)
+        except FileNotFoundError:
+            raise typer.Abort(
+                f"Unable to read the file: {sources_file}. Please make sure the file exists and it can be read."
+            )
+    else:
+        urls = validator.validate(sources)
+
+    if not urls:
+        raise typer.Abort("No valid source URLs provided.")
+
+    journal: Journal | None = None
+    if settings.ingestion.journal:
+        journal = Journal.create()
+        print(f"Started the job {journal.job}.")
+
+    async with IngestionPipeline(
+        create_llm(), dry_run=dry_run, journal=journal
+    ) as ingestion:
+        watcher = Watcher(ingestion)
+        for url in urls:
+            watcher.add(url)
+
+        print(f"Watching {len(urls)} sources. Press Ctrl+C to stop.")
+        try:
+            await watcher.run()
+        finally:
+            print(watcher.report())
+            print(ingestion.summarizer.report())
+            if journal is not None:
+                print(
+                    f"The articles that were not stored yet can be ingested with `extract --resume {journal.job}`."
+                )
+
+
+@app.command(
+    short_help="Serve the search and the ingestion over HTTP with a warm database.",
+    help="""Serve the search and the ingestion over HTTP, keeping the database and the embedding model loaded.
+
+        Endpoints: `GET /search?q=...`, `POST /search/batch` with `{"queries": [...]}`,
+        `POST /ingest` with `{"urls": [...]}`, `GET /metrics` (Prometheus) and `GET /health`.
+        """,
+)
+def serve(
+    host: str | None = typer.Option(
+        None, help="The address to listen on. Defaults to `server.host`."
+    ),
+    port: int | None = typer.Option(
+        None, help="The port to listen on. Defaults to `server.port`."
+    ),
+):
+    from aiohttp import web
+
+    from src.server import create_app
+    from src.settings import settings
+
+    web.run_app(
+        create_app(),
+        host=host or settings.server.host,
+        port=port or settings.server.port,
+    )
 
 
 if __name__ == "__main__":
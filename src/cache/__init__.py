@@ -0,0 +1,4 @@
+from .disk import DiskCache
+from .memory import LRUCache
+
+__all__ = ["DiskCache", "LRUCache"]
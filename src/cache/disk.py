@@ -0,0 +1,206 @@
+import os
+import sqlite3
+import threading
+import time
+
+# The number of the keys looked up with a single query, below the SQLite limit of variables.
+LOOKUP_BATCH_SIZE: int = 500
+
+
+class DiskCache:
+    """A persistent key-value cache stored in a single SQLite file.
+
+    The entries expire after the TTL, and the least recently used entries are evicted
+    once the total size of the values exceeds the size cap. The cache is safe to use from multiple threads.
+    """
+
+    path: str
+    ttl: float | None
+    max_size: int | None
+
+    hits: int
+    misses: int
+
+    def __init__(
+        self, path: str, ttl: float | None = None, max_size: int | None = None
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+        )
+
+        (size,) = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        self._size: int = size
+
+    @property
+    def size(self) -> int:
+        """The total size of the stored values in bytes."""
+        return self._size
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: str) -> bytes | None:
+        """Return the value of the key, or None if it's missing or expired."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        """Return the values of all the found keys.
+
+        The keys are looked up in batches and the access times of the found ones are updated
+        within a single transaction."""
+        now = time.time()
+        found: dict[str, bytes] = {}
+        expired: list[str] = []
+
+        with self._lock:
+            for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+                batch = keys[start : start + LOOKUP_BATCH_SIZE]
+                rows = self._connection.execute(
+                    "SELECT key, value, created_at FROM entries WHERE key IN "
+                    f"({', '.join('?' * len(batch))})",
+                    batch,
+                )
+                for key, value, created_at in rows:
+                    if self.ttl is not None and now - created_at > self.ttl:
+                        expired.append(key)
+                    else:
+                        found[key] = value
+
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+            if not found and not expired:
+                return found
+
+            self._connection.execute("BEGIN")
+            try:
+                for key in expired:
+                    self._delete(key)
+                self._connection.executemany(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                (self._size,) = self._connection.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()
+                raise
+            self._connection.execute("COMMIT")
+
+        return found
+
+    def set(self, key: str, value: bytes) -> None:
+        self.set_many({key: value})
+
+    def set_many(self, items: dict[str, bytes]) -> None:
+        """Store all the values within a single transaction."""
+        now = time.time()
+
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                for key, value in items.items():
+                    self._delete(key)
+                    self._connection.execute(
+                        "INSERT INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                        (key, value, len(value), now, now),
+                    )
+                    self._size += len(value)
+
+                if self.max_size is not None and self._size > self.max_size:
+                    self._evict()
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                # The size is recomputed, since the rolled back changes were already accounted.
+                (self._size,) = self._connection.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()
+                raise
+            self._connection.execute("COMMIT")
+
+    def touch(self, key: str) -> None:
+        """Reset the age of the entry, as if it was just stored."""
+        now = time.time()
+
+        with self._lock:
+            self._connection.execute(
+                "UPDATE entries SET created_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, key),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._delete(key)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _delete(self, key: str) -> None:
+        rows = self._connection.execute(
+            "DELETE FROM entries WHERE key = ? RETURNING size", (key,)
+        ).fetchall()
+
+        for (size,) in rows:
+            self._size -= size
+
+    def _evict(self) -> None:
+        # Free a bit more space than required, so the eviction doesn't run on every insert.
+        target = int(self.max_size * 0.9)
+
+        if self.ttl is not None:
+            cutoff = time.time() - self.ttl
+            (expired,) = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries WHERE created_at < ?",
+                (cutoff,),
+            ).fetchone()
+            self._connection.execute(
+                "DELETE FROM entries WHERE created_at < ?", (cutoff,)
+            )
+            self._size -= expired
+
+        rows = self._connection.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at"
+        )
+
+        evicted: list[str] = []
+        for key, size in rows:
+            if self._size <= target:
+                break
+            evicted.append(key)
+            self._size -= size
+        rows.close()
+
+        self._connection.executemany(
+            "DELETE FROM entries WHERE key = ?", [(key,) for key in evicted]
+        )
@@ -0,0 +1,52 @@
+import threading
+from collections import OrderedDict
+from typing import Any
+
+
+class LRUCache:
+    """An in-memory cache that keeps the most recently used entries up to the given number.
+
+    It's used in front of a DiskCache for the hottest keys. The cache is safe to use from multiple threads.
+    """
+
+    max_entries: int
+
+    hits: int
+    misses: int
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def set(self, key: str, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,25 @@
+from .engine import IngestionPipeline
+from .journal import Journal
+from .models import IngestionItem
+from .pipeline import Pipeline, Stage
+from .reader import UrlsReader, open_urls_file, read_chunks
+from .selection import parse_duration, select_urls
+from .sharding import ShardedIngestion, shard_of
+from .watch import Source, Watcher
+
+__all__ = [
+    "IngestionItem",
+    "IngestionPipeline",
+    "Journal",
+    "Pipeline",
+    "ShardedIngestion",
+    "Source",
+    "Stage",
+    "UrlsReader",
+    "Watcher",
+    "open_urls_file",
+    "parse_duration",
+    "read_chunks",
+    "select_urls",
+    "shard_of",
+]
@@ -0,0 +1,75 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+BatchHandler = Callable[[list[Any]], Awaitable[None]]
+
+
+class BatchWriter:
+    """Collect the items and write them together, once the batch is full or the interval has passed.
+
+    `add` waits until the batch with the item is written, so the failures of the write
+    are reported back to every item of the batch. The batches are written one at a time."""
+
+    handler: BatchHandler
+    size: int
+    interval: float
+
+    def __init__(self, handler: BatchHandler, size: int, interval: float):
+        self.handler = handler
+        self.size = size
+        self.interval = interval
+
+        self._buffer: list[tuple[Any, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._lock = asyncio.Lock()
+        self._flushes: set[asyncio.Task] = set()
+
+    async def add(self, item: Any) -> None:
+        """Add the item to the current batch and wait until the batch is written."""
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((item, future))
+
+        if len(self._buffer) >= self.size:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.interval, self._schedule_flush
+            )
+
+        await future
+
+    async def close(self) -> None:
+        """Write the remaining items and wait for all the pending writes."""
+        self._schedule_flush()
+        await asyncio.gather(*self._flushes)
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._buffer:
+            return
+
+        batch, self._buffer = self._buffer, []
+
+        task = asyncio.create_task(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[tuple[Any, asyncio.Future]]) -> None:
+        async with self._lock:
+            # The failure of the write is returned, so it's passed to every item of the batch.
+            (error,) = await asyncio.gather(
+                self.handler([item for item, _ in batch]), return_exceptions=True
+            )
+
+        for _, future in batch:
+            if future.done():
+                continue
+
+            if isinstance(error, BaseException):
+                future.set_exception(error)
+            else:
+                future.set_result(None)
@@ -0,0 +1,228 @@
+import sqlite3
+from typing import Self
+
+from chromadb.errors import ChromaError
+from langchain_core.exceptions import LangChainException
+from langchain_core.language_models import BaseChatModel
+from lxml.etree import LxmlError
+from openai import OpenAIError
+
+from src.metrics import metrics
+from src.scraping.backend import ExtractionBackend
+from src.scraping.fetcher import Fetcher
+from src.settings import settings
+from src.storage import AsyncDatabase
+from src.summarization.scheduler import SummarizationScheduler
+from src.summarization.summarize import ArticleSummarization
+
+from .batch import BatchWriter
+from .journal import Journal
+from .models import IngestionItem, JobState
+from .pipeline import Pipeline, Stage
+
+# The failures of a single article besides `ExtractionError`: the parsing of the page, the LLM
+# and its response, the embeddings and the database. Any other exception stops the ingestion.
+ITEM_ERRORS: tuple[type[Exception], ...] = (
+    OSError,
+    ValueError,
+    RuntimeError,
+    LxmlError,
+    LangChainException,
+    OpenAIError,
+    ChromaError,
+    sqlite3.Error,
+)
+
+
+class IngestionPipeline:
+    """Fetch, extract, summarize and store articles as separate concurrent stages.
+
+    Each stage has its own number of workers (see `IngestionSettings`), so a slow LLM
+    doesn't prevent the fetchers from working and the articles reach the database one by one
+    as soon as they are summarized.
+    If a journal is given, the state of every URL is recorded in it, so the job can be resumed.
+    """
+
+    dry_run: bool
+    journal: Journal | None
+
+    fetcher: Fetcher
+    extractor: ExtractionBackend
+    summarizer: SummarizationScheduler
+    database: AsyncDatabase
+    writer: BatchWriter
+    pipeline: Pipeline
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        dry_run: bool = False,
+        journal: Journal | None = None,
+        extractor: ExtractionBackend | None = None,
+        database: AsyncDatabase | None = None,
+    ):
+        self.dry_run = dry_run
+        self.journal = journal
+        self.fetcher = Fetcher()
+        self.extractor = extractor or ExtractionBackend()
+        self.summarizer = SummarizationScheduler(llm)
+        self.database = database or AsyncDatabase()
+        self.writer = BatchWriter(
+            self.write,
+            size=settings.ingestion.flush_size,
+            interval=settings.ingestion.flush_interval,
+        )
+
+        self.pipeline = Pipeline(
+            [
+                Stage(
+                    "fetch",
+                    self.fetch,
+                    settings.ingestion.fetch_workers or settings.fetch.max_connections,
+                ),
+                Stage(
+                    "extract",
+                    self.extract,
+                    settings.ingestion.extract_workers or self.extractor.workers,
+                ),
+                # The lookups are reads of the local index, so they share the database readers.
+                Stage("deduplicate", self.deduplicate, settings.storage.read_workers),
+                Stage(
+                    "summarize",
+                    self.summarize,
+                    settings.ingestion.summarize_workers
+                    or settings.llm.max_concurrency,
+                ),
+                # Every store worker waits for its batch to be written, so there is one per batch item.
+                Stage("store", self.store, settings.ingestion.flush_size),
+            ],
+            queue_size=settings.ingestion.queue_size,
+            errors=ITEM_ERRORS,
+            on_error=self.failed,
+        )
+
+    async def __aenter__(self) -> Self:
+        await self.fetcher.start()
+        self.extractor.start()
+        self.database.start()
+        if self.journal is not None:
+            self.journal.start()
+        self.pipeline.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            await self.pipeline.__aexit__(exc_type, exc, tb)
+        finally:
+            await self.writer.close()
+            await self.database.close()
+            await self.fetcher.close()
+            self.extractor.close()
+            self.summarizer.close()
+            if self.journal is not None:
+                await self.journal.close()
+
+    async def put(self, url: str) -> None:
+        """Schedule a URL for ingestion, waiting while the pipeline is saturated."""
+        await self.pipeline.put(IngestionItem(url=url))
+
+    def record(self, item: IngestionItem, state: JobState, **fields) -> None:
+        if self.journal is not None:
+            self.journal.record(item.url, state, **fields)
+
+    def failed(self, stage: Stage, item: IngestionItem, error: Exception) -> None:
+        self.record(item, "failed", stage=stage.name, reason=str(error))
+
+    async def fetch(self, item: IngestionItem) -> IngestionItem | None:
+        result = await self.fetcher.fetch_url(item.url)
+
+        # The page didn't change since the last fetch, so there is nothing new to extract.
+        if result.not_modified and await self.database.existing_ids([item.url]):
+            print(f"[{item.url}] Not modified since the last run. Skipping.")
+            self.record(item, "skipped", stage="fetch", reason="Not modified")
+            return None
+
+        item.html = result.html
+        self.record(item, "fetched")
+        return item
+
+    async def extract(self, item: IngestionItem) -> IngestionItem | None:
+        item.document = await self.extractor.extract(item.url, item.html)
+        item.html = None
+
+        # The same content is already stored for this URL, so there is nothing to update.
+        content_hash = item.document.metadata["content_hash"]
+        stored = await self.database.get_content_hashes([item.url])
+        if stored.get(item.url) == content_hash:
+            print(f"[{item.url}] Content didn't change since the last run. Skipping.")
+            self.record(item, "skipped", stage="extract", reason="Content not changed")
+            return None
+
+        self.record(item, "extracted")
+        return item
+
+    async def deduplicate(self, item: IngestionItem) -> IngestionItem:
+        """Link the near-duplicate of a stored article to the summary and the topics of the original."""
+        signature = item.document.metadata.get("minhash")
+        if not settings.deduplication.enabled or not signature:
+            return item
+
+        original = await self.database.find_duplicate(item.url, signature)
+        if original is None:
+            return item
+
+        print(f"[{item.url}] Near-duplicate of '{original.url}'. Reusing its summary.")
+        metrics.counter("duplicates").inc()
+
+        item.document.metadata["duplicate_of"] = original.url
+        item.summarization = ArticleSummarization(
+            summary=original.summary, topics=original.topics
+        )
+        self.record(
+            item,
+            "summarized",
+            reason=f"Near-duplicate of {original.url}",
+            content_hash=item.document.metadata["content_hash"],
+            summarization=item.summarization,
+        )
+        return item
+
+    async def summarize(self, item: IngestionItem) -> IngestionItem:
+        # The article is a near-duplicate, so it already has the summary of its original.
+        if item.summarization is not None:
+            return item
+
+        content_hash = item.document.metadata["content_hash"]
+
+        # The previous run of the job summarized the same content, but didn't store it.
+        if self.journal is not None and (
+            summarization := self.journal.summarization(item.url, content_hash)
+        ):
+            print(f"[{item.url}] Reusing the summarization from the job journal.")
+            item.summarization = summarization
+            return item
+
+        item.summarization = await self.summarizer.summarize(item.document)
+        self.record(
+            item,
+            "summarized",
+            content_hash=content_hash,
+            summarization=item.summarization,
+        )
+        return item
+
+    async def store(self, item: IngestionItem) -> IngestionItem:
+        if self.dry_run:
+            print(f"[Dry run] Skipping saving of the document '{item.url}'.")
+            self.record(item, "skipped", stage="store", reason="Dry run")
+            return item
+
+        await self.writer.add(item)
+        self.record(item, "stored")
+        return item
+
+    async def write(self, items: list[IngestionItem]) -> None:
+        print(f"Saving {len(items)} summarized articles to the database...")
+        await self.database.add_many(
+            [(item.document, item.summarization) for item in items]
+        )
@@ -0,0 +1,204 @@
+import asyncio
+import os
+import secrets
+from datetime import datetime
+from typing import Any, Self
+
+from pydantic import ValidationError
+
+from src.settings import settings
+from src.summarization.summarize import ArticleSummarization
+
+from .models import JobState, JournalInput, JournalRecord
+
+FINAL_STATES: set[JobState] = {"stored", "skipped", "failed"}
+
+
+class Journal:
+    """An append-only log of the state of every URL of an ingestion job.
+
+    Every change of the state is appended as a JSON line to `{storage.path}/jobs/{job}.jsonl`.
+    The lines are written to the file buffer right away and synced to the disk in the background
+    every `journal_sync_interval` seconds, so recording a state costs almost nothing.
+    A crash loses at most the last interval, which is then processed again on resume.
+
+    Only the records of a resumed job are kept in memory, a new job keeps just the number of
+    URLs in every state, so its memory doesn't depend on the number of URLs.
+    The input of the job is read in chunks, so the number of the lines read is recorded after
+    the URLs of every chunk (`input`), and a resumed job continues reading from there."""
+
+    job: str
+    path: str
+    records: dict[str, JournalRecord]
+    states: dict[JobState, int]
+    input: JournalInput | None
+
+    def __init__(self, job: str, sync_interval: float | None = None):
+        self.job = job
+        self.path = self.job_path(job)
+        self.sync_interval = sync_interval or settings.ingestion.journal_sync_interval
+
+        # The latest record of every URL of the resumed job, in the order the URLs were queued.
+        self.records = {}
+        self.input = None
+        if os.path.exists(self.path):
+            self._load()
+
+        # The number of URLs that reached every state in this run.
+        self.states = {}
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # The binary buffered writer is safe to flush from the sync thread.
+        # The file is kept open for the appends until `close`, so there is no context manager.
+        self._file = open(self.path, "ab")  # noqa: SIM115
+        self._dirty = False
+        self._task: asyncio.Task | None = None
+
+    @staticmethod
+    def job_path(job: str) -> str:
+        return os.path.join(settings.storage.path, "jobs", f"{job}.jsonl")
+
+    @classmethod
+    def create(cls) -> "Journal":
+        """Start the journal of a new job."""
+        return cls(f"{datetime.now():%Y%m%d-%H%M%S}-{secrets.token_hex(2)}")
+
+    @classmethod
+    def open(cls, job: str) -> "Journal":
+        """Open the journal of an existing job to resume it."""
+        if not os.path.exists(cls.job_path(job)):
+            raise FileNotFoundError(f"No journal found for the job '{job}'.")
+        return cls(job)
+
+    def _load(self) -> None:
+        with open(self.path, "rb") as file:
+            for line in file:
+                try:
+                    record = JournalRecord.model_validate_json(line)
+                except ValidationError:
+                    self._load_input(line)
+                    continue
+
+                previous = self.records.get(record.url)
+                # The summarization is kept until the article is stored, so it can be reused.
+                if (
+                    previous is not None
+                    and previous.summarization is not None
+                    and record.state != "stored"
+                    and record.summarization is None
+                ):
+                    record.content_hash = previous.content_hash
+                    record.summarization = previous.summarization
+
+                self.records[record.url] = record
+
+    def _load_input(self, line: bytes) -> None:
+        try:
+            self.input = JournalInput.model_validate_json(line)
+        except ValidationError:
+            # The last line may be cut by a crash in the middle of a write.
+            pass
+
+    async def __aenter__(self) -> Self:
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync_loop(), name="journal")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        await asyncio.to_thread(self._sync)
+        self._file.close()
+
+    def record(self, url: str, state: JobState, **fields: Any) -> None:
+        record = JournalRecord(url=url, state=state, **fields)
+
+        self._file.write(record.model_dump_json(exclude_none=True).encode() + b"\n")
+        self._dirty = True
+        self.states[state] = self.states.get(state, 0) + 1
+
+        previous = self.records.get(url)
+        if previous is None:
+            return
+
+        if (
+            previous.summarization is not None
+            and state != "stored"
+            and record.summarization is None
+        ):
+            record.content_hash = previous.content_hash
+            record.summarization = previous.summarization
+        self.records[url] = record
+
+    def queue(self, urls: list[str]) -> None:
+        """Record the URLs of the job in the order they are processed."""
+        for url in urls:
+            self.record(url, "queued")
+
+    def record_input(
+        self, path: str | None, lines: int, complete: bool = False
+    ) -> None:
+        """Record the number of the input lines read, after the URLs queued from them."""
+        self.input = JournalInput(path=path, lines=lines, complete=complete)
+        self._file.write(self.input.model_dump_json().encode() + b"\n")
+        self._dirty = True
+
+    def pending(self) -> list[str]:
+        """Return the URLs that didn't reach a final state."""
+        return [
+            url
+            for url, record in self.records.items()
+            if record.state not in FINAL_STATES
+        ]
+
+    def failed(self) -> list[str]:
+        return [url for url, record in self.records.items() if record.state == "failed"]
+
+    def summarization(
+        self, url: str, content_hash: str | None
+    ) -> ArticleSummarization | None:
+        """Return the summarization recorded by the previous run, if the content didn't change."""
+        record = self.records.get(url)
+
+        if record is None or record.summarization is None or not content_hash:
+            return None
+        if record.content_hash != content_hash:
+            return None
+        return record.summarization
+
+    def status(self) -> str:
+        """Return the number of the URLs of the resumed job in every state."""
+        states: dict[str, int] = {}
+        for record in self.records.values():
+            states[record.state] = states.get(record.state, 0) + 1
+
+        return f"Job {self.job}: " + ", ".join(
+            f"{count} {state}" for state, count in states.items()
+        )
+
+    def report(self) -> str:
+        """Return the number of the URLs that reached every final state in this run."""
+        return f"Job {self.job}: " + ", ".join(
+            f"{self.states.get(state, 0)} {state}"
+            for state in ("stored", "skipped", "failed")
+        )
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            if self._dirty:
+                self._dirty = False
+                await asyncio.to_thread(self._sync)
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
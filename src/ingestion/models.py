@@ -0,0 +1,54 @@
+import time
+from typing import Literal
+
+from langchain_core.documents import Document
+from pydantic import BaseModel, Field
+
+from src.summarization.summarize import ArticleSummarization
+
+
+class IngestionItem(BaseModel):
+    """The state of a single URL while it goes through the ingestion pipeline.
+
+    Every stage fills the next field and releases the data that is no longer needed."""
+
+    url: str
+
+    html: str | None = None
+    document: Document | None = None
+    summarization: ArticleSummarization | None = None
+
+    def __str__(self) -> str:
+        return self.url
+
+
+# The states of a URL in the journal. `stored`, `skipped` and `failed` are final.
+JobState = Literal[
+    "queued", "fetched", "extracted", "summarized", "stored", "skipped", "failed"
+]
+
+
+class JournalRecord(BaseModel):
+    """A single line of the job journal: the new state of a URL."""
+
+    url: str
+    state: JobState
+    time: float = Field(default_factory=lambda: round(time.time(), 3))
+
+    stage: str | None = None
+    reason: str | None = None
+
+    # Kept for the summarized articles, so a resumed job doesn't request the LLM again.
+    content_hash: str | None = None
+    summarization: ArticleSummarization | None = None
+
+
+class JournalInput(BaseModel):
+    """A line of the job journal with the progress of reading the input of the job."""
+
+    # The absolute path of the file with the URLs. None for the standard input and the `--urls`
+    # list, which can't be read again.
+    path: str | None = None
+    # The number of the input lines whose URLs are recorded before this line.
+    lines: int
+    complete: bool = False
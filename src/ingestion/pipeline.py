@@ -0,0 +1,246 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Self
+
+from src.metrics import Reservoir, metrics, percentile
+from src.scraping.errors import ExtractionError
+
+StageHandler = Callable[[Any], Awaitable[Any | None]]
+ErrorHandler = Callable[["Stage", Any, Exception], None]
+
+# Marks the end of the stream of items in a queue.
+_STOP = object()
+
+
+class Stage:
+    """A single step of the pipeline: a pool of workers that apply the same handler to every item.
+
+    The handler returns the item to pass to the next stage or None to drop it.
+    The stage keeps the time spent by the handler on every item."""
+
+    name: str
+    handler: StageHandler
+    workers: int
+
+    processed: int
+    dropped: int
+    failed: int
+    latencies: Reservoir
+
+    def __init__(self, name: str, handler: StageHandler, workers: int = 1):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.latencies = Reservoir()
+
+        self._started: float | None = None
+        self._finished: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        """The time between the start of the first item and the end of the last one."""
+        if self._started is None or self._finished is None:
+            return 0.0
+        return self._finished - self._started
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "elapsed": self.elapsed,
+            "throughput": self.processed / self.elapsed if self.elapsed else 0.0,
+            "latency_p50": percentile(self.latencies, 50),
+            "latency_p99": percentile(self.latencies, 99),
+        }
+
+
+class Pipeline:
+    """Run a chain of stages concurrently, connecting them with bounded queues.
+
+    Items are fed with `put` and flow through the stages as soon as a worker is available,
+    so the first results are produced without waiting for the whole input to be processed.
+    The bounded queues apply backpressure: `put` waits while the first stage is saturated.
+    The items that failed in any stage with an `ExtractionError` or one of the `errors` are reported
+    to `on_error`. Any other exception is a bug of a handler: it stops the pipeline and is raised
+    by `put` and `join`.
+    """
+
+    stages: list[Stage]
+    queue_size: int
+    errors: tuple[type[Exception], ...]
+    on_error: ErrorHandler | None
+    error: BaseException | None
+
+    processed: int
+    failed: int
+
+    def __init__(
+        self,
+        stages: list[Stage],
+        queue_size: int = 64,
+        errors: tuple[type[Exception], ...] = (),
+        on_error: ErrorHandler | None = None,
+    ):
+        if not stages:
+            raise ValueError("A pipeline requires at least one stage.")
+
+        self.stages = stages
+        self.queue_size = queue_size
+        self.errors = errors
+        self.on_error = on_error
+        self.error = None
+
+        self.processed = 0
+        self.failed = 0
+
+        self._queues: list[asyncio.Queue] = []
+        self._tasks: list[asyncio.Task] = []
+
+    async def __aenter__(self) -> Self:
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.join()
+        else:
+            await self.cancel()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return the number of items, the throughput and the latency of every stage."""
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def start(self) -> None:
+        """Create the queues and spawn the workers of every stage."""
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+
+        for index, stage in enumerate(self.stages):
+            inbox = self._queues[index]
+            outbox = self._queues[index + 1] if index + 1 < len(self.stages) else None
+
+            task = asyncio.create_task(
+                self._run_stage(stage, inbox, outbox), name=f"stage-{stage.name}"
+            )
+            task.add_done_callback(self._stage_done)
+            self._tasks.append(task)
+
+    async def put(self, item: Any) -> None:
+        """Feed an item to the first stage, waiting if its queue is full."""
+        if self.error is not None:
+            raise self.error
+        await self._queues[0].put(item)
+
+    async def join(self) -> None:
+        """Close the input and wait until every item went through all the stages."""
+        await self.put(_STOP)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.error is not None:
+            raise self.error
+
+    async def cancel(self) -> None:
+        """Stop all the workers, dropping the items that are still in the queues."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run_stage(
+        self, stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue | None
+    ) -> None:
+        workers = [
+            asyncio.create_task(self._run_worker(stage, inbox, outbox))
+            for _ in range(stage.workers)
+        ]
+
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # A worker was cancelled or failed, so its siblings are stopped as well.
+            for worker in workers:
+                worker.cancel()
+
+        # All the workers are done, so the end of the stream can be passed further.
+        if outbox is not None:
+            await outbox.put(_STOP)
+
+    async def _run_worker(
+        self, stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue | None
+    ) -> None:
+        while True:
+            item = await inbox.get()
+
+            if item is _STOP:
+                # Let the sibling workers of the same stage see the end of the stream as well.
+                inbox.put_nowait(_STOP)
+                return
+
+            started = time.perf_counter()
+            if stage._started is None:
+                stage._started = started
+
+            try:
+                result = await stage.handler(item)
+            except ExtractionError as e:
+                print(f"[{stage.name}] {e}")
+                self.failed += 1
+                stage.failed += 1
+                metrics.counter("errors", stage=stage.name, kind=e.kind).inc()
+                self._report_error(stage, item, e)
+                continue
+            except self.errors as e:
+                print(
+                    f"[{stage.name}] Error processing {item}: {type(e).__name__}: {e}"
+                )
+                self.failed += 1
+                stage.failed += 1
+                metrics.counter("errors", stage=stage.name, kind=type(e).__name__).inc()
+                self._report_error(stage, item, e)
+                continue
+            except Exception as e:
+                print(
+                    f"[{stage.name}] Unexpected error processing {item}: {type(e).__name__}: {e}. "
+                    "Stopping the pipeline."
+                )
+                raise
+            finally:
+                stage._finished = time.perf_counter()
+                stage.latencies.append(stage._finished - started)
+
+            if result is None:
+                stage.dropped += 1
+                continue
+
+            stage.processed += 1
+
+            if outbox is None:
+                self.processed += 1
+            else:
+                await outbox.put(result)
+
+    def _stage_done(self, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is None:
+            return
+
+        if self.error is None:
+            self.error = task.exception()
+        for other in self._tasks:
+            other.cancel()
+
+        # Nothing reads the input anymore, so the producer waiting for room in it is woken up.
+        while not self._queues[0].empty():
+            self._queues[0].get_nowait()
+
+    def _report_error(self, stage: Stage, item: Any, error: Exception) -> None:
+        if self.on_error is None:
+            return
+
+        try:
+            self.on_error(stage, item, error)
+        except (OSError, ValueError) as e:
+            print(f"[{stage.name}] Error reporting the failure of {item}: {e}")
@@ -0,0 +1,98 @@
+import asyncio
+import gzip
+import sys
+from collections.abc import AsyncIterator, Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
+
+from src.scraping.utils import UrlValidator
+
+from .journal import Journal
+from .selection import select_urls
+
+if TYPE_CHECKING:
+    from src.storage import AsyncDatabase
+
+
+def open_urls_file(path: Path) -> TextIO:
+    """Open a file with a URL per line: `-` is the standard input and `.gz` files are decompressed."""
+    if str(path) == "-":
+        return sys.stdin
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def chunks(lines: Iterable[str], size: int) -> Iterator[list[str]]:
+    iterator = iter(lines)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+async def read_chunks(lines: Iterable[str], size: int) -> AsyncIterator[list[str]]:
+    """Read the lines in chunks of the given size without blocking the event loop.
+
+    Only one chunk is read at a time, so the memory doesn't depend on the size of the input."""
+    iterator = chunks(lines, size)
+
+    while chunk := await asyncio.to_thread(next, iterator, None):
+        yield chunk
+
+
+class UrlsReader:
+    """Read the URLs of a job in chunks: validate them, drop the stored ones and queue them in the journal.
+
+    The number of the input lines read is recorded in the journal after the URLs queued from them,
+    so a resumed job continues reading its file at `offset`, right after the last recorded chunk."""
+
+    path: str | None
+    offset: int
+    journal: Journal | None
+    refresh_older_than: float | None
+    database: "AsyncDatabase | None"
+    validator: UrlValidator
+
+    # The number of the URLs skipped as they are already stored.
+    stored: int
+
+    def __init__(
+        self,
+        lines: Iterable[str],
+        path: str | None = None,
+        offset: int = 0,
+        journal: Journal | None = None,
+        refresh_older_than: float | None = None,
+        database: "AsyncDatabase | None" = None,
+    ):
+        # The lines read before are skipped by the first read of the chunks, in a thread.
+        self._lines = islice(lines, offset, None) if offset else lines
+        self.path = path
+        self.offset = offset
+        self.journal = journal
+        self.refresh_older_than = refresh_older_than
+        # The stored URLs are looked up in the given database, e.g. through the writer process.
+        self.database = database
+        self.validator = UrlValidator()
+        self.stored = 0
+
+    async def chunks(self, size: int) -> AsyncIterator[list[str]]:
+        """Yield the URLs to ingest from every chunk of `size` lines."""
+        async for lines in read_chunks(self._lines, size):
+            self.offset += len(lines)
+            chunk = self.validator.validate(lines)
+
+            # The URLs queued before the job was interrupted are resumed from its journal.
+            if self.journal is not None and self.journal.records:
+                chunk = [url for url in chunk if url not in self.journal.records]
+
+            selected = await select_urls(chunk, self.refresh_older_than, self.database)
+            self.stored += len(chunk) - len(selected)
+
+            if self.journal is not None:
+                self.journal.queue(selected)
+                self.journal.record_input(self.path, self.offset)
+            yield selected
+
+        if self.journal is not None:
+            self.journal.record_input(self.path, self.offset, complete=True)
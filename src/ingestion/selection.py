@@ -0,0 +1,53 @@
+import asyncio
+import re
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.storage import AsyncDatabase
+
+DURATION_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*$")
+DURATION_UNITS: dict[str, int] = {
+    "": 1,
+    "s": 1,
+    "m": 60,
+    "h": 60 * 60,
+    "d": 24 * 60 * 60,
+    "w": 7 * 24 * 60 * 60,
+}
+
+
+def parse_duration(value: str) -> float:
+    """Parse a duration like `90`, `30m`, `12h` or `7d` to seconds."""
+    match = DURATION_PATTERN.match(value.lower())
+    if match is None:
+        raise ValueError(
+            f"Invalid duration: '{value}'. Use a number with an optional unit (s, m, h, d, w)."
+        )
+
+    number, unit = match.groups()
+    return float(number) * DURATION_UNITS[unit]
+
+
+async def select_urls(
+    urls: list[str],
+    refresh_older_than: float | None = None,
+    database: "AsyncDatabase | None" = None,
+) -> list[str]:
+    """Drop the URLs of the articles that are already stored, checking all of them at once.
+
+    If `refresh_older_than` (seconds) is set, the articles stored earlier than that are kept,
+    so they are fetched again and updated if their content changed.
+    The database of this process is used unless another one is given."""
+    if database is not None:
+        ingested_at = await database.ingested_at(urls)
+    else:
+        from src.storage import get_database
+
+        ingested_at = await asyncio.to_thread(get_database().ingested_at, urls)
+
+    if refresh_older_than is None:
+        return [url for url in urls if url not in ingested_at]
+
+    threshold = time.time() - refresh_older_than
+    return [url for url in urls if ingested_at.get(url, 0.0) < threshold]
@@ -0,0 +1,861 @@
+import asyncio
+import hashlib
+import itertools
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection, wait
+from multiprocessing.process import BaseProcess
+from typing import Any, Self
+from urllib.parse import urlsplit
+
+from langchain_core.language_models import BaseChatModel
+
+from src.scraping.backend import ExtractionBackend
+from src.settings import settings
+from src.storage.models import Article
+from src.summarization.summarize import ArticleSummarization
+
+from .engine import ITEM_ERRORS, IngestionPipeline
+from .journal import FINAL_STATES, Journal
+from .models import IngestionItem, JobState
+
+# Ends the stream of messages of a pipe.
+_STOP = None
+# Stops the thread of a `Sender`.
+_CLOSE = object()
+
+
+def shard_of(url: str, shards: int) -> int:
+    """Return the shard of the URL by its hostname. It's the same in every process and run."""
+    hostname = (urlsplit(url).hostname or "").encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(hostname, digest_size=8).digest()) % shards
+
+
+class Sender:
+    """Send the messages to a pipe from a background thread, so the caller never waits for a full pipe."""
+
+    connection: Connection
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def send(self, message: Any) -> None:
+        self._queue.put(message)
+
+    def close(self) -> None:
+        """Send the remaining messages and stop the thread."""
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while (message := self._queue.get()) is not _CLOSE:
+            try:
+                self.connection.send(message)
+            except OSError:
+                # The process on the other side exited, its replacement gets the messages again.
+                return
+
+
+class WorkerJournal:
+    """The journal of a worker process: the records are sent to the coordinator that keeps the job journal."""
+
+    sender: Sender
+    # The summarizations of the resumed or retried URLs (URL -> content hash and summarization).
+    summarizations: dict[str, tuple[str | None, ArticleSummarization]]
+
+    def __init__(self, sender: Sender):
+        self.sender = sender
+        self.summarizations = {}
+
+    def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    def record(self, url: str, state: JobState, **fields: Any) -> None:
+        self.sender.send(("record", url, state, fields))
+
+    def summarization(
+        self, url: str, content_hash: str | None
+    ) -> ArticleSummarization | None:
+        stored_hash, summarization = self.summarizations.pop(url, (None, None))
+        if summarization is None or not content_hash or stored_hash != content_hash:
+            return None
+        return summarization
+
+
+class RemoteDatabase:
+    """The reads of the ingestion from the database of the writer process.
+
+    Only the writer process opens the database: several Chroma clients on the same directory
+    don't see the writes of each other in their in-memory indexes and may race on its files.
+    So the workers and the coordinator send their lookups to the writer instead, and `replied`
+    resolves them when the results come back."""
+
+    send: Callable[[Any], None]
+
+    def __init__(self, send: Callable[[Any], None]):
+        self.send = send
+
+        self._requests = itertools.count()
+        self._replies: dict[int, asyncio.Future] = {}
+
+    def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def _read(self, method: str, *args: Any) -> Any:
+        request = next(self._requests)
+        future = asyncio.get_running_loop().create_future()
+        self._replies[request] = future
+
+        self.send(("read", request, method, args))
+        try:
+            return await future
+        finally:
+            self._replies.pop(request, None)
+
+    def replied(self, request: int, result: Any, error: str | None) -> None:
+        future = self._replies.get(request)
+        if future is None or future.done():
+            return
+
+        if error is not None:
+            future.set_exception(RuntimeError(error))
+        else:
+            future.set_result(result)
+
+    async def find_duplicate(self, url: str, signature: bytes) -> Article | None:
+        return await self._read("find_duplicate", url, signature)
+
+    async def existing_ids(self, ids: list[str]) -> set[str]:
+        return await self._read("existing_ids", ids)
+
+    async def get_content_hashes(self, ids: list[str]) -> dict[str, str]:
+        return await self._read("get_content_hashes", ids)
+
+    async def ingested_at(self, ids: list[str]) -> dict[str, float]:
+        return await self._read("ingested_at", ids)
+
+
+class WorkerPipeline(IngestionPipeline):
+    """The ingestion pipeline of a worker process. Its batches are written by the writer process."""
+
+    sender: Sender
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        sender: Sender,
+        dry_run: bool = False,
+        journal: WorkerJournal | None = None,
+    ):
+        # The cores are used by the worker processes, so every worker parses its pages in threads.
+        super().__init__(
+            llm,
+            dry_run=dry_run,
+            journal=journal,
+            extractor=ExtractionBackend("thread", settings.extraction.workers or 1),
+            database=RemoteDatabase(sender.send),
+        )
+        self.sender = sender
+
+        self._batches = itertools.count()
+        self._writes: dict[int, asyncio.Future] = {}
+
+    async def write(self, items: list[IngestionItem]) -> None:
+        """Send the batch to the writer process and wait until it's written."""
+        batch = next(self._batches)
+        future = asyncio.get_running_loop().create_future()
+        self._writes[batch] = future
+
+        self.sender.send(
+            ("write", batch, [(item.document, item.summarization) for item in items])
+        )
+        try:
+            await future
+        finally:
+            self._writes.pop(batch, None)
+
+    def written(self, batch: int, error: str | None) -> None:
+        future = self._writes.get(batch)
+        if future is None or future.done():
+            return
+
+        if error is not None:
+            future.set_exception(RuntimeError(error))
+        else:
+            future.set_result(None)
+
+
+def run_worker(tasks: Connection, events: Connection, dry_run: bool) -> None:
+    """The entry point of a worker process: fetch, extract and summarize the URLs of its shard."""
+    # Ctrl+C is handled by the coordinator, which stops the workers itself.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        asyncio.run(_work(tasks, events, dry_run))
+    except asyncio.CancelledError:
+        pass
+
+
+async def _work(tasks: Connection, events: Connection, dry_run: bool) -> None:
+    from src.summarization import create_llm
+
+    loop = asyncio.get_running_loop()
+    main = asyncio.current_task()
+    sender = Sender(events)
+    journal = WorkerJournal(sender)
+    urls: asyncio.Queue = asyncio.Queue()
+
+    async with WorkerPipeline(
+        create_llm(), sender, dry_run=dry_run, journal=journal
+    ) as ingestion:
+
+        def dispatch(message: Any) -> None:
+            if message is _STOP:
+                urls.put_nowait(_STOP)
+                return
+
+            kind, *args = message
+            if kind == "urls":
+                for url, content_hash, summarization in args[0]:
+                    if summarization is not None:
+                        journal.summarizations[url] = (content_hash, summarization)
+                    urls.put_nowait(url)
+            elif kind == "written":
+                ingestion.written(*args)
+            elif kind == "result":
+                ingestion.database.replied(*args)
+
+        def receive() -> None:
+            # The replies of the writer keep coming after the end of the URLs, so the pipe is read until it's closed.
+            try:
+                while True:
+                    try:
+                        message = tasks.recv()
+                    except (EOFError, OSError):
+                        # The coordinator is gone, so there is no one to write the results.
+                        loop.call_soon_threadsafe(main.cancel)
+                        return
+                    loop.call_soon_threadsafe(dispatch, message)
+            except RuntimeError:
+                # The event loop is already closed.
+                return
+
+        threading.Thread(target=receive, daemon=True).start()
+
+        while (url := await urls.get()) is not _STOP:
+            await ingestion.put(url)
+
+    sender.send(
+        (
+            "done",
+            {
+                "stages": ingestion.pipeline.stats(),
+                "llm": ingestion.summarizer.stats(),
+            },
+            ingestion.summarizer.report(),
+        )
+    )
+    sender.close()
+
+
+def run_writer(requests: Connection, replies: Connection) -> None:
+    """The entry point of the writer process, the only process that opens the database.
+
+    The batches that are already waiting are written together, up to `storage.batch_size` articles.
+    The reads of the workers and the coordinator are served by a pool of threads meanwhile.
+    An unexpected error stops the process, so the coordinator restarts it with its requests."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from src.storage import get_database
+
+    database = get_database()
+    sender = Sender(replies)
+    readers = ThreadPoolExecutor(
+        max_workers=settings.storage.read_workers, thread_name_prefix="db-reader"
+    )
+
+    def read(request: int, method: str, args: tuple) -> None:
+        try:
+            result = getattr(database, method)(*args)
+        except ITEM_ERRORS as e:
+            sender.send(("result", request, None, str(e) or type(e).__name__))
+        except BaseException as e:
+            sender.send(("result", request, None, f"Unexpected error: {e!r}"))
+            raise
+        else:
+            sender.send(("result", request, result, None))
+
+    def next_batch(block: bool) -> Any:
+        """Return the next batch to write, `_STOP` or None if there is none yet, serving the reads."""
+        while block or requests.poll():
+            try:
+                message = requests.recv()
+            except EOFError:
+                return _STOP
+            if message is _STOP:
+                return _STOP
+
+            kind, *args = message
+            if kind == "read":
+                readers.submit(read, *args)
+                continue
+            return args
+        return None
+
+    stopped = False
+    while not stopped:
+        message = next_batch(block=True)
+        if message is _STOP:
+            break
+
+        pending = [message]
+        while sum(len(items) for _, items in pending) < settings.storage.batch_size:
+            message = next_batch(block=False)
+            if message is None:
+                break
+            if message is _STOP:
+                stopped = True
+                break
+            pending.append(message)
+
+        items = [item for _, batch_items in pending for item in batch_items]
+        print(f"Saving {len(items)} summarized articles to the database...")
+
+        error: str | None = None
+        try:
+            database.add_many(items)
+        except ITEM_ERRORS as e:
+            error = str(e) or type(e).__name__
+            print(f"Unable to save {len(items)} articles: {error}")
+
+        for batch, _ in pending:
+            sender.send(("written", batch, error))
+
+    readers.shutdown(wait=True)
+    sender.close()
+    print(database.embedding_function.report())
+
+
+class ChildProcess:
+    """A worker or the writer process and the coordinator's ends of its pipes."""
+
+    shard: int | None
+    process: BaseProcess
+    sender: Sender
+    receiver: Connection
+
+    # Set when the process reported the end of its work, so its exit is not a crash.
+    finished: bool
+    # Set by the receiving thread, so the exited process is no longer watched.
+    exited: bool
+    stats: dict[str, Any] | None
+    report: str | None
+
+    def __init__(
+        self,
+        shard: int | None,
+        process: BaseProcess,
+        sender: Sender,
+        receiver: Connection,
+    ):
+        self.shard = shard
+        self.process = process
+        self.sender = sender
+        self.receiver = receiver
+
+        self.finished = False
+        self.exited = False
+        self.stats = None
+        self.report = None
+
+
+class ShardedIngestion:
+    """Run the ingestion in worker processes sharded by hostname, with a single writer process.
+
+    The coordinator (this process) sends every URL to the worker of its hostname, so the
+    per-host politeness limits (see `FetchSettings`) hold across the processes. The workers
+    fetch, extract and summarize the articles and their batches go through the coordinator
+    to the writer process, the only one that opens the database. The lookups of the workers
+    and of the coordinator itself (`database`) are sent to the writer the same way.
+    Every worker has at most `ingestion.process_queue_size` unfinished URLs, which applies
+    backpressure to `put`.
+
+    The coordinator keeps the job journal and reports the progress every
+    `ingestion.progress_interval` seconds. A crashed worker is restarted with the unfinished URLs
+    of its shard and the summaries it already got, a crashed writer is restarted with the batches
+    that were not written, up to `ingestion.max_restarts` times each."""
+
+    processes: int
+    dry_run: bool
+    journal: Journal | None
+    database: RemoteDatabase
+
+    workers: list[ChildProcess]
+    writer: ChildProcess | None
+
+    queued: int
+    states: dict[JobState, int]
+    restarts: int
+
+    def __init__(
+        self, processes: int, dry_run: bool = False, journal: Journal | None = None
+    ):
+        self.processes = processes
+        self.dry_run = dry_run
+        self.journal = journal
+        self.database = RemoteDatabase(self._read_own)
+
+        self.workers = []
+        self.writer = None
+
+        self.queued = 0
+        self.states = {}
+        self.restarts = 0
+
+        self._context = multiprocessing.get_context("spawn")
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        # The unfinished URLs of every shard with the summarization to reuse, if there is one.
+        self._pending: list[dict[str, tuple[str | None, Any]]] = [
+            {} for _ in range(processes)
+        ]
+        self._capacity = [asyncio.Event() for _ in range(processes)]
+        self._finished = [asyncio.Event() for _ in range(processes)]
+        self._restarts = [0] * processes
+        self._broken: set[int] = set()
+
+        # The batches sent to the writer: global ID -> the worker, its batch ID and the items.
+        self._batch_ids = itertools.count()
+        self._batches: dict[int, tuple[ChildProcess, int, list]] = {}
+        # The reads sent to the writer: global ID -> the worker (None for the coordinator),
+        # its request ID, the method and its arguments.
+        self._read_ids = itertools.count()
+        self._reads: dict[int, tuple[ChildProcess | None, int, str, tuple]] = {}
+        self._writer_restarts = 0
+        self._writer_broken = False
+        self._writer_stopping = False
+        self._writer_finished = asyncio.Event()
+
+        self._input_closed = False
+        self._closed = False
+        self._started = 0.0
+        self._receiver: threading.Thread | None = None
+        self._progress: asyncio.Task | None = None
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                await self.join()
+            else:
+                await self.terminate()
+        except BaseException:
+            # Interrupted while waiting for the workers, e.g. with Ctrl+C.
+            await self.terminate()
+            raise
+        finally:
+            await self.close()
+
+    @property
+    def processed(self) -> int:
+        return self.states.get("stored", 0) + self.states.get("skipped", 0)
+
+    @property
+    def failed(self) -> int:
+        return self.states.get("failed", 0)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._started = time.perf_counter()
+
+        if self.journal is not None:
+            self.journal.start()
+
+        self.writer = self._spawn_writer()
+        self.workers = [self._spawn_worker(shard) for shard in range(self.processes)]
+        print(f"Started {self.processes} worker processes and the writer process.")
+
+        self._receiver = threading.Thread(
+            target=self._receive, name="ingestion-coordinator", daemon=True
+        )
+        self._receiver.start()
+        self._progress = asyncio.create_task(self._report_progress())
+
+    async def put(self, url: str) -> None:
+        """Send the URL to the worker of its hostname, waiting while the worker has too many unfinished URLs."""
+        shard = shard_of(url, self.processes)
+        pending = self._pending[shard]
+
+        while (
+            len(pending) >= settings.ingestion.process_queue_size
+            and shard not in self._broken
+        ):
+            self._capacity[shard].clear()
+            await self._capacity[shard].wait()
+
+        self.queued += 1
+        if shard in self._broken:
+            self._record(url, "failed", {"reason": "The worker process crashed"})
+            return
+
+        content_hash, summarization = None, None
+        if self.journal is not None and (record := self.journal.records.get(url)):
+            content_hash, summarization = record.content_hash, record.summarization
+
+        pending[url] = (content_hash, summarization)
+        self.workers[shard].sender.send(("urls", [(url, content_hash, summarization)]))
+
+    async def join(self) -> None:
+        """Close the input, wait for the workers to finish their URLs and for the writer to write them."""
+        self._input_closed = True
+        for worker in self.workers:
+            worker.sender.send(_STOP)
+        await asyncio.gather(*(finished.wait() for finished in self._finished))
+
+        if self.writer is not None:
+            self._stop_writer()
+            await self._writer_finished.wait()
+
+    async def terminate(self) -> None:
+        """Stop the workers right away and let the writer write the batches it already got.
+
+        The unfinished URLs stay in the journal, so the job can be resumed."""
+        self._input_closed = True
+        for worker in self.workers:
+            worker.finished = True
+            worker.process.terminate()
+
+        if self.writer is not None:
+            self._stop_writer()
+            await asyncio.to_thread(self.writer.process.join, 30)
+            if self.writer.process.is_alive():
+                self.writer.process.terminate()
+
+    async def close(self) -> None:
+        self._closed = True
+
+        if self._progress is not None:
+            self._progress.cancel()
+            await asyncio.gather(self._progress, return_exceptions=True)
+        if self._receiver is not None:
+            await asyncio.to_thread(self._receiver.join)
+
+        for child in [*self.workers, self.writer]:
+            if child is not None:
+                await asyncio.to_thread(child.process.join)
+                child.receiver.close()
+
+        if self.journal is not None:
+            await self.journal.close()
+
+    def progress(self) -> str:
+        """Return the number of the finished URLs of all the workers and their throughput."""
+        finished = sum(self.states.get(state, 0) for state in FINAL_STATES)
+        elapsed = time.perf_counter() - self._started
+        alive = sum(
+            worker.process.is_alive() and not worker.finished for worker in self.workers
+        )
+
+        return (
+            f"Progress: {finished}/{self.queued} URLs finished ("
+            + ", ".join(
+                f"{self.states.get(state, 0)} {state}"
+                for state in ("stored", "skipped", "failed")
+            )
+            + f"), {finished / elapsed if elapsed else 0.0:.1f} URLs/s, "
+            f"{alive}/{self.processes} workers running, {self.restarts} restarts."
+        )
+
+    def report(self) -> str:
+        """Return the progress and the LLM report of every worker."""
+        return "\n".join(
+            [
+                self.progress(),
+                *(
+                    f"Worker {worker.shard}: {worker.report}"
+                    for worker in self.workers
+                    if worker.report
+                ),
+            ]
+        )
+
+    def stats(self) -> list[dict[str, Any] | None]:
+        """Return the stage and the LLM statistics of every worker."""
+        return [worker.stats for worker in self.workers]
+
+    async def _report_progress(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ingestion.progress_interval)
+            print(self.progress())
+
+    def _spawn(self, target, name: str, shard: int | None) -> ChildProcess:
+        # The coordinator sends on the first pipe and receives from the second one.
+        child_receiver, sender = self._context.Pipe(duplex=False)
+        receiver, child_sender = self._context.Pipe(duplex=False)
+
+        args = (child_receiver, child_sender)
+        if shard is not None:
+            args += (self.dry_run,)
+
+        process = self._context.Process(
+            target=target, args=args, name=name, daemon=True
+        )
+        process.start()
+
+        # Only the child keeps its ends, so its exit closes the pipes.
+        child_receiver.close()
+        child_sender.close()
+
+        return ChildProcess(shard, process, Sender(sender), receiver)
+
+    def _spawn_worker(self, shard: int) -> ChildProcess:
+        return self._spawn(run_worker, f"ingestion-worker-{shard}", shard)
+
+    def _spawn_writer(self) -> ChildProcess:
+        return self._spawn(run_writer, "ingestion-writer", None)
+
+    def _receive(self) -> None:
+        """Read the messages and watch the exits of the child processes until the coordinator is closed.
+
+        It runs in a thread and hands everything over to the event loop."""
+        while not self._closed:
+            children = [
+                child
+                for child in [*self.workers, self.writer]
+                if child is not None and not child.exited
+            ]
+            waiting: dict[Any, ChildProcess] = {}
+            for child in children:
+                waiting[child.receiver] = child
+                waiting[child.process.sentinel] = child
+
+            for ready in wait(list(waiting), timeout=0.2):
+                child = waiting[ready]
+                if child.exited:
+                    continue
+
+                if ready is child.receiver:
+                    try:
+                        message = child.receiver.recv()
+                    except (EOFError, OSError):
+                        continue
+                    self._loop.call_soon_threadsafe(self._handle, child, message)
+                    continue
+
+                # The messages sent before the exit are handled first.
+                try:
+                    while child.receiver.poll():
+                        self._loop.call_soon_threadsafe(
+                            self._handle, child, child.receiver.recv()
+                        )
+                except (EOFError, OSError):
+                    pass
+
+                # The process has exited, so this only collects its exit code.
+                child.process.join()
+                child.exited = True
+                self._loop.call_soon_threadsafe(self._exited, child)
+
+    def _handle(self, child: ChildProcess, message: Any) -> None:
+        kind, *args = message
+
+        if kind == "record":
+            url, state, fields = args
+            self._record(url, state, fields, child.shard)
+        elif kind == "write":
+            batch, items = args
+            self._write(child, batch, items)
+        elif kind == "written":
+            batch, error = args
+            self._written(batch, error)
+        elif kind == "read":
+            request, method, read_args = args
+            self._read(child, request, method, read_args)
+        elif kind == "result":
+            read_id, result, error = args
+            self._read_done(read_id, result, error)
+        elif kind == "done":
+            child.finished = True
+            child.stats, child.report = args
+
+    def _record(
+        self,
+        url: str,
+        state: JobState,
+        fields: dict[str, Any],
+        shard: int | None = None,
+    ) -> None:
+        if self.journal is not None:
+            self.journal.record(url, state, **fields)
+        self.states[state] = self.states.get(state, 0) + 1
+
+        if shard is None:
+            return
+
+        pending = self._pending[shard]
+        if state in FINAL_STATES:
+            pending.pop(url, None)
+            self._capacity[shard].set()
+        elif fields.get("summarization") is not None and url in pending:
+            # A restarted worker reuses the summarization instead of requesting the LLM again.
+            pending[url] = (fields.get("content_hash"), fields["summarization"])
+
+    def _write(self, worker: ChildProcess, batch: int, items: list) -> None:
+        if self._writer_broken:
+            self._reply(worker, batch, "The writer process crashed")
+            return
+
+        batch_id = next(self._batch_ids)
+        self._batches[batch_id] = (worker, batch, items)
+        self.writer.sender.send(("write", batch_id, items))
+
+    def _written(self, batch_id: int, error: str | None) -> None:
+        entry = self._batches.pop(batch_id, None)
+        if entry is not None:
+            worker, batch, _ = entry
+            self._reply(worker, batch, error)
+
+    def _reply(self, worker: ChildProcess, batch: int, error: str | None) -> None:
+        # The replies to a crashed worker are dropped, its replacement processes the URLs again.
+        if self.workers[worker.shard] is worker and not worker.exited:
+            worker.sender.send(("written", batch, error))
+
+    def _read_own(self, message: Any) -> None:
+        _, request, method, args = message
+        self._read(None, request, method, args)
+
+    def _read(
+        self, worker: ChildProcess | None, request: int, method: str, args: tuple
+    ) -> None:
+        if self._writer_broken:
+            self._read_reply(worker, request, None, "The writer process crashed")
+            return
+
+        read_id = next(self._read_ids)
+        self._reads[read_id] = (worker, request, method, args)
+        self.writer.sender.send(("read", read_id, method, args))
+
+    def _read_done(self, read_id: int, result: Any, error: str | None) -> None:
+        entry = self._reads.pop(read_id, None)
+        if entry is not None:
+            worker, request, _, _ = entry
+            self._read_reply(worker, request, result, error)
+
+    def _read_reply(
+        self, worker: ChildProcess | None, request: int, result: Any, error: str | None
+    ) -> None:
+        if worker is None:
+            self.database.replied(request, result, error)
+        elif self.workers[worker.shard] is worker and not worker.exited:
+            worker.sender.send(("result", request, result, error))
+
+    def _exited(self, child: ChildProcess) -> None:
+        child.sender.close()
+
+        if child is self.writer:
+            self._writer_exited(child)
+        else:
+            self._worker_exited(child)
+
+    def _worker_exited(self, worker: ChildProcess) -> None:
+        shard = worker.shard
+
+        if worker.finished:
+            self._finished[shard].set()
+            return
+
+        pending = self._pending[shard]
+        print(
+            f"The worker process {shard} exited with the code {worker.process.exitcode} "
+            f"and {len(pending)} unfinished URLs."
+        )
+
+        if self._restarts[shard] >= settings.ingestion.max_restarts:
+            print(
+                f"The worker process {shard} crashed {self._restarts[shard] + 1} times. "
+                "Its URLs are marked as failed."
+            )
+            self._broken.add(shard)
+            for url in list(pending):
+                self._record(
+                    url, "failed", {"reason": "The worker process crashed"}, shard
+                )
+            pending.clear()
+            self._capacity[shard].set()
+            self._finished[shard].set()
+            return
+
+        self._restarts[shard] += 1
+        self.restarts += 1
+
+        replacement = self._spawn_worker(shard)
+        self.workers[shard] = replacement
+
+        if pending:
+            replacement.sender.send(
+                (
+                    "urls",
+                    [
+                        (url, content_hash, summarization)
+                        for url, (content_hash, summarization) in pending.items()
+                    ],
+                )
+            )
+        if self._input_closed:
+            replacement.sender.send(_STOP)
+
+    def _stop_writer(self) -> None:
+        self._writer_stopping = True
+        self.writer.finished = True
+        self.writer.sender.send(_STOP)
+
+    def _writer_exited(self, writer: ChildProcess) -> None:
+        if writer.finished and writer.process.exitcode == 0:
+            self._writer_finished.set()
+            return
+
+        print(
+            f"The writer process exited with the code {writer.process.exitcode}, "
+            f"{len(self._batches)} batches not written and {len(self._reads)} reads not served."
+        )
+
+        if self._writer_restarts >= settings.ingestion.max_restarts:
+            print(
+                f"The writer process crashed {self._writer_restarts + 1} times. "
+                "The articles are no longer saved."
+            )
+            self._writer_broken = True
+            for batch_id in list(self._batches):
+                self._written(batch_id, "The writer process crashed")
+            for read_id in list(self._reads):
+                self._read_done(read_id, None, "The writer process crashed")
+            self._writer_finished.set()
+            return
+
+        self._writer_restarts += 1
+        self.restarts += 1
+
+        self.writer = self._spawn_writer()
+        for batch_id, (_, _, items) in self._batches.items():
+            self.writer.sender.send(("write", batch_id, items))
+        for read_id, (_, _, method, args) in self._reads.items():
+            self.writer.sender.send(("read", read_id, method, args))
+        if self._writer_stopping:
+            self._stop_writer()
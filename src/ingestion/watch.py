@@ -0,0 +1,248 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from urllib.parse import urlsplit
+
+from src.metrics import metrics
+from src.scraping.errors import ExtractionError
+from src.scraping.sources import SourceKind, parse_source
+from src.scraping.utils import UrlValidator
+from src.settings import settings
+
+from .engine import ITEM_ERRORS, IngestionPipeline
+from .selection import select_urls
+
+# The failures of a single poll: the fetch, the parsing of the source and the lookup of the
+# stored articles. Any other exception (e.g. of a stopped pipeline) stops the watcher.
+POLL_ERRORS: tuple[type[Exception], ...] = (ExtractionError, *ITEM_ERRORS)
+
+
+class Source:
+    """A watched page, feed or sitemap and the state of its polling."""
+
+    url: str
+    hostname: str
+    kind: SourceKind | None
+
+    interval: float
+    next_poll: float
+
+    polls: int
+    articles: int
+    failures: int
+
+    def __init__(self, url: str, interval: float):
+        self.url = url
+        self.hostname = urlsplit(url).hostname or ""
+        self.kind = None
+
+        self.interval = interval
+        self.next_poll = 0.0
+
+        self.polls = 0
+        self.articles = 0
+        # The number of the consecutive failed polls.
+        self.failures = 0
+
+
+class Watcher:
+    """Poll the sources for new articles and feed them to a long-lived ingestion pipeline.
+
+    The sources are kept in a priority queue by the time of their next poll. The interval of
+    every source adapts to how often it yields new articles (see `WatchSettings`), the polls of
+    the same hostname are spaced by `watch.host_interval` and the failed sources back off
+    exponentially. Only the article URLs that weren't seen before and aren't stored are ingested.
+    The connections of the fetcher and the database of the pipeline stay open between the polls.
+    An unexpected error of a poll stops the watcher and is raised by `run`.
+    """
+
+    ingestion: IngestionPipeline
+    sources: dict[str, Source]
+    validator: UrlValidator
+
+    polls: int
+    queued: int
+    failed: int
+    error: BaseException | None
+
+    def __init__(self, ingestion: IngestionPipeline):
+        self.ingestion = ingestion
+        self.sources = {}
+        # Remembers the recent article URLs, so the ones listed on every poll are skipped without
+        # a database lookup. The forgotten ones are still skipped by `select_urls` once stored.
+        self.validator = UrlValidator(settings.watch.seen_urls)
+
+        self.polls = 0
+        self.queued = 0
+        self.failed = 0
+        self.error = None
+
+        self._queue: list[tuple[float, int, Source]] = []
+        self._order = itertools.count()
+        # The time of the next allowed poll of every hostname.
+        self._hosts: dict[str, float] = {}
+        self._semaphore = asyncio.Semaphore(settings.watch.concurrency)
+        self._tasks: set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+
+    def add(self, url: str) -> bool:
+        """Start watching the source, polling it right away. Return False if it's already watched."""
+        if url in self.sources:
+            return False
+
+        source = Source(url, settings.watch.interval)
+        self.sources[url] = source
+        self._schedule(source, time.monotonic())
+        return True
+
+    async def run(self) -> None:
+        """Poll the sources when they are due until the watcher is cancelled."""
+        try:
+            while True:
+                if self.error is not None:
+                    raise self.error
+
+                if not self._queue:
+                    await self._wait(None)
+                    continue
+
+                now = time.monotonic()
+                next_poll, _, source = self._queue[0]
+                if next_poll > now:
+                    await self._wait(next_poll - now)
+                    continue
+
+                heapq.heappop(self._queue)
+
+                allowed = self._hosts.get(source.hostname, 0.0)
+                if allowed > now:
+                    self._schedule(source, allowed)
+                    continue
+                self._hosts[source.hostname] = now + settings.watch.host_interval
+
+                await self._semaphore.acquire()
+                task = asyncio.create_task(self._poll(source))
+                self._tasks.add(task)
+                task.add_done_callback(self._poll_done)
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def poll(self, source: Source) -> int:
+        """Fetch the source and queue its new articles for the ingestion. Return their number."""
+        result = await self.ingestion.fetcher.fetch_url(
+            source.url, settings.watch.content_types
+        )
+
+        # The cached body is parsed on the first poll, as its articles may not be known to this run.
+        if result.not_modified and source.polls:
+            return 0
+
+        links = await asyncio.to_thread(
+            parse_source, source.url, result.html, settings.watch.link_pattern
+        )
+        source.kind = links.kind
+
+        # The sitemaps of a sitemap index are watched as separate sources.
+        for url in links.sources:
+            if self.add(url):
+                print(f"[{source.url}] Watching the sitemap '{url}'.")
+
+        urls = await select_urls(
+            self.validator.validate(links.articles), database=self.ingestion.database
+        )
+        if not urls:
+            return 0
+
+        if self.ingestion.journal is not None:
+            self.ingestion.journal.queue(urls)
+        for url in urls:
+            await self.ingestion.put(url)
+
+        return len(urls)
+
+    async def _poll(self, source: Source) -> None:
+        try:
+            try:
+                articles = await self.poll(source)
+            except POLL_ERRORS as e:
+                self.failed += 1
+                source.failures += 1
+                metrics.counter("watch_polls", result="failed").inc()
+                delay = self._reschedule(source, None)
+                print(
+                    f"[{source.url}] Unable to poll the source: {e}. Retrying in {delay:.0f}s."
+                )
+                return
+
+            self.polls += 1
+            self.queued += articles
+            source.articles += articles
+            source.failures = 0
+            metrics.counter("watch_polls", result="ok").inc()
+            metrics.counter("watch_articles").inc(articles)
+
+            delay = self._reschedule(source, articles)
+            if articles:
+                print(
+                    f"[{source.url}] Found {articles} new articles. Next poll in {delay:.0f}s."
+                )
+        finally:
+            source.polls += 1
+            self._semaphore.release()
+
+    def _poll_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if task.cancelled() or task.exception() is None or self.error is not None:
+            return
+
+        self.error = task.exception()
+        self._wakeup.set()
+
+    def _reschedule(self, source: Source, articles: int | None) -> float:
+        """Adapt the interval of the source to the result of its poll and schedule the next one."""
+        # The first poll finds all the articles of the source, so it says nothing about its rate.
+        if articles is not None and source.polls:
+            factor = (
+                settings.watch.interval_decrease
+                if articles
+                else settings.watch.interval_increase
+            )
+            source.interval = min(
+                settings.watch.max_interval,
+                max(settings.watch.min_interval, source.interval * factor),
+            )
+
+        delay = source.interval
+        if source.failures:
+            delay = min(
+                settings.watch.max_interval,
+                delay * 2 ** min(source.failures, 16),
+            )
+
+        # The jitter spreads the polls of the sources added at the same time.
+        delay *= random.uniform(0.9, 1.1)
+        self._schedule(source, time.monotonic() + delay)
+        return delay
+
+    def _schedule(self, source: Source, next_poll: float) -> None:
+        source.next_poll = next_poll
+        heapq.heappush(self._queue, (next_poll, next(self._order), source))
+        self._wakeup.set()
+
+    async def _wait(self, timeout: float | None) -> None:
+        """Wait until the timeout or until a source is scheduled."""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except TimeoutError:
+            pass
+
+    def report(self) -> str:
+        return (
+            f"Watched {len(self.sources)} sources: {self.polls} polls, {self.failed} failed, "
+            f"{self.queued} new articles queued."
+        )
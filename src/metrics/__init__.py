@@ -0,0 +1,16 @@
+from .profiling import profile
+from .registry import Counter, Histogram, Metrics, Reservoir, Timer, percentile
+
+# The metrics of the current process.
+metrics = Metrics()
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "Metrics",
+    "Reservoir",
+    "Timer",
+    "metrics",
+    "percentile",
+    "profile",
+]
@@ -0,0 +1,23 @@
+import cProfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def profile(path: str | Path | None) -> Iterator[None]:
+    """Profile the block with cProfile and dump the stats to the path (read them with `pstats`).
+
+    The extraction worker processes aren't profiled, their time is reported by the `extract` timer."""
+    if path is None:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(path))
+        print(f"Profile saved to {path}. Inspect it with `python -m pstats {path}`.")
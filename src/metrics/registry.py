@@ -0,0 +1,379 @@
+import bisect
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """Return the q-th percentile (0-100) of the values using the nearest-rank method."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Reservoir:
+    """A uniform random sample of at most `size` values of a stream (Vitter's algorithm R).
+
+    The percentiles of the sample estimate the percentiles of the stream in constant memory,
+    while the number, the sum and the maximum of the values are exact."""
+
+    size: int
+    count: int
+    total: float
+    max: float
+
+    def __init__(self, size: int = 10_000):
+        self.size = size
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._values = array("d")
+
+    def append(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+        if len(self._values) < self.size:
+            self._values.append(value)
+            return
+
+        index = random.randrange(self.count)
+        if index < self.size:
+            self._values[index] = value
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self._values)
+
+
+class Counter:
+    """A value that only grows: the number of events or the amount of something (bytes, tokens)."""
+
+    name: str
+    labels: dict[str, str]
+    value: int | float
+
+    def __init__(self, name: str, labels: dict[str, str], lock: threading.Lock):
+        self.name = name
+        self.labels = labels
+        self.value = 0
+        self._lock = lock
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Timer:
+    """The durations (seconds) of the calls of an operation."""
+
+    name: str
+    values: Reservoir
+
+    def __init__(self, name: str, lock: threading.Lock):
+        self.name = name
+        self.values = Reservoir()
+        self._lock = lock
+
+    @property
+    def count(self) -> int:
+        return self.values.count
+
+    @property
+    def total(self) -> float:
+        return self.values.total
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.values.append(seconds)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            values = list(self.values)
+            count, total, maximum = self.count, self.total, self.values.max
+
+        return {
+            "count": count,
+            "total": total,
+            "mean": total / count if count else 0.0,
+            "p50": percentile(values, 50),
+            "p99": percentile(values, 99),
+            "max": maximum,
+        }
+
+
+# The upper bounds (seconds) of the latency histogram buckets, from a millisecond to ten seconds.
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """The number of observed durations (seconds) in every bucket of a fixed set.
+
+    Unlike the timer percentiles, the buckets of many processes and time windows can be added up,
+    so they are exported to Prometheus as a histogram."""
+
+    name: str
+    labels: dict[str, str]
+    buckets: tuple[float, ...]
+    counts: list[int]
+    count: int
+    total: float
+
+    def __init__(
+        self,
+        name: str,
+        labels: dict[str, str],
+        buckets: tuple[float, ...],
+        lock: threading.Lock,
+    ):
+        self.name = name
+        self.labels = labels
+        self.buckets = buckets
+        # The last count is the `+Inf` bucket.
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._lock = lock
+
+    def observe(self, seconds: float) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """Return the number of the values up to every bucket bound, as Prometheus expects."""
+        result: list[tuple[str, int]] = []
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts, strict=True):
+            total += count
+            result.append((str(bound), total))
+
+        return result
+
+
+class Metrics:
+    """A registry of the counters, the timers and the histograms of a run.
+
+    The metrics are kept in the memory of the process and exported at the end of the run
+    as a JSON summary or a Prometheus textfile (for the node exporter textfile collector)."""
+
+    namespace: str
+
+    def __init__(self, namespace: str = "news_scraper"):
+        self.namespace = namespace
+
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, tuple[tuple[str, str], ...]], Counter] = {}
+        self._timers: dict[str, Timer] = {}
+        self._histograms: dict[tuple[str, tuple[tuple[str, str], ...]], Histogram] = {}
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            if key not in self._counters:
+                self._counters[key] = Counter(name, labels, self._lock)
+            return self._counters[key]
+
+    def timer(self, name: str) -> Timer:
+        with self._lock:
+            if name not in self._timers:
+                self._timers[name] = Timer(name, self._lock)
+            return self._timers[name]
+
+    def histogram(
+        self, name: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **labels: str
+    ) -> Histogram:
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram(name, labels, buckets, self._lock)
+            return self._histograms[key]
+
+    def timed(self, name: str) -> Callable[[Callable], Callable]:
+        """Decorate a function or a coroutine function to record the duration of every call."""
+
+        def decorator(function: Callable) -> Callable:
+            timer = self.timer(name)
+
+            if inspect.iscoroutinefunction(function):
+
+                @functools.wraps(function)
+                async def async_wrapper(*args, **kwargs):
+                    with timer.time():
+                        return await function(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with timer.time():
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+            self._histograms.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        counters: dict[str, Any] = {}
+        for counter in self._counters.values():
+            if not counter.labels:
+                counters[counter.name] = counter.value
+                continue
+
+            label = ",".join(f"{key}={value}" for key, value in counter.labels.items())
+            counters.setdefault(counter.name, {})[label] = counter.value
+
+        histograms: dict[str, Any] = {}
+        for histogram in self._histograms.values():
+            label = ",".join(
+                f"{key}={value}" for key, value in histogram.labels.items()
+            )
+            histograms.setdefault(histogram.name, {})[label] = {
+                "count": histogram.count,
+                "total": histogram.total,
+                "buckets": dict(histogram.cumulative()),
+            }
+
+        return {
+            "timers": {
+                name: timer.stats()
+                for name, timer in self._timers.items()
+                if timer.count
+            },
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def to_prometheus(self) -> str:
+        """Format the metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+
+        for name, timer in sorted(self._timers.items()):
+            if not timer.count:
+                continue
+
+            metric = f"{self.namespace}_{name}_seconds"
+            stats = timer.stats()
+
+            lines.append(f"# TYPE {metric} summary")
+            lines.append(f'{metric}{{quantile="0.5"}} {stats["p50"]}')
+            lines.append(f'{metric}{{quantile="0.99"}} {stats["p99"]}')
+            lines.append(f"{metric}_sum {stats['total']}")
+            lines.append(f"{metric}_count {stats['count']}")
+
+        names = sorted({counter.name for counter in self._counters.values()})
+        for name in names:
+            metric = f"{self.namespace}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+
+            for counter in self._counters.values():
+                if counter.name != name:
+                    continue
+
+                labels = ",".join(
+                    f'{key}="{value}"' for key, value in counter.labels.items()
+                )
+                lines.append(
+                    f"{metric}{{{labels}}} {counter.value}"
+                    if labels
+                    else f"{metric} {counter.value}"
+                )
+
+        names = sorted({histogram.name for histogram in self._histograms.values()})
+        for name in names:
+            metric = f"{self.namespace}_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+
+            for histogram in self._histograms.values():
+                if histogram.name != name:
+                    continue
+
+                labels = [f'{key}="{value}"' for key, value in histogram.labels.items()]
+                for bound, count in histogram.cumulative():
+                    bucket_labels = ",".join([*labels, f'le="{bound}"'])
+                    lines.append(f"{metric}_bucket{{{bucket_labels}}} {count}")
+
+                suffix = f"{{{','.join(labels)}}}" if labels else ""
+                lines.append(f"{metric}_sum{suffix} {histogram.total}")
+                lines.append(f"{metric}_count{suffix} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def report(self) -> str:
+        """Return a short report of the time spent in every timed operation."""
+        return "\n".join(
+            f"{name}: {stats['count']} calls, {stats['total']:.2f}s total, "
+            f"p50 {stats['p50']:.3f}s, p99 {stats['p99']:.3f}s"
+            for name, stats in (
+                (name, timer.stats())
+                for name, timer in self._timers.items()
+                if timer.count
+            )
+        )
+
+    def write_json(self, path: str | Path, **extra: Any) -> None:
+        Path(path).write_text(
+            json.dumps({**extra, "metrics": self.to_dict()}, indent=2)
+        )
+
+    def write_prometheus(self, path: str | Path) -> None:
+        # The collector may read the file at any moment, so it's replaced atomically.
+        temporary = f"{path}.tmp"
+        Path(temporary).write_text(self.to_prometheus())
+        os.replace(temporary, path)
@@ -1,5 +1,39 @@
-from .extractor import scrape_urls
-from .models import ArticleMetadata
-from .utils import validate_urls
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-__all__ = ["scrape_urls", "ArticleMetadata", "validate_urls"]
+if TYPE_CHECKING:
+    from .backend import ExtractionBackend
+    from .extractor import scrape_urls
+    from .fetcher import Fetcher
+    from .models import ArticleMetadata
+    from .sources import SourceLinks, parse_source
+    from .utils import UrlValidator, validate_urls
+
+# The submodules import aiohttp and trafilatura, so they are loaded on the first access to their names.
+_exports = {
+    "ExtractionBackend": ".backend",
+    "Fetcher": ".fetcher",
+    "scrape_urls": ".extractor",
+    "ArticleMetadata": ".models",
+    "SourceLinks": ".sources",
+    "parse_source": ".sources",
+    "UrlValidator": ".utils",
+    "validate_urls": ".utils",
+}
+
+__all__ = [
+    "ArticleMetadata",
+    "ExtractionBackend",
+    "Fetcher",
+    "SourceLinks",
+    "UrlValidator",
+    "parse_source",
+    "scrape_urls",
+    "validate_urls",
+]
+
+
+def __getattr__(name: str):
+    if name in _exports:
+        return getattr(import_module(_exports[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,89 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Literal, Self
+
+from langchain_core.documents import Document
+
+from src.metrics import metrics
+from src.settings import settings
+
+from .extractor import parse_html
+from .models import ArticleMetadata
+from .similarity import minhash
+
+ExtractionBackendKind = Literal["process", "thread", "inline"]
+
+
+def timed_parse_html(url: str, html: str) -> tuple[str, ArticleMetadata, float]:
+    """Parse the page and return the time spent on it, as it can't be recorded in a worker process.
+
+    The MinHash signature of the content is computed here as well, while it's still in the worker."""
+    start = time.perf_counter()
+    content, metadata = parse_html(url, html)
+    if settings.deduplication.enabled:
+        metadata["minhash"] = minhash(content)
+    return content, metadata, time.perf_counter() - start
+
+
+class ExtractionBackend:
+    """Run the CPU-bound HTML parsing outside of the event loop.
+
+    - `process` parses the pages in a pool of worker processes, so the extraction scales with cores.
+    - `thread` uses a thread pool. It doesn't block the event loop, but it is limited by the GIL.
+    - `inline` parses the pages directly in the event loop, which is mostly useful for debugging.
+    """
+
+    kind: ExtractionBackendKind
+    workers: int
+
+    executor: Executor | None
+
+    def __init__(
+        self,
+        kind: ExtractionBackendKind | None = None,
+        workers: int | None = None,
+    ):
+        self.kind = kind or settings.extraction.backend
+        self.workers = workers or settings.extraction.workers or os.cpu_count() or 1
+        self.executor = None
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def start(self) -> None:
+        if self.kind == "process":
+            # The 'spawn' context avoids forking a process that already runs the event loop threads.
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        elif self.kind == "thread":
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="extraction"
+            )
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    async def extract(self, url: str, html: str) -> Document:
+        """Extract the content and the metadata of a page as a Document."""
+        if self.executor is None:
+            content, metadata, elapsed = timed_parse_html(url, html)
+        else:
+            loop = asyncio.get_running_loop()
+            content, metadata, elapsed = await loop.run_in_executor(
+                self.executor, timed_parse_html, url, html
+            )
+
+        metrics.timer("extract").observe(elapsed)
+
+        return Document(content, metadata=metadata)
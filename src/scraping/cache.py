@@ -0,0 +1,42 @@
+import os
+
+from src.cache import DiskCache
+from src.settings import settings
+
+from .models import CachedResponse
+from .utils import normalize_url
+
+
+class ResponseCache:
+    """Keep the fetched pages with their ETag and Last-Modified headers for conditional requests.
+
+    The cache is stored next to the database, keyed by the normalized URL."""
+
+    storage: DiskCache
+
+    def __init__(self, path: str | None = None):
+        self.storage = DiskCache(
+            path or os.path.join(settings.storage.path, "http-cache.sqlite"),
+            ttl=settings.fetch.cache_ttl,
+            max_size=settings.fetch.cache_max_size,
+        )
+
+    def get(self, url: str) -> CachedResponse | None:
+        value = self.storage.get(normalize_url(url))
+
+        if value is None:
+            return None
+
+        return CachedResponse.model_validate_json(value)
+
+    def set(self, response: CachedResponse) -> None:
+        self.storage.set(
+            normalize_url(response.url), response.model_dump_json().encode()
+        )
+
+    def touch(self, url: str) -> None:
+        """Mark the cached page as revalidated."""
+        self.storage.touch(normalize_url(url))
+
+    def close(self) -> None:
+        self.storage.close()
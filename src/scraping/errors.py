@@ -1,10 +1,40 @@
+from typing import Literal
+
+# What went wrong: an error status of the server, a failed connection, a timeout,
+# a response that isn't a web page, a page over the size limit,
+# a page without the extractable content or an unexpected error.
+ExtractionErrorKind = Literal[
+    "status",
+    "connection",
+    "timeout",
+    "unsupported",
+    "too_large",
+    "content",
+    "unknown",
+]
+
+
 class ExtractionError(Exception):
     """Exception raised when the extraction of a URL fails."""
 
     url: str
     details: str
+    status: int | None
+    kind: ExtractionErrorKind
 
-    def __init__(self, url: str, details: str):
+    def __init__(
+        self,
+        url: str,
+        details: str,
+        status: int | None = None,
+        kind: ExtractionErrorKind | None = None,
+    ):
         self.url = url
         self.details = details
+        self.status = status
+        self.kind = kind or ("status" if status is not None else "unknown")
         super().__init__(f"Error extracting {url}: {details}")
+
+    def __reduce__(self):
+        # Keep the exception picklable, so it can be raised in a worker process.
+        return self.__class__, (self.url, self.details, self.status, self.kind)
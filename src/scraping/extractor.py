@@ -1,82 +1,88 @@
-import aiohttp
 import asyncio
 import re
-from trafilatura import extract, extract_metadata
+
 from langchain_core.documents import Document
+from trafilatura import bare_extraction
+
+from src.metrics import metrics
 
 from .errors import ExtractionError
+from .fetcher import Fetcher
 from .models import ArticleMetadata
+from .utils import fingerprint
 
 
-async def fetch_url(session: aiohttp.ClientSession, url: str) -> str:
-    """Fetch and clean content from a single URL."""
-    try:
-        async with session.get(url) as response:
-            if response.status == 200:
-                return await response.text(encoding="utf-8")
-            else:
-                raise ExtractionError(url, f"Status {response.status}")
-    except ExtractionError:
-        raise
-    except Exception as e:
-        raise ExtractionError(url, str(e))
-    
-def format_content(url: str, html: str):
-    """Format the content of a URL."""
+def parse_html(url: str, html: str) -> tuple[str, ArticleMetadata]:
+    """Extract the main content and the metadata of a page, parsing the HTML only once.
+
+    The function is self-contained and returns picklable values, so it can run in a worker process."""
 
-    # Extract main content using trafilatura
+    # Extract main content and metadata using trafilatura
     # This automatically removes boilerplate, ads, navigation, etc.
-    content = extract(
+    document = bare_extraction(
         html,
         url=url,
         favor_recall=True,
         include_comments=True,
         include_formatting=True,
-        output_format="markdown",
         include_links=True,
         include_tables=True,
-        include_images=False
+        include_images=False,
+        with_metadata=True,
     )
 
-    if content is None:
-        raise ExtractionError(url, "No content extracted")
-    
+    if document is None or not document.text:
+        raise ExtractionError(url, "No content extracted", kind="content")
+
+    content: str = document.text
+    # Only the leading whitespace is removed and the line breaks are replaced one for one below,
+    # so the comments start right after the stripped text.
+    comments_start: int | None = None
+    if document.comments:
+        content = f"{content}\n{document.comments}"
+        comments_start = len(document.text.lstrip())
+    content = content.strip()
+
     # Remove unintended line breaks, keeping double line breaks and lists
-    content = re.sub(r'(\w|[*_])\n(?![\n\s-])', r'\1 ', content)
+    content = re.sub(r"(\w|[*_])\n(?![\n\s-])", r"\1 ", content)
 
-    metadata = extract_metadata(html).as_dict()
     metadata = ArticleMetadata(
         url=url,
-        hostname=metadata.get("hostname"),
-        title=metadata.get("title"),
-        description=metadata.get("description"),
-        license=metadata.get("license"),
-        author=metadata.get("author")
+        hostname=document.hostname,
+        title=document.title,
+        description=document.description,
+        license=document.license,
+        author=document.author,
+        # The comments keep changing, so only the article itself says if its content changed.
+        content_hash=fingerprint(content[:comments_start]),
+        comments_start=comments_start,
     )
 
-    return Document(
-        content,
-        metadata=metadata
-    )
+    return content, metadata
+
+
+@metrics.timed("extract")
+def format_content(url: str, html: str) -> Document:
+    """Format the content of a URL."""
+    content, metadata = parse_html(url, html)
+
+    return Document(content, metadata=metadata)
+
 
 async def scrape_urls(urls: list[str]) -> list[Document]:
     """Scrape multiple URLs concurrently."""
-    # Configure client session with appropriate headers
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-
-    async with aiohttp.ClientSession(headers=headers) as session:
-        results = await asyncio.gather(*[fetch_url(session, url) for url in urls], return_exceptions=True)
+    async with Fetcher() as fetcher:
+        results = await asyncio.gather(
+            *[fetcher.fetch_url(url) for url in urls], return_exceptions=True
+        )
 
     documents: list[Document] = []
     for url, result in zip(urls, results, strict=True):
         if isinstance(result, ExtractionError):
             print(f"Error extracting {url}: {result}")
             continue
-        
-        document = format_content(url, result)
+
+        document = format_content(url, result.html)
         documents.append(document)
 
     return documents
-        
\ No newline at end of file
@@ -0,0 +1,275 @@
+import asyncio
+import random
+import time
+from typing import Self
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from src.metrics import metrics
+from src.settings import settings
+
+from .cache import ResponseCache
+from .errors import ExtractionError
+from .models import CachedResponse, FetchResult
+from .utils import decode_html
+
+
+class HostLimiter:
+    """Limit the number of concurrent requests to a single host and the rate of their start."""
+
+    semaphore: asyncio.Semaphore
+    delay: float
+
+    def __init__(self, concurrency: int, delay: float = 0.0):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.delay = delay
+
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> None:
+        await self.semaphore.acquire()
+
+        if self.delay <= 0:
+            return
+
+        try:
+            async with self._lock:
+                now = time.monotonic()
+                wait = self._next_start - now
+                self._next_start = max(now, self._next_start) + self.delay
+
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            self.semaphore.release()
+            raise
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.semaphore.release()
+
+
+class Fetcher:
+    """Download pages politely, reusing the connections between the requests.
+
+    - The number of connections is limited globally and per host (see `FetchSettings`).
+    - The DNS lookups are cached and the connections are kept alive between the requests.
+    - Transient failures (connection errors, timeouts and statuses like 429 or 503)
+      are retried with jittered exponential backoff, honoring the Retry-After header.
+    - The pages are kept in the HTTP cache and revalidated with conditional requests on the next fetch.
+    """
+
+    session: aiohttp.ClientSession | None
+    hosts: dict[str, HostLimiter]
+    cache: ResponseCache | None
+
+    def __init__(self, cache: bool | None = None):
+        self.session = None
+        self.hosts = {}
+
+        if cache is None:
+            cache = settings.fetch.cache
+        self.cache = ResponseCache() if cache else None
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        connector = aiohttp.TCPConnector(
+            limit=settings.fetch.max_connections,
+            limit_per_host=settings.fetch.max_connections_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=settings.fetch.dns_cache_ttl,
+            keepalive_timeout=settings.fetch.keepalive_timeout,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=settings.fetch.total_timeout,
+            connect=settings.fetch.connect_timeout,
+            sock_read=settings.fetch.read_timeout,
+        )
+
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers={"User-Agent": settings.fetch.user_agent},
+        )
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+        if self.cache is not None:
+            self.cache.close()
+
+    def host(self, url: str) -> HostLimiter:
+        hostname = urlsplit(url).hostname or ""
+
+        if hostname not in self.hosts:
+            self.hosts[hostname] = HostLimiter(
+                settings.fetch.max_connections_per_host, settings.fetch.host_delay
+            )
+
+        return self.hosts[hostname]
+
+    @metrics.timed("fetch")
+    async def fetch_url(
+        self, url: str, content_types: list[str] | None = None
+    ) -> FetchResult:
+        """Fetch the content of a single URL, retrying the transient failures.
+
+        If the page is cached, the request is conditional and the cached content is returned
+        with the `not_modified` flag when the server confirms that the page didn't change.
+        The responses of other types than `content_types` (`fetch.content_types` by default) are rejected."""
+        limiter = self.host(url)
+
+        cached: CachedResponse | None = None
+        headers: dict[str, str] = {}
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, url)
+
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        attempt = 0
+        while True:
+            delay: float | None = None
+
+            try:
+                async with limiter, self.session.get(url, headers=headers) as response:
+                    if response.status == 304 and cached is not None:
+                        await asyncio.to_thread(self.cache.touch, url)
+                        metrics.counter("fetched_pages", result="not_modified").inc()
+                        return FetchResult(url=url, html=cached.body, not_modified=True)
+
+                    if response.status == 200:
+                        self._check_headers(url, response, content_types)
+
+                        body = await self._read_body(url, response)
+                        html = decode_html(body, response.charset)
+                        metrics.counter("fetched_bytes").inc(len(body))
+                        metrics.counter("fetched_pages", result="ok").inc()
+
+                        await self._store(url, response, html)
+                        return FetchResult(url=url, html=html)
+
+                    error = ExtractionError(
+                        url, f"Status {response.status}", response.status
+                    )
+                    if response.status not in settings.fetch.retry_statuses:
+                        raise error
+
+                    delay = self._retry_after(response)
+            except aiohttp.ClientConnectionError as e:
+                error = ExtractionError(
+                    url, str(e) or type(e).__name__, kind="connection"
+                )
+            except TimeoutError as e:
+                error = ExtractionError(url, str(e) or type(e).__name__, kind="timeout")
+            except (aiohttp.ClientError, ValueError) as e:
+                # An invalid URL or response, or a broken body.
+                raise ExtractionError(url, str(e) or type(e).__name__) from e
+
+            if attempt >= settings.fetch.max_retries:
+                raise error
+
+            delay = delay if delay is not None else self._backoff(attempt)
+            attempt += 1
+            metrics.counter("fetch_retries").inc()
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _check_headers(
+        url: str,
+        response: aiohttp.ClientResponse,
+        content_types: list[str] | None = None,
+    ) -> None:
+        """Reject the responses that can't be articles before downloading their body."""
+        # Without the header aiohttp reports `application/octet-stream`, so the raw header is checked.
+        if "Content-Type" in response.headers and (
+            response.content_type not in (content_types or settings.fetch.content_types)
+        ):
+            raise ExtractionError(
+                url,
+                f"Unsupported content type '{response.content_type}'",
+                response.status,
+                kind="unsupported",
+            )
+
+        if (
+            response.content_length is not None
+            and response.content_length > settings.fetch.max_body_size
+        ):
+            raise ExtractionError(
+                url,
+                f"The page is too large ({response.content_length} bytes)",
+                response.status,
+                kind="too_large",
+            )
+
+    @staticmethod
+    async def _read_body(url: str, response: aiohttp.ClientResponse) -> bytes:
+        """Read the body in chunks, aborting when it grows over the size limit."""
+        body = bytearray()
+
+        async for chunk in response.content.iter_chunked(
+            settings.fetch.read_chunk_size
+        ):
+            body += chunk
+
+            # The length header may be missing or wrong, and the body may be decompressed.
+            if len(body) > settings.fetch.max_body_size:
+                raise ExtractionError(
+                    url,
+                    f"The page is larger than {settings.fetch.max_body_size} bytes",
+                    response.status,
+                    kind="too_large",
+                )
+
+        return bytes(body)
+
+    async def _store(
+        self, url: str, response: aiohttp.ClientResponse, html: str
+    ) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+
+        # A page without the validators can't be revalidated, so there is no reason to keep it.
+        if self.cache is None or not (etag or last_modified):
+            return
+
+        await asyncio.to_thread(
+            self.cache.set,
+            CachedResponse(
+                url=url,
+                body=html,
+                etag=etag,
+                last_modified=last_modified,
+            ),
+        )
+
+    @staticmethod
+    def _retry_after(response: aiohttp.ClientResponse) -> float | None:
+        try:
+            return min(
+                float(response.headers.get("Retry-After")),
+                settings.fetch.retry_backoff_max,
+            )
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        # Exponential backoff with full jitter, so the retries to the same host are spread in time.
+        delay = min(
+            settings.fetch.retry_backoff_max, settings.fetch.retry_backoff * 2**attempt
+        )
+        return random.uniform(0, delay)
@@ -1,4 +1,6 @@
-from typing import TypedDict
+from typing import NotRequired, TypedDict
+
+from pydantic import BaseModel
 
 
 class ArticleMetadata(TypedDict):
@@ -11,3 +13,33 @@ class ArticleMetadata(TypedDict):
     description: str | None
     license: str | None
     author: str | None
+
+    # The fingerprint of the extracted content, used to skip the unchanged articles.
+    content_hash: str | None
+    # The position of the reader comments appended to the content, if any.
+    comments_start: NotRequired[int | None]
+
+    # The MinHash signature of the content, used to find the near-duplicates of the article.
+    minhash: NotRequired[bytes | None]
+    # The URL of the stored article this one is a near-duplicate of.
+    duplicate_of: NotRequired[str | None]
+
+
+class CachedResponse(BaseModel):
+    """A page stored in the HTTP cache with the validators to revalidate it."""
+
+    url: str
+    body: str
+
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class FetchResult(BaseModel):
+    """The content of a fetched page."""
+
+    url: str
+    html: str
+
+    # Whether the server confirmed that the cached copy of the page is still up to date.
+    not_modified: bool = False
@@ -0,0 +1,71 @@
+import re
+import zlib
+from functools import cache
+
+import numpy as np
+
+from src.settings import settings
+
+# The largest prime below 2^32, so the permuted hashes fit 32 bits.
+_PRIME = np.uint64(4294967291)
+
+WORD_PATTERN = re.compile(r"\w+")
+# The number of the shingles permuted at once, so a long text doesn't need
+# a permutations x shingles array: 128 x 1024 64-bit values take 1 MB.
+SHINGLES_BLOCK_SIZE: int = 1024
+
+
+@cache
+def _permutations(count: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the fixed coefficients of the hash permutations, the same for every process."""
+    rng = np.random.default_rng(0x5EED)
+    a, b = rng.integers(1, int(_PRIME), size=(2, count), dtype=np.uint64)
+    return a[:, None], b[:, None]
+
+
+def minhash(
+    content: str,
+    permutations: int | None = None,
+    shingle_size: int | None = None,
+    min_words: int | None = None,
+) -> bytes | None:
+    """Return the MinHash signature of the word shingles of the content.
+
+    The share of the equal values of two signatures estimates the Jaccard similarity of the texts.
+    The texts that are too short for a reliable estimate have no signature."""
+    permutations = permutations or settings.deduplication.permutations
+    shingle_size = shingle_size or settings.deduplication.shingle_size
+    if min_words is None:
+        min_words = settings.deduplication.min_words
+
+    words = WORD_PATTERN.findall(content.lower())
+    if not words or len(words) < min_words:
+        return None
+
+    hashes = np.fromiter(
+        {
+            zlib.crc32(" ".join(words[start : start + shingle_size]).encode("utf-8"))
+            for start in range(max(1, len(words) - shingle_size + 1))
+        },
+        dtype=np.uint64,
+    )
+
+    # Both factors are below 2^32, so the product doesn't overflow 64 bits.
+    a, b = _permutations(permutations)
+    signature = np.full(permutations, _PRIME, dtype=np.uint64)
+    for start in range(0, len(hashes), SHINGLES_BLOCK_SIZE):
+        block = hashes[start : start + SHINGLES_BLOCK_SIZE]
+        permuted = (a * block % _PRIME + b) % _PRIME
+        np.minimum(signature, permuted.min(axis=1), out=signature)
+
+    return signature.astype(np.uint32).tobytes()
+
+
+def similarity(signature: bytes, other: bytes) -> float:
+    """Estimate the Jaccard similarity of the texts from their MinHash signatures."""
+    return float(
+        np.mean(
+            np.frombuffer(signature, dtype=np.uint32)
+            == np.frombuffer(other, dtype=np.uint32)
+        )
+    )
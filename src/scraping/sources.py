@@ -0,0 +1,118 @@
+import re
+from typing import Literal
+from urllib.parse import urljoin, urlsplit
+
+from lxml import etree, html
+from pydantic import BaseModel
+
+SourceKind = Literal["page", "feed", "sitemap"]
+
+# The extensions of the links that are never articles.
+SKIPPED_EXTENSIONS: tuple[str, ...] = (
+    ".css",
+    ".gif",
+    ".ico",
+    ".jpeg",
+    ".jpg",
+    ".js",
+    ".mp3",
+    ".mp4",
+    ".pdf",
+    ".png",
+    ".svg",
+    ".webp",
+    ".xml",
+    ".zip",
+)
+
+XML_PATTERN = re.compile(
+    r"^\s*(<\?xml[^>]*>\s*)?(<!--.*?-->\s*)*<(rss|feed|rdf:RDF|urlset|sitemapindex)\b",
+    re.DOTALL,
+)
+XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+class SourceLinks(BaseModel):
+    """The links found on a source: the articles to ingest and the nested sources (sitemap indexes)."""
+
+    kind: SourceKind
+    articles: list[str] = []
+    sources: list[str] = []
+
+
+def parse_source(url: str, body: str, link_pattern: str | None = None) -> SourceLinks:
+    """Find the article links of an RSS or Atom feed, a sitemap or an HTML listing page.
+
+    The links of an HTML page are kept only if they point to the same host
+    and match the pattern, if it's given."""
+    if XML_PATTERN.match(body[:4096]):
+        return parse_xml(url, body)
+
+    return SourceLinks(kind="page", articles=parse_page(url, body, link_pattern))
+
+
+def parse_xml(url: str, body: str) -> SourceLinks:
+    # The entities and the network access are disabled, so a hostile feed can't expand or fetch anything.
+    parser = etree.XMLParser(
+        resolve_entities=False, no_network=True, recover=True, huge_tree=False
+    )
+    # The body is already decoded, so its declared encoding must not be applied again.
+    root = etree.fromstring(XML_DECLARATION.sub("", body, count=1), parser=parser)
+    if root is None:
+        return SourceLinks(kind="feed")
+
+    root_name = etree.QName(root).localname
+
+    if root_name in ("urlset", "sitemapindex"):
+        locations = [
+            urljoin(url, element.text.strip())
+            for element in root.iter("{*}loc")
+            if element.text and element.text.strip()
+        ]
+        if root_name == "sitemapindex":
+            return SourceLinks(kind="sitemap", sources=locations)
+        return SourceLinks(kind="sitemap", articles=locations)
+
+    articles: list[str] = []
+    for entry in root.iter("{*}item", "{*}entry"):
+        for link in entry.iter("{*}link"):
+            # RSS has the URL as the text, Atom as the `href` of the alternate link.
+            href = link.get("href") if link.get("href") else link.text
+            if href and link.get("rel", "alternate") == "alternate":
+                articles.append(urljoin(url, href.strip()))
+                break
+
+    return SourceLinks(kind="feed", articles=articles)
+
+
+def parse_page(url: str, body: str, link_pattern: str | None = None) -> list[str]:
+    try:
+        document = html.fromstring(body, base_url=url)
+    except (etree.ParserError, ValueError):
+        return []
+
+    hostname = urlsplit(url).hostname
+    pattern = re.compile(link_pattern) if link_pattern else None
+    source = url.split("#")[0].rstrip("/")
+
+    links: list[str] = []
+    for element in document.iter("a"):
+        href = element.get("href")
+        if not href:
+            continue
+
+        link = urljoin(url, href.strip()).split("#")[0]
+        parts = urlsplit(link)
+
+        if parts.scheme not in ("http", "https") or parts.hostname != hostname:
+            continue
+        if link.rstrip("/") == source or parts.path in ("", "/"):
+            continue
+        if parts.path.lower().endswith(SKIPPED_EXTENSIONS):
+            continue
+        if pattern is not None and not pattern.search(link):
+            continue
+
+        links.append(link)
+
+    return links
@@ -1,32 +1,204 @@
+import codecs
+import hashlib
 import re
+from collections import OrderedDict
+from collections.abc import Iterable
+from fnmatch import fnmatchcase
 from re import Pattern
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.settings import settings
 
 URL_PATTERN: Pattern = re.compile(
     r"^(?:https?:\/\/)?([\w\-]+(\.[\w\-]+)+)([\w\-\.,@?^=%&:\/~\+#]*[\w\-\@?^=%&\/~\+#])?$"
 )
 
 
-def validate_urls(urls: list[str]):
-    # Normalize the URLs and remove duplicates.
-    urls = [url.strip() for url in urls]
-    urls = list(set(urls))
+def normalize_url(url: str) -> str:
+    """Return the URL with the lowercase scheme and hostname and without the fragment."""
+    parts = urlsplit(url.strip())
+
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, "")
+    )
+
+
+def canonicalize_url(
+    url: str,
+    https_upgrade: bool | None = None,
+    tracking_parameters: list[str] | None = None,
+) -> str:
+    """Return the canonical form of the URL, used as the ID of the article.
+
+    The URLs that differ only in the scheme (when upgraded to https), the case of the hostname,
+    the default port, the trailing slash, the tracking parameters, the order of the query parameters
+    or the fragment refer to the same page and get the same canonical form."""
+    if https_upgrade is None:
+        https_upgrade = settings.fetch.https_upgrade
+    if tracking_parameters is None:
+        tracking_parameters = settings.fetch.tracking_parameters
+
+    url = url.strip()
+    if not url.startswith(("http://", "https://")):
+        url = f"https://{url}"
+
+    parts = urlsplit(url)
+
+    scheme = parts.scheme.lower()
+    port = parts.port
+    if (scheme, port) in (("http", 80), ("https", 443)):
+        port = None
+
+    # A server on a custom port most likely doesn't speak TLS on it.
+    if https_upgrade and port is None:
+        scheme = "https"
+
+    netloc = (parts.hostname or "").lower()
+    if port is not None:
+        netloc = f"{netloc}:{port}"
+
+    path = parts.path.rstrip("/") or "/"
+
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not any(
+                fnmatchcase(key.lower(), pattern) for pattern in tracking_parameters
+            )
+        )
+    )
+
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+META_CHARSET_PATTERN: Pattern = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE
+)
+# The BOM takes precedence over any declared encoding.
+BOMS: list[tuple[bytes, str]] = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def detect_charset(body: bytes, declared: str | None = None) -> str | None:
+    """Return the encoding of an HTML page from its BOM, the declared charset or the meta tags."""
+    for bom, encoding in BOMS:
+        if body.startswith(bom):
+            return encoding
+
+    candidates = [declared]
+    # The meta tag has to be within the first 1024 bytes, but some pages put it later.
+    if match := META_CHARSET_PATTERN.search(body, 0, 4096):
+        candidates.append(match.group(1).decode("ascii", errors="ignore"))
+
+    for candidate in candidates:
+        if not candidate:
+            continue
+        try:
+            return codecs.lookup(candidate.strip()).name
+        except LookupError:
+            continue
+
+    return None
 
-    valid, invalid = [], []
 
-    for url in urls:
-        if URL_PATTERN.match(url):
+def decode_html(body: bytes, declared: str | None = None) -> str:
+    """Decode the HTML page with its detected encoding, falling back to UTF-8 and then windows-1252."""
+    encoding = detect_charset(body, declared)
+    if encoding is not None:
+        return body.decode(encoding, errors="replace")
+
+    try:
+        return body.decode("utf-8")
+    except UnicodeDecodeError:
+        return body.decode("windows-1252", errors="replace")
+
+
+def fingerprint(content: str) -> str:
+    """Return a stable hash of the content to detect unchanged and copied articles."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class UrlValidator:
+    """Validate, canonicalize and deduplicate a stream of URLs chunk by chunk, keeping their order.
+
+    The URLs already seen are remembered by a 64-bit hash of their canonical form rather than
+    the string, so a seed list of millions of URLs takes tens of megabytes. A long-lived
+    validator can be bounded by `max_seen`: then only the most recently seen URLs are kept."""
+
+    valid: int
+    invalid: int
+    duplicates: int
+    max_seen: int | None
+
+    def __init__(self, max_seen: int | None = None):
+        self.valid = 0
+        self.invalid = 0
+        self.duplicates = 0
+        self.max_seen = max_seen
+
+        self._seen: set[int] = set()
+        self._recent: OrderedDict[int, None] = OrderedDict()
+
+    def validate(self, urls: Iterable[str]) -> list[str]:
+        valid: list[str] = []
+
+        for url in urls:
+            url = url.strip()
+            if not url:
+                continue
+
+            if not URL_PATTERN.match(url):
+                self.invalid += 1
+                continue
+
+            # If the URL doesn't have a protocol, https is assumed.
+            try:
+                url = canonicalize_url(url)
+            except ValueError:
+                # The pattern accepts the ports that are out of range or not numbers.
+                self.invalid += 1
+                continue
+            key = int.from_bytes(
+                hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+            )
+            if self._is_seen(key):
+                self.duplicates += 1
+                continue
+
             valid.append(url)
-        else:
-            invalid.append(url)
 
-    if invalid:
-        print(f"There are {len(invalid)} invalid URLs in the list. Skipping them.")
+        self.valid += len(valid)
+        return valid
 
-    if not valid:
-        raise ValueError("No valid URLs provided.")
+    def _is_seen(self, key: int) -> bool:
+        """Check if the URL was seen before and remember it."""
+        if self.max_seen is None:
+            if key in self._seen:
+                return True
+            self._seen.add(key)
+            return False
+
+        seen = key in self._recent
+        self._recent[key] = None
+        self._recent.move_to_end(key)
+        if len(self._recent) > self.max_seen:
+            self._recent.popitem(last=False)
+        return seen
 
-    # If the URL doesn't have a protocol, add https://
-    valid = [url if url.startswith("http") else f"https://{url}" for url in valid]
 
+def validate_urls(urls: list[str]):
+    """Return the canonical form of the valid URLs without duplicates, keeping their order."""
+    validator = UrlValidator()
+    valid = validator.validate(urls)
+
+    if validator.invalid:
+        print(f"There are {validator.invalid} invalid URLs in the list. Skipping them.")
+
+    if not valid:
+        raise ValueError("No valid URLs provided.")
 
     return valid
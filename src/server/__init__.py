@@ -0,0 +1,3 @@
+from .app import Coalescer, SearchService, create_app
+
+__all__ = ["Coalescer", "SearchService", "create_app"]
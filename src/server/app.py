@@ -0,0 +1,276 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, TypeVar
+
+from aiohttp import web
+
+from src.ingestion import IngestionPipeline, Journal, parse_duration, select_urls
+from src.metrics import metrics
+from src.scraping import UrlValidator
+from src.settings import settings
+from src.storage import AsyncDatabase
+from src.storage.models import Article
+from src.summarization import create_llm
+
+T = TypeVar("T")
+
+
+class Coalescer:
+    """Share a single call between the identical requests that are in flight at the same time.
+
+    The call runs as a separate task, so it's finished for the other requests
+    even if the client that started it disconnects."""
+
+    def __init__(self):
+        self._pending: dict[str, asyncio.Task] = {}
+
+    async def run(self, key: str, function: Callable[[], Awaitable[T]]) -> T:
+        task = self._pending.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(function())
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        else:
+            metrics.counter("coalesced_requests").inc()
+
+        return await asyncio.shield(task)
+
+
+class SearchService:
+    """Answer the search and the ingestion requests with a warm database.
+
+    The database and the embedding model are loaded once on start, the blocking Chroma calls
+    run on the bounded pool of the database readers (see `AsyncDatabase`) and the identical
+    queries in flight are coalesced. The ingestion pipeline is started on the first ingest request
+    and the URLs of all the requests go through it as a single job."""
+
+    database: AsyncDatabase
+    coalescer: Coalescer
+
+    journal: Journal | None
+    ingestion: IngestionPipeline | None
+
+    def __init__(self, database: AsyncDatabase | None = None):
+        self.database = database or AsyncDatabase()
+        self.coalescer = Coalescer()
+
+        self.journal = None
+        self.ingestion = None
+        self._ingestion_lock = asyncio.Lock()
+        self._puts: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        self.database.start()
+
+        started = time.perf_counter()
+        await self.database.warm_up()
+        print(f"Loaded the database in {time.perf_counter() - started:.2f}s.")
+
+    async def close(self) -> None:
+        if self._puts:
+            await asyncio.gather(*self._puts, return_exceptions=True)
+
+        if self.ingestion is not None:
+            await self.ingestion.__aexit__(None, None, None)
+            print(self.ingestion.summarizer.report())
+        if self.journal is not None:
+            print(self.journal.report())
+
+        await self.database.close()
+
+    async def search(self, query: str) -> list[Article]:
+        return await self.coalescer.run(query, lambda: self.database.search(query))
+
+    async def search_many(self, queries: list[str]) -> list[list[Article]]:
+        return await self.database.search_many(queries)
+
+    async def ingest(
+        self, urls: list[str], refresh_older_than: float | None = None
+    ) -> dict[str, Any]:
+        """Validate the URLs and queue the new ones for the ingestion in the background.
+
+        Once the pipeline has stopped on an unexpected error, the URLs are no longer accepted."""
+        pipeline = await self._get_ingestion()
+        if pipeline.pipeline.error is not None:
+            raise web.HTTPServiceUnavailable(
+                text=f"The ingestion stopped on an error: {pipeline.pipeline.error!r}."
+            )
+
+        validator = UrlValidator()
+        valid = validator.validate(urls)
+        selected = await select_urls(valid, refresh_older_than, self.database)
+
+        if self.journal is not None:
+            self.journal.queue(selected)
+
+        # The pipeline applies the backpressure, so the URLs are put without holding the request.
+        task = asyncio.create_task(self._put(pipeline, selected))
+        self._puts.add(task)
+        task.add_done_callback(self._put_done)
+
+        return {
+            "job": self.journal.job if self.journal is not None else None,
+            "queued": len(selected),
+            "stored": len(valid) - len(selected),
+            "duplicates": validator.duplicates,
+            "invalid": validator.invalid,
+        }
+
+    async def _get_ingestion(self) -> IngestionPipeline:
+        async with self._ingestion_lock:
+            if self.ingestion is None:
+                if settings.ingestion.journal:
+                    self.journal = Journal.create()
+                    print(f"Started the ingestion job {self.journal.job}.")
+
+                self.ingestion = IngestionPipeline(create_llm(), journal=self.journal)
+                await self.ingestion.__aenter__()
+
+            return self.ingestion
+
+    @staticmethod
+    async def _put(pipeline: IngestionPipeline, urls: list[str]) -> None:
+        for url in urls:
+            await pipeline.put(url)
+
+    def _put_done(self, task: asyncio.Task) -> None:
+        self._puts.discard(task)
+        if not task.cancelled() and (error := task.exception()) is not None:
+            print(f"Unable to queue the URLs for the ingestion: {error!r}")
+
+
+def format_results(query: str, articles: list[Article]) -> dict[str, Any]:
+    return {
+        "query": query,
+        "results": [article.model_dump(exclude={"content"}) for article in articles],
+    }
+
+
+@web.middleware
+async def measure(
+    request: web.Request,
+    handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+) -> web.StreamResponse:
+    """Record the latency histogram and the number of responses of every endpoint."""
+    route = request.match_info.route.resource
+    endpoint = route.canonical if route is not None else "unknown"
+
+    status = 500
+    try:
+        with metrics.histogram("http_request", endpoint=endpoint).time():
+            response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        metrics.counter("http_requests", endpoint=endpoint, status=str(status)).inc()
+
+
+async def read_json(request: web.Request) -> dict[str, Any]:
+    try:
+        data = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="The request body must be a JSON object.")
+
+    if not isinstance(data, dict):
+        raise web.HTTPBadRequest(text="The request body must be a JSON object.")
+    return data
+
+
+def read_strings(data: dict[str, Any], field: str, limit: int) -> list[str]:
+    values = data.get(field)
+
+    if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+        raise web.HTTPBadRequest(text=f"'{field}' must be a list of strings.")
+    if len(values) > limit:
+        raise web.HTTPRequestEntityTooLarge(
+            max_size=limit,
+            actual_size=len(values),
+            text=f"At most {limit} {field} are accepted at once.",
+        )
+    return values
+
+
+def read_duration(data: dict[str, Any], field: str) -> float | None:
+    """Read an optional duration given in seconds or as a string like `12h`."""
+    value = data.get(field)
+
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0:
+        return float(value)
+    if not isinstance(value, str):
+        raise web.HTTPBadRequest(
+            text=f"'{field}' must be a number of seconds or a duration like '12h'."
+        )
+
+    try:
+        return parse_duration(value)
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=str(e)) from e
+
+
+def create_app(service: SearchService | None = None) -> web.Application:
+    """Create the application with the search, batch search and ingest endpoints."""
+    service = service or SearchService()
+    routes = web.RouteTableDef()
+
+    @routes.get("/search")
+    async def search(request: web.Request) -> web.Response:
+        query = request.query.get("q", "").strip()
+        if not query:
+            raise web.HTTPBadRequest(text="The query parameter 'q' is required.")
+
+        return web.json_response(format_results(query, await service.search(query)))
+
+    @routes.post("/search/batch")
+    async def search_batch(request: web.Request) -> web.Response:
+        queries = read_strings(
+            await read_json(request), "queries", settings.server.max_batch_queries
+        )
+        results = await service.search_many(queries)
+
+        return web.json_response(
+            {
+                "results": [
+                    format_results(query, articles)
+                    for query, articles in zip(queries, results, strict=True)
+                ]
+            }
+        )
+
+    @routes.post("/ingest")
+    async def ingest(request: web.Request) -> web.Response:
+        data = await read_json(request)
+        urls = read_strings(data, "urls", settings.server.max_ingest_urls)
+
+        refresh_older_than = read_duration(data, "refresh_older_than")
+
+        return web.json_response(
+            await service.ingest(urls, refresh_older_than), status=202
+        )
+
+    @routes.get("/metrics")
+    async def prometheus(request: web.Request) -> web.Response:
+        return web.Response(
+            text=metrics.to_prometheus(), content_type="text/plain", charset="utf-8"
+        )
+
+    @routes.get("/health")
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    async def lifecycle(app: web.Application) -> AsyncIterator[None]:
+        await service.start()
+        yield
+        await service.close()
+
+    app = web.Application(middlewares=[measure])
+    app.add_routes(routes)
+    app.cleanup_ctx.append(lifecycle)
+
+    return app
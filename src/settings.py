@@ -1,7 +1,7 @@
-from typing import Tuple, Type
+from functools import cache
+from typing import Literal, Self, Tuple, Type
 
-from chromadb.config import DEFAULT_DATABASE, DEFAULT_TENANT
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from pydantic_settings import (
     BaseSettings,
     PydanticBaseSettingsSource,
@@ -18,10 +18,30 @@ class StorageSettings(BaseModel):
         help="The path to the directory where the database data will be stored",
     )
     tenant: str = Field(
-        default=DEFAULT_TENANT, help="The tenant to use for the database"
+        default="default_tenant", help="The tenant to use for the database"
     )
     database: str = Field(
-        default=DEFAULT_DATABASE, help="The name of the database to use"
+        default="default_database", help="The name of the database to use"
+    )
+    batch_size: int = Field(
+        default=256,
+        help="The maximum number of records written to a collection with a single upsert",
+        ge=1,
+    )
+    page_size: int = Field(
+        default=500,
+        help="The number of articles read from the database at once when iterating over all of them",
+        ge=1,
+    )
+    read_workers: int = Field(
+        default=4,
+        help="The number of threads that run the database reads without blocking the event loop",
+        ge=1,
+    )
+    write_queue_size: int = Field(
+        default=64,
+        help="The maximum number of writes waiting for the single database writer",
+        ge=1,
     )
 
 
@@ -57,6 +77,59 @@ class SearchSettings(BaseModel):
         le=1,
     )
 
+    results: int = Field(
+        default=10,
+        help="The number of nearest records queried in every collection and the maximum number of returned articles",
+        ge=1,
+    )
+    topic_articles_limit: int = Field(
+        default=50,
+        help="The maximum number of the most recent articles returned for a matched topic",
+        ge=1,
+    )
+    fusion: Literal["rrf", "distance"] = Field(
+        default="rrf",
+        help="How to merge the results of the collections: reciprocal rank fusion or weighted distance",
+    )
+    rrf_k: int = Field(
+        default=60,
+        help="The constant of the reciprocal rank fusion that dampens the impact of the top ranks",
+        ge=1,
+    )
+    articles_weight: float = Field(
+        default=1.0, help="The weight of the articles matches in the fusion", ge=0
+    )
+    summaries_weight: float = Field(
+        default=1.0, help="The weight of the summaries matches in the fusion", ge=0
+    )
+    topics_weight: float = Field(
+        default=0.5, help="The weight of the topics matches in the fusion", ge=0
+    )
+    batch_size: int = Field(
+        default=256,
+        help="The number of queries of a batch search that are embedded and queried at once",
+        ge=1,
+    )
+    query_cache_size: int = Field(
+        default=1024,
+        help="The number of query embeddings kept in memory in front of the embedding cache",
+        ge=0,
+    )
+    result_cache: bool = Field(
+        default=True,
+        help="Whether to keep the results of the queries in a file until the next write to the database. The recent results are kept in memory regardless (see `result_cache_size`)",
+    )
+    result_cache_size: int = Field(
+        default=256,
+        help="The number of search results kept in memory in front of the results cache file",
+        ge=0,
+    )
+    result_cache_max_size: int | None = Field(
+        default=64 * 1024**2,
+        help="The maximum size of the search results cache file in bytes",
+        gt=0,
+    )
+
 
 class LLMSettings(BaseModel):
     """Configure the provider and the default model to use for LLM related tasks.
@@ -70,6 +143,413 @@ class LLMSettings(BaseModel):
     )
     model: str = Field(default="gpt-4o-mini", help="The model to use for LLM tasks.")
 
+    max_concurrency: int = Field(
+        default=16, help="The maximum number of in-flight LLM requests.", ge=1
+    )
+    min_concurrency: int = Field(
+        default=1, help="The minimum number of in-flight LLM requests.", ge=1
+    )
+    adaptive_concurrency: bool = Field(
+        default=True,
+        help="Whether to adapt the number of in-flight requests to the observed latency.",
+    )
+    latency_tolerance: float = Field(
+        default=2.0,
+        help="The ratio to the best observed latency above which the number of in-flight requests is reduced.",
+        gt=1,
+    )
+    requests_per_minute: int | None = Field(
+        default=None, help="The maximum number of LLM requests per minute.", ge=1
+    )
+    tokens_per_minute: int | None = Field(
+        default=None, help="The maximum number of LLM tokens per minute.", ge=1
+    )
+    max_retries: int = Field(
+        default=5,
+        help="The number of retries of a request rejected due to the server load (429, 5xx).",
+        ge=0,
+    )
+    retry_backoff: float = Field(
+        default=1.0, help="The initial delay in seconds between the retries.", gt=0
+    )
+    retry_backoff_max: float = Field(
+        default=60.0, help="The maximum delay in seconds between the retries.", gt=0
+    )
+    summary_cache: bool = Field(
+        default=True,
+        help="Whether to reuse the summarizations of the same content instead of calling the LLM again.",
+    )
+    summary_cache_max_size: int | None = Field(
+        default=256 * 1024**2,
+        help="The maximum size of the summary cache in bytes.",
+        gt=0,
+    )
+    compact_input: bool = Field(
+        default=True,
+        help="Whether to remove the reader comments and the link targets from the content sent to the LLM.",
+    )
+    input_token_budget: int = Field(
+        default=6000,
+        help="The maximum number of content tokens in a single request. Longer articles are summarized in parts.",
+        ge=256,
+    )
+    max_chunks: int = Field(
+        default=16,
+        help="The maximum number of parts of a long article. The rest of the content is not summarized.",
+        ge=2,
+    )
+    tokenizer: str = Field(
+        default="o200k_base",
+        help="The tiktoken encoding used to count the tokens. The tokens are estimated by the length if it's not available.",
+    )
+
+
+class EmbeddingSettings(BaseModel):
+    """Configure the model that embeds the stored documents and the search queries."""
+
+    backend: Literal["default", "sentence-transformers", "openai"] = Field(
+        default="default",
+        help="The embedding backend. 'default' is the ONNX all-MiniLM-L6-v2 model bundled with Chroma",
+    )
+    model: str = Field(
+        default="all-MiniLM-L6-v2",
+        help="The name of the embedding model. Changing it requires a new database",
+    )
+    base_url: str | None = Field(
+        default=None,
+        help="The base URL of the OpenAI compatible API. Defaults to the LLM base URL",
+    )
+    batch_size: int = Field(
+        default=64, help="The number of texts embedded at once by a worker", ge=1
+    )
+    workers: int = Field(
+        default=2, help="The number of concurrent embedding workers", ge=1
+    )
+    cache: bool = Field(
+        default=True,
+        help="Whether to keep the computed embeddings in the database directory",
+    )
+    cache_max_size: int | None = Field(
+        default=512 * 1024**2,
+        help="The maximum size of the embedding cache in bytes",
+        gt=0,
+    )
+
+
+class FetchSettings(BaseModel):
+    """Configure how the pages are downloaded: connection limits, timeouts and retries."""
+
+    user_agent: str = Field(
+        default="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+        help="The User-Agent header sent with every request",
+    )
+    max_connections: int = Field(
+        default=100, help="The maximum number of simultaneous connections", ge=1
+    )
+    max_connections_per_host: int = Field(
+        default=4,
+        help="The maximum number of simultaneous requests to the same hostname",
+        ge=1,
+    )
+    host_delay: float = Field(
+        default=0.0,
+        help="The minimum delay in seconds between the starts of two requests to the same hostname",
+        ge=0,
+    )
+    connect_timeout: float = Field(
+        default=10.0, help="The timeout in seconds to establish a connection", gt=0
+    )
+    read_timeout: float = Field(
+        default=30.0,
+        help="The timeout in seconds between two reads of the response data",
+        gt=0,
+    )
+    total_timeout: float | None = Field(
+        default=60.0, help="The timeout in seconds of the whole request", gt=0
+    )
+    dns_cache_ttl: int | None = Field(
+        default=300, help="How long in seconds to cache the resolved hostnames", ge=0
+    )
+    keepalive_timeout: float = Field(
+        default=30.0,
+        help="How long in seconds to keep an idle connection open for reuse",
+        ge=0,
+    )
+    max_retries: int = Field(
+        default=3, help="The number of retries of a failed request", ge=0
+    )
+    retry_backoff: float = Field(
+        default=0.5, help="The initial delay in seconds between the retries", gt=0
+    )
+    retry_backoff_max: float = Field(
+        default=30.0, help="The maximum delay in seconds between the retries", gt=0
+    )
+    retry_statuses: list[int] = Field(
+        default=[408, 425, 429, 500, 502, 503, 504],
+        help="The HTTP statuses that are considered transient and retried",
+    )
+    content_types: list[str] = Field(
+        default=["text/html", "application/xhtml+xml"],
+        help="The content types of the pages to extract. The responses of other types aren't downloaded",
+    )
+    max_body_size: int = Field(
+        default=5 * 1024**2,
+        help="The maximum size in bytes of a page. The larger responses are aborted",
+        ge=1,
+    )
+    read_chunk_size: int = Field(
+        default=64 * 1024,
+        help="The size in bytes of the chunks the response body is read in",
+        ge=1,
+    )
+    https_upgrade: bool = Field(
+        default=True,
+        help="Whether to fetch the http URLs over https, so both schemes refer to the same article",
+    )
+    tracking_parameters: list[str] = Field(
+        default=[
+            "utm_*",
+            "fbclid",
+            "gclid",
+            "dclid",
+            "msclkid",
+            "yclid",
+            "igshid",
+            "mc_cid",
+            "mc_eid",
+            "_ga",
+            "_gl",
+            "ref_src",
+        ],
+        help="The query parameters (shell-style patterns) removed from the URLs, as they don't change the page",
+    )
+    cache: bool = Field(
+        default=True,
+        help="Whether to keep the fetched pages in the database directory and revalidate them with conditional requests",
+    )
+    cache_ttl: float | None = Field(
+        default=7 * 24 * 60 * 60,
+        help="How long in seconds a cached page can be revalidated before it's downloaded again in full",
+        gt=0,
+    )
+    cache_max_size: int | None = Field(
+        default=1024**3,
+        help="The maximum size of the HTTP cache in bytes. The least recently used pages are evicted first",
+        gt=0,
+    )
+
+
+class ExtractionSettings(BaseModel):
+    """Configure how the content and the metadata are extracted from the fetched pages."""
+
+    backend: Literal["process", "thread", "inline"] = Field(
+        default="process",
+        help="Where to run the HTML parsing: a pool of processes, a pool of threads or the event loop itself",
+    )
+    workers: int | None = Field(
+        default=None,
+        help="The number of extraction workers. Defaults to the number of CPU cores",
+        ge=1,
+    )
+
+
+class DeduplicationSettings(BaseModel):
+    """Configure the detection of the near-duplicate articles (syndicated and republished copies).
+
+    A near-duplicate reuses the summary and the topics of the stored article it copies,
+    so it doesn't request the LLM again."""
+
+    enabled: bool = Field(
+        default=True,
+        help="Whether to look for a stored copy of every article before summarizing it",
+    )
+    threshold: float = Field(
+        default=0.8,
+        help="The minimum estimated Jaccard similarity of the word shingles of the copies",
+        gt=0,
+        le=1,
+    )
+    permutations: int = Field(
+        default=128,
+        help="The number of MinHash permutations. Changing it requires a new index",
+        ge=1,
+    )
+    bands: int = Field(
+        default=16,
+        help="The number of locality-sensitive hashing bands. Must divide the number of permutations",
+        ge=1,
+    )
+    shingle_size: int = Field(
+        default=5, help="The number of words in every shingle", ge=1
+    )
+    min_words: int = Field(
+        default=50,
+        help="The minimum number of words of an article to look for its copies",
+        ge=1,
+    )
+
+    @model_validator(mode="after")
+    def check_bands(self) -> Self:
+        # Every band takes the same number of the signature values.
+        if self.permutations % self.bands:
+            raise ValueError(
+                f"The number of bands ({self.bands}) must divide the number of permutations ({self.permutations})."
+            )
+        return self
+
+
+class IngestionSettings(BaseModel):
+    """Configure the concurrency of the ingestion pipeline stages.
+
+    Every stage has its own pool of workers and the stages are connected with bounded queues,
+    so the memory usage depends on the queue size rather than on the number of URLs.
+    """
+
+    queue_size: int = Field(
+        default=64,
+        help="The maximum number of items waiting between two pipeline stages",
+        ge=1,
+    )
+    input_chunk_size: int = Field(
+        default=1000,
+        help="The number of input URLs read, validated and checked against the database at once",
+        ge=1,
+    )
+    fetch_workers: int | None = Field(
+        default=None,
+        help="The number of concurrent URL fetching workers. Defaults to the maximum number of connections",
+        ge=1,
+    )
+    extract_workers: int | None = Field(
+        default=None,
+        help="The number of concurrent content extraction workers. Defaults to the number of extraction backend workers",
+        ge=1,
+    )
+    summarize_workers: int | None = Field(
+        default=None,
+        help="The number of concurrent LLM summarization workers. Defaults to the maximum LLM concurrency",
+        ge=1,
+    )
+    flush_size: int = Field(
+        default=32,
+        help="The number of summarized articles that are written to the database at once",
+        ge=1,
+    )
+    flush_interval: float = Field(
+        default=2.0,
+        help="The maximum time in seconds an article waits for the batch to be written",
+        gt=0,
+    )
+    journal: bool = Field(
+        default=True,
+        help="Whether to keep a journal of every job, so an interrupted job can be resumed",
+    )
+    journal_sync_interval: float = Field(
+        default=1.0,
+        help="The time in seconds between the syncs of the journal to the disk",
+        gt=0,
+    )
+    processes: int = Field(
+        default=1,
+        help="The number of worker processes. With more than one, the URLs are sharded by hostname across the workers and a separate process writes to the database",
+        ge=1,
+    )
+    process_queue_size: int = Field(
+        default=256,
+        help="The maximum number of unfinished URLs sent to a single worker process",
+        ge=1,
+    )
+    max_restarts: int = Field(
+        default=3,
+        help="The number of times a crashed worker or writer process is restarted",
+        ge=0,
+    )
+    progress_interval: float = Field(
+        default=10.0,
+        help="The time in seconds between the progress reports of the multi-process ingestion",
+        gt=0,
+    )
+
+
+class WatchSettings(BaseModel):
+    """Configure how often the sources of the `watch` command are polled for new articles.
+
+    The interval of every source adapts to how often it yields new articles:
+    it's shortened after a poll with new articles and lengthened after a poll without them.
+    """
+
+    interval: float = Field(
+        default=900.0,
+        help="The initial time in seconds between two polls of a source",
+        gt=0,
+    )
+    min_interval: float = Field(
+        default=60.0,
+        help="The minimum time in seconds between two polls of a source",
+        gt=0,
+    )
+    max_interval: float = Field(
+        default=6 * 60 * 60.0,
+        help="The maximum time in seconds between two polls of a source",
+        gt=0,
+    )
+    interval_decrease: float = Field(
+        default=0.5,
+        help="The factor of the interval after a poll with new articles",
+        gt=0,
+        le=1,
+    )
+    interval_increase: float = Field(
+        default=1.5,
+        help="The factor of the interval after a poll without new articles",
+        ge=1,
+    )
+    host_interval: float = Field(
+        default=10.0,
+        help="The minimum time in seconds between two polls of the sources of the same hostname",
+        ge=0,
+    )
+    concurrency: int = Field(
+        default=8, help="The maximum number of sources polled at the same time", ge=1
+    )
+    content_types: list[str] = Field(
+        default=[
+            "text/html",
+            "application/xhtml+xml",
+            "application/rss+xml",
+            "application/atom+xml",
+            "application/xml",
+            "text/xml",
+        ],
+        help="The content types of the sources: HTML pages, RSS and Atom feeds and sitemaps",
+    )
+    link_pattern: str | None = Field(
+        default=None,
+        help="A regular expression the article links of the HTML sources must match. By default all the links to the same hostname are taken",
+    )
+    seen_urls: int = Field(
+        default=100_000,
+        help="The number of the most recently found article URLs remembered to skip them without a database lookup",
+        ge=1,
+    )
+
+
+class ServerSettings(BaseModel):
+    """Configure the HTTP service started with the `serve` command."""
+
+    host: str = Field(default="127.0.0.1", help="The address to listen on")
+    port: int = Field(default=8080, help="The port to listen on", ge=1, le=65535)
+    max_batch_queries: int = Field(
+        default=1000,
+        help="The maximum number of queries of a single batch search request",
+        ge=1,
+    )
+    max_ingest_urls: int = Field(
+        default=10000,
+        help="The maximum number of URLs of a single ingest request",
+        ge=1,
+    )
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(toml_file="config.toml")
@@ -80,6 +560,20 @@ class Settings(BaseSettings):
 
     llm: LLMSettings = Field(default_factory=LLMSettings)
 
+    embeddings: EmbeddingSettings = Field(default_factory=EmbeddingSettings)
+
+    fetch: FetchSettings = Field(default_factory=FetchSettings)
+
+    extraction: ExtractionSettings = Field(default_factory=ExtractionSettings)
+
+    deduplication: DeduplicationSettings = Field(default_factory=DeduplicationSettings)
+
+    ingestion: IngestionSettings = Field(default_factory=IngestionSettings)
+
+    watch: WatchSettings = Field(default_factory=WatchSettings)
+
+    server: ServerSettings = Field(default_factory=ServerSettings)
+
     @classmethod
     def settings_customise_sources(
         cls,
@@ -89,7 +583,17 @@ class Settings(BaseSettings):
         dotenv_settings: PydanticBaseSettingsSource,
         file_secret_settings: PydanticBaseSettingsSource,
     ) -> Tuple[PydanticBaseSettingsSource, ...]:
-        return (TomlConfigSettingsSource(settings_cls),)
+        return (init_settings, TomlConfigSettingsSource(settings_cls))
+
+
+@cache
+def get_settings() -> Settings:
+    """Return the settings, reading the configuration file on the first call."""
+    return Settings()
 
 
-settings = Settings()
+def __getattr__(name: str):
+    # `settings` is created on the first access, so importing the module doesn't read the configuration.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,4 +1,23 @@
-from .client import Database
-from .globals import database
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-__all__ = ["Database", "database"]
+if TYPE_CHECKING:
+    from .aio import AsyncDatabase
+    from .client import Database
+    from .globals import database, get_database
+
+# The submodules import chromadb, so they are loaded on the first access to their names.
+_exports = {
+    "AsyncDatabase": ".aio",
+    "Database": ".client",
+    "database": ".globals",
+    "get_database": ".globals",
+}
+
+__all__ = ["AsyncDatabase", "Database", "database", "get_database"]
+
+
+def __getattr__(name: str):
+    if name in _exports:
+        return getattr(import_module(_exports[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
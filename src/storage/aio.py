@@ -0,0 +1,139 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any, Self
+
+from src.settings import settings
+
+from .client import Database
+from .models import Article
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+    from src.summarization.summarize import ArticleSummarization
+
+# Marks the end of the writes queue.
+_STOP = object()
+
+
+class AsyncDatabase:
+    """An awaitable facade over the synchronous Database that never blocks the event loop.
+
+    The reads run on a bounded pool of threads. The writes are put into a queue and applied
+    one by one by a single writer, so the concurrent ingestion workers never contend on the store.
+    """
+
+    database: Database
+
+    def __init__(self, database: Database | None = None):
+        if database is None:
+            from .globals import get_database
+
+            database = get_database()
+
+        self.database = database
+
+        self._readers = ThreadPoolExecutor(
+            max_workers=settings.storage.read_workers, thread_name_prefix="db-reader"
+        )
+        self._writer_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="db-writer"
+        )
+        self._writes: asyncio.Queue | None = None
+        self._writer: asyncio.Task | None = None
+
+    async def __aenter__(self) -> Self:
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        if self._writer is not None:
+            return
+
+        self._writes = asyncio.Queue(maxsize=settings.storage.write_queue_size)
+        self._writer = asyncio.create_task(self._write_loop(), name="db-writer")
+
+    async def close(self) -> None:
+        """Apply the pending writes and release the threads."""
+        if self._writer is not None:
+            await self._writes.put(_STOP)
+            await self._writer
+            self._writer = None
+
+        self._readers.shutdown(wait=True)
+        self._writer_executor.shutdown(wait=True)
+
+    async def _read(self, function: Callable, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, partial(function, *args))
+
+    async def _write(self, function: Callable, *args: Any) -> Any:
+        self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((partial(function, *args), future))
+        return await future
+
+    async def _write_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            write = await self._writes.get()
+            if write is _STOP:
+                return
+
+            function, future = write
+            # The failure of the write is returned, so it's passed to the waiting caller.
+            (result,) = await asyncio.gather(
+                loop.run_in_executor(self._writer_executor, function),
+                return_exceptions=True,
+            )
+            if future.done():
+                continue
+
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def add(
+        self, article: "Document", summarization: "ArticleSummarization"
+    ) -> str:
+        return await self._write(self.database.add, article, summarization)
+
+    async def add_many(
+        self, items: list[tuple["Document", "ArticleSummarization"]]
+    ) -> list[str]:
+        return await self._write(self.database.add_many, items)
+
+    async def warm_up(self) -> None:
+        await self._read(self.database.warm_up)
+
+    async def search(self, query: str) -> list[Article]:
+        return await self._read(self.database.search, query)
+
+    async def search_many(self, queries: list[str]) -> list[list[Article]]:
+        return await self._read(self.database.search_many, queries)
+
+    async def get_all(self) -> tuple[dict[str, str], list[Article]]:
+        return await self._read(self.database.get_all)
+
+    async def find_duplicate(self, url: str, signature: bytes) -> Article | None:
+        return await self._read(self.database.find_duplicate, url, signature)
+
+    async def get_topics(self) -> dict[str, str]:
+        return await self._read(self.database.get_topics)
+
+    async def existing_ids(self, ids: list[str]) -> set[str]:
+        return await self._read(self.database.existing_ids, ids)
+
+    async def get_content_hashes(self, ids: list[str]) -> dict[str, str]:
+        return await self._read(self.database.get_content_hashes, ids)
+
+    async def ingested_at(self, ids: list[str]) -> dict[str, float]:
+        return await self._read(self.database.ingested_at, ids)
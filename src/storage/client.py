@@ -1,14 +1,34 @@
-from typing import ClassVar
-
+import hashlib
+import os
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, ClassVar
+
+import numpy as np
 from chromadb import Collection, PersistentClient
 from chromadb.api import ClientAPI
-from langchain_core.documents import Document
+from pydantic import TypeAdapter
 
+from src.cache import DiskCache, LRUCache
+from src.metrics import metrics
 from src.scraping.models import ArticleMetadata
 from src.settings import settings
-from src.summarization.summarize import ArticleSummarization
 
+from .duplicates import DuplicateIndex
+from .embeddings import CachedEmbeddingFunction
+from .generation import WriteGeneration
+from .index import TopicIndex
 from .models import Article
+from .search import SearchHit, deduplicate, distance_fusion, reciprocal_rank_fusion
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+    from src.summarization.summarize import ArticleSummarization
+
+ArticlesList = TypeAdapter(list[Article])
 
 
 class Database:
@@ -21,11 +41,17 @@ class Database:
     }
 
     client: ClientAPI
+    embedding_function: CachedEmbeddingFunction
 
     articles: Collection
     summaries: Collection
     topics: Collection
 
+    topic_index: TopicIndex
+    duplicate_index: DuplicateIndex
+    generation: WriteGeneration
+    result_cache: DiskCache | None
+
     def __init__(self):
         self.client = PersistentClient(
             path=settings.storage.path,
@@ -33,20 +59,56 @@ class Database:
             database=settings.storage.database,
         )
 
+        # The same embedding function is shared by all the collections,
+        # so a search query is embedded only once for all of them.
+        self.embedding_function = CachedEmbeddingFunction()
+
         self.articles = self.client.get_or_create_collection(
             "articles",
             metadata=self.default_collection_metadata,
+            embedding_function=self.embedding_function,
         )
 
         self.summaries = self.client.get_or_create_collection(
             "summaries",
             metadata=self.default_collection_metadata,
+            embedding_function=self.embedding_function,
         )
 
         self.topics = self.client.get_or_create_collection(
             "topics",
             metadata=self.default_collection_metadata,
+            embedding_function=self.embedding_function,
+        )
+
+        self.topic_index = TopicIndex(
+            os.path.join(settings.storage.path, "topic-index.sqlite")
+        )
+        self.duplicate_index = DuplicateIndex(
+            os.path.join(settings.storage.path, "duplicate-index.sqlite"),
+            bands=settings.deduplication.bands,
+        )
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="search")
+
+        # The results of the repeated queries are reused until the next write to the database.
+        self.generation = WriteGeneration(
+            os.path.join(settings.storage.path, "write-generation.sqlite")
         )
+        self.result_cache = (
+            DiskCache(
+                os.path.join(settings.storage.path, "search-cache.sqlite"),
+                max_size=settings.search.result_cache_max_size,
+            )
+            if settings.search.result_cache
+            else None
+        )
+        self._results = LRUCache(settings.search.result_cache_size)
+        self._query_embeddings = LRUCache(settings.search.query_cache_size)
+
+        # The topics are kept in memory along with the write generation they were read at.
+        self._topics: dict[str, str] | None = None
+        self._topics_generation: int | None = None
+        self._topics_lock = threading.Lock()
 
     @staticmethod
     def format_topics_codes(topics: list[str]) -> dict[str, str]:
@@ -62,38 +124,219 @@ class Database:
 
         return {k: v for k, v in metadata.items() if v is not None and k not in exclude}
 
-    def add(self, article: Document, summarization: ArticleSummarization) -> str:
+    def add(self, article: "Document", summarization: "ArticleSummarization") -> str:
         """Add an article and its summarization to the database."""
-        metadata: ArticleMetadata = article.metadata
-        url: str = metadata["url"]
+        return self.add_many([(article, summarization)])[0]
+
+    @metrics.timed("database_add")
+    def add_many(
+        self, items: list[tuple["Document", "ArticleSummarization"]]
+    ) -> list[str]:
+        """Add many articles and their summarizations to the database with batched upserts.
+
+        The topics are deduplicated within the batch and only the topics that are not stored yet
+        are upserted, so the same topic is not embedded again for every article.
+        The near-duplicates reuse the embeddings of their originals and the MinHash signatures
+        of the originals are added to the duplicate index."""
+        articles: dict[str, tuple[str, dict[str, any]]] = {}
+        summaries: dict[str, tuple[str, dict[str, any]]] = {}
+        topics: dict[str, str] = {}
+        articles_topics: dict[str, list[str]] = {}
+        signatures: dict[str, bytes] = {}
+        duplicates: dict[str, str] = {}
+        ingested_at = time.time()
+
+        for article, summarization in items:
+            metadata: ArticleMetadata = article.metadata
+            url: str = metadata["url"]
+
+            article_topics = self.format_topics_codes(summarization.topics)
+            topics_ids_str: str = ", ".join(article_topics.keys())
+            topics.update(article_topics)
+            articles_topics[url] = list(article_topics)
+
+            if metadata.get("duplicate_of"):
+                duplicates[url] = metadata["duplicate_of"]
+            elif metadata.get("minhash"):
+                signatures[url] = metadata["minhash"]
+
+            document_metadata: dict[str, any] = self.metadata_filter_none(
+                metadata, exclude=["url", "minhash"]
+            )
+            document_metadata.update(
+                {
+                    "topics": topics_ids_str,
+                    "ingested_at": ingested_at,
+                    # Chroma merges the metadata on upsert, so a refreshed original is unlinked explicitly.
+                    "duplicate_of": metadata.get("duplicate_of") or "",
+                }
+            )
 
-        topics = self.format_topics_codes(summarization.topics)
-        topics_ids: list[str] = list(topics.keys())
-        topics_ids_str: str = ", ".join(topics_ids)
+            articles[url] = (article.page_content, document_metadata)
+            summaries[url] = (summarization.summary, {"topics": topics_ids_str})
 
-        document_metadata: dict[str, any] = self.metadata_filter_none(
-            metadata, exclude=["url"]
+        self._upsert(
+            self.articles,
+            articles,
+            self._original_embeddings(self.articles, duplicates),
+        )
+        self._upsert(
+            self.summaries,
+            summaries,
+            self._original_embeddings(self.summaries, duplicates),
         )
-        document_metadata.update({"topics": topics_ids_str})
 
-        self.articles.upsert(
-            ids=[url],
-            documents=[article.page_content],
-            metadatas=[document_metadata],
+        stored_topics = set(self.topics.get(ids=list(topics), include=[])["ids"])
+        self._upsert(
+            self.topics,
+            {
+                topic_id: (topic, None)
+                for topic_id, topic in topics.items()
+                if topic_id not in stored_topics
+            },
         )
 
-        self.summaries.upsert(
-            ids=[url],
-            documents=[summarization.summary],
-            metadatas=[{"topics": topics_ids_str}],
+        self.topic_index.set_many(articles_topics)
+        self.duplicate_index.remove_many(list(duplicates))
+        self.duplicate_index.set_many(signatures)
+
+        generation = self.generation.bump()
+        with self._topics_lock:
+            # The topics are updated in place, unless another process wrote in the meantime.
+            if self._topics is not None and self._topics_generation == generation - 1:
+                self._topics.update(topics)
+                self._topics_generation = generation
+            else:
+                self._topics = None
+        metrics.counter("stored_articles").inc(len(articles))
+
+        return list(articles)
+
+    def _upsert(
+        self,
+        collection: Collection,
+        records: dict[str, tuple[str, dict[str, any] | None]],
+        embeddings: dict[str, any] | None = None,
+    ) -> None:
+        """Upsert the records (ID -> document, metadata) in chunks of the configured batch size.
+
+        Only the records without a precomputed embedding are embedded."""
+        batch_size = min(settings.storage.batch_size, self.client.get_max_batch_size())
+        embeddings = embeddings or {}
+        ids = list(records)
+
+        for start in range(0, len(ids), batch_size):
+            batch_ids = ids[start : start + batch_size]
+            documents = [records[_id][0] for _id in batch_ids]
+            metadatas = [records[_id][1] for _id in batch_ids]
+
+            missing = [_id for _id in batch_ids if _id not in embeddings]
+            computed = dict(
+                zip(
+                    missing,
+                    self.embedding_function([records[_id][0] for _id in missing])
+                    if missing
+                    else [],
+                    strict=True,
+                )
+            )
+
+            collection.upsert(
+                ids=batch_ids,
+                documents=documents,
+                embeddings=[
+                    embeddings[_id] if _id in embeddings else computed[_id]
+                    for _id in batch_ids
+                ],
+                metadatas=metadatas if any(metadatas) else None,
+            )
+
+    @staticmethod
+    def _original_embeddings(
+        collection: Collection, duplicates: dict[str, str]
+    ) -> dict[str, any]:
+        """Return the stored embeddings of the originals for their near-duplicates."""
+        if not duplicates:
+            return {}
+
+        data = collection.get(
+            ids=list(set(duplicates.values())), include=["embeddings"]
         )
+        originals = dict(zip(data["ids"], data["embeddings"], strict=True))
+
+        return {
+            _id: originals[original]
+            for _id, original in duplicates.items()
+            if original in originals
+        }
 
-        self.topics.upsert(
-            ids=topics_ids,
-            documents=list(topics.values()),
+    def existing_ids(self, ids: list[str]) -> set[str]:
+        """Return the subset of the article IDs that are already stored in the database."""
+        if not ids:
+            return set()
+
+        return set(self.articles.get(ids=ids, include=[])["ids"])
+
+    def ingested_at(self, ids: list[str]) -> dict[str, float]:
+        """Return the time (UNIX timestamp) the stored articles were saved at, with batched reads.
+
+        The articles saved before the time was recorded are returned with 0."""
+        result: dict[str, float] = {}
+
+        for start in range(0, len(ids), settings.storage.page_size):
+            articles_data = self.articles.get(
+                ids=ids[start : start + settings.storage.page_size],
+                include=["metadatas"],
+            )
+            for _id, metadata in zip(
+                articles_data["ids"], articles_data["metadatas"], strict=True
+            ):
+                result[_id] = (metadata or {}).get("ingested_at", 0.0)
+
+        return result
+
+    def get_content_hashes(self, ids: list[str]) -> dict[str, str]:
+        """Return the content fingerprints of the stored articles."""
+        if not ids:
+            return {}
+
+        articles_data = self.articles.get(ids=ids, include=["metadatas"])
+
+        return {
+            _id: metadata["content_hash"]
+            for _id, metadata in zip(
+                articles_data["ids"], articles_data["metadatas"], strict=True
+            )
+            if metadata and metadata.get("content_hash")
+        }
+
+    def find_duplicate(self, url: str, signature: bytes) -> Article | None:
+        """Return the stored original of the article, if the article is its near-duplicate."""
+        match = self.duplicate_index.find(
+            signature, settings.deduplication.threshold, exclude=url
         )
+        if match is None:
+            return None
+
+        original, _ = match
+        articles = self.get_articles([original])
+        return articles[0] if articles else None
 
     def get_topics(self) -> dict[str, str]:
+        """Return the names of all the topics by their IDs.
+
+        The topics are read once and kept in memory until another process writes to the database.
+        The returned dictionary is shared, so it must not be modified."""
+        generation = self.generation.value
+
+        with self._topics_lock:
+            if self._topics is None or self._topics_generation != generation:
+                self._topics = self._read_topics()
+                self._topics_generation = generation
+
+            return self._topics
+
+    def _read_topics(self) -> dict[str, str]:
         topics_data = self.topics.get(include=["documents"])
 
         return {
@@ -103,88 +346,364 @@ class Database:
             )
         }
 
+    def get_summaries(self, ids: list[str]) -> dict[str, str]:
+        """Return the summaries of the articles with a single batched request."""
+        if not ids:
+            return {}
+
+        summaries_data = self.summaries.get(ids=ids, include=["documents"])
+
+        return dict(
+            zip(summaries_data["ids"], summaries_data["documents"], strict=True)
+        )
+
+    @staticmethod
+    def article_topics(metadata: dict[str, any], topics: dict[str, str]) -> list[str]:
+        """Return the names of the topics referenced in the article metadata."""
+        topics_ids: list[str] = (metadata or {}).get("topics", "").split(", ")
+
+        return [topics[topic_id] for topic_id in topics_ids if topic_id in topics]
+
+    def iter_articles(
+        self,
+        limit: int | None = None,
+        offset: int = 0,
+        page_size: int | None = None,
+        topics: dict[str, str] | None = None,
+    ) -> Iterator[Article]:
+        """Iterate over the stored articles page by page, keeping only one page in memory."""
+        if topics is None:
+            topics = self.get_topics()
+
+        page_size = page_size or settings.storage.page_size
+
+        while limit is None or limit > 0:
+            count = page_size if limit is None else min(page_size, limit)
+            articles_data = self.articles.get(
+                limit=count, offset=offset, include=["documents", "metadatas"]
+            )
+
+            if not articles_data["ids"]:
+                return
+
+            summaries = self.get_summaries(articles_data["ids"])
+
+            for _id, content, metadata in zip(
+                articles_data["ids"],
+                articles_data["documents"],
+                articles_data["metadatas"],
+                strict=True,
+            ):
+                if _id not in summaries:
+                    print(f"Unable to find summary for article {_id}")
+                    continue
+
+                yield Article(
+                    url=_id,
+                    content=content,
+                    summary=summaries[_id],
+                    topics=self.article_topics(metadata, topics),
+                )
+
+            fetched = len(articles_data["ids"])
+            offset += fetched
+            if limit is not None:
+                limit -= fetched
+
+            if fetched < count:
+                return
+
+    def count_articles(self) -> int:
+        return self.articles.count()
+
     def get_all(self) -> tuple[dict[str, str], list[Article]]:
         """Get all the topics and articles from the database."""
-        topics = self.topics.get(include=["documents"])
+        topics = self.get_topics()
 
-        topics = {
-            topic_id: topic_document
-            for topic_id, topic_document in zip(
-                topics["ids"], topics["documents"], strict=True
+        return topics, list(self.iter_articles(topics=topics))
+
+    def rebuild_topic_index(self) -> None:
+        """Fill the topic index from the `topics` metadata of the stored articles."""
+        offset = 0
+        while True:
+            articles_data = self.articles.get(
+                limit=settings.storage.page_size, offset=offset, include=["metadatas"]
             )
-        }
+            if not articles_data["ids"]:
+                return
+
+            self.topic_index.set_many(
+                {
+                    _id: [
+                        topic_id
+                        for topic_id in (metadata or {}).get("topics", "").split(", ")
+                        if topic_id
+                    ]
+                    for _id, metadata in zip(
+                        articles_data["ids"], articles_data["metadatas"], strict=True
+                    )
+                }
+            )
+            offset += len(articles_data["ids"])
+
+    def _query(
+        self, collection: Collection, embeddings: list[np.ndarray], threshold: float
+    ) -> list[list[SearchHit]]:
+        """Return the nearest records within the distance threshold for every query embedding.
+
+        All the queries are sent in a single request and the threshold is applied
+        to the whole matrix of the distances at once."""
+        data = collection.query(
+            query_embeddings=embeddings,
+            n_results=settings.search.results,
+            include=["distances"],
+        )
 
-        articles = self.articles.get(include=["documents", "metadatas"])
+        distances = np.asarray(data["distances"], dtype=np.float32).reshape(
+            len(embeddings), -1
+        )
+        within = distances <= threshold
 
-        summaries = self.summaries.get(include=["documents"])
+        return [
+            [
+                SearchHit(ids[column], int(column) + 1, float(distances[row, column]))
+                for column in np.flatnonzero(within[row])
+            ]
+            for row, ids in enumerate(data["ids"])
+        ]
 
-        articles_list: list[Article] = []
-        for _id, article, metadata in zip(
-            articles["ids"], articles["documents"], articles["metadatas"], strict=True
-        ):
-            topics_ids: list[str] = metadata.get("topics", "").split(", ")
+    def _query_topics(self, embeddings: list[np.ndarray]) -> list[list[SearchHit]]:
+        """Return the articles of the matched topics, ranked by the rank of their best topic."""
+        topics_hits = self._query(
+            self.topics, embeddings, settings.search.topics_distance_threshold
+        )
+        if not any(topics_hits):
+            return topics_hits
 
-            article_topics: list[str] = [
-                topics.get(topic_id) for topic_id in topics_ids if topic_id in topics
-            ]
+        if self.topic_index.is_empty() and self.articles.count():
+            print("The topic index is empty. Rebuilding it from the articles...")
+            self.rebuild_topic_index()
 
-            try:
-                summary_index: int = summaries["ids"].index(_id)
-                summary = summaries["documents"][summary_index]
-            except ValueError:
-                print(f"Unable to find summary for article {_id}")
+        # The articles of all the matched topics are read at once for all the queries.
+        topics_articles = self.topic_index.articles(
+            list({hit.id for hits in topics_hits for hit in hits}),
+            limit=settings.search.topic_articles_limit,
+        )
 
-            articles_list.append(
-                Article(
-                    url=_id, content=article, summary=summary, topics=article_topics
-                )
-            )
+        results: list[list[SearchHit]] = []
+        for query_hits in topics_hits:
+            hits: dict[str, SearchHit] = {}
+            for topic_hit in query_hits:
+                for _id in topics_articles.get(topic_hit.id, []):
+                    if _id not in hits:
+                        hits[_id] = SearchHit(_id, topic_hit.rank, topic_hit.distance)
+
+            results.append(list(hits.values()))
 
-        return topics, articles_list
+        return results
 
+    @metrics.timed("database_search")
     def search(self, query: str) -> list[Article]:
-        """Search for related articles based on vector distance. The threshold is configured in the settings."""
-        topics = self.get_topics()
+        """Search for related articles in the articles, summaries and topics collections at once.
+
+        The query is embedded once and the collections are queried in parallel.
+        The matches are merged with the configured fusion method and deduplicated by URL.
+        The thresholds and the weights are configured in the settings.
 
-        articles_data = self.articles.query(
-            query_texts=[query], include=["documents", "metadatas", "distances"]
+        The results are cached by the query and the search settings until the next write."""
+        (articles,) = self._search_cached([query])
+
+        if not articles:
+            print(
+                f"No related articles found for the query. Vector distance threshold: {settings.search.articles_distance_threshold:.2f}"
+            )
+        return articles
+
+    @metrics.timed("database_search_many")
+    def search_many(self, queries: list[str]) -> list[list[Article]]:
+        """Search for the related articles of many queries at once, in the order of the queries.
+
+        The queries are embedded in a single batch, every collection is queried with a single
+        request for all of them and the articles of all the results are read at once."""
+        return self._search_cached(queries)
+
+    def _search_cached(self, queries: list[str]) -> list[list[Article]]:
+        generation = self.generation.value
+        keys = [self._result_key(query, generation) for query in queries]
+
+        results: list[list[Article] | None] = [
+            self._cached_results(key) for key in keys
+        ]
+        missing = [index for index, articles in enumerate(results) if articles is None]
+
+        if missing:
+            for index, articles in zip(
+                missing,
+                self._search([queries[index] for index in missing]),
+                strict=True,
+            ):
+                results[index] = articles
+                self._cache_results(keys[index], articles)
+
+        return results
+
+    def _result_key(self, query: str, generation: int) -> str:
+        search_settings = settings.search.model_dump_json(
+            exclude={
+                "query_cache_size",
+                "result_cache",
+                "result_cache_size",
+                "result_cache_max_size",
+                "batch_size",
+            }
         )
+        digest = hashlib.sha256(f"{search_settings}\n{query}".encode()).hexdigest()
 
-        articles_list: list[Article] = []
-        for _id, content, metadata, distance in zip(
-            articles_data["ids"][0],
-            articles_data["documents"][0],
-            articles_data["metadatas"][0],
-            articles_data["distances"][0],
-            strict=True,
+        return f"{generation}:{digest}"
+
+    def _cached_results(self, key: str) -> list[Article] | None:
+        # The results are kept in memory even without the cache file, e.g. in a warm server.
+        articles = self._results.get(key)
+        if (
+            articles is None
+            and self.result_cache is not None
+            and (value := self.result_cache.get(key)) is not None
         ):
-            if distance > settings.search.articles_distance_threshold:
-                print(f"Warning: [{_id}] Mark as not related. Distance: {distance:.2f}")
-                continue
+            articles = ArticlesList.validate_json(value)
+            self._results.set(key, articles)
+
+        metrics.counter(
+            "search_cache", result="miss" if articles is None else "hit"
+        ).inc()
+        return articles
+
+    def _cache_results(self, key: str, articles: list[Article]) -> None:
+        self._results.set(key, articles)
+        if self.result_cache is not None:
+            self.result_cache.set(key, ArticlesList.dump_json(articles))
+
+    def warm_up(self) -> None:
+        """Load the embedding model and the topics before the first search."""
+        self.embedding_function(["warm up"])
+        self.get_topics()
+
+    def embed_queries(self, queries: list[str]) -> list[np.ndarray]:
+        """Embed the search queries in a single batch.
+
+        The recent queries are kept in memory in front of the embedding disk cache."""
+        embeddings = [self._query_embeddings.get(query) for query in queries]
+        missing = list(
+            {
+                queries[index]
+                for index, embedding in enumerate(embeddings)
+                if embedding is None
+            }
+        )
+
+        if missing:
+            computed = dict(zip(missing, self.embedding_function(missing), strict=True))
+            for query, embedding in computed.items():
+                self._query_embeddings.set(query, embedding)
 
-            topics_ids: list[str] = metadata.get("topics", "").split(", ")
-            article_topics: list[str] = [
-                topics.get(topic_id) for topic_id in topics_ids if topic_id in topics
+            embeddings = [
+                computed[query] if embedding is None else embedding
+                for query, embedding in zip(queries, embeddings, strict=True)
             ]
 
-            summaries_data = self.summaries.get(ids=[_id], include=["documents"])
+        return embeddings
 
-            if not summaries_data["documents"]:
-                print(f"[{_id}] Unable to find summary for the article")
-                continue
+    def _search(self, queries: list[str]) -> list[list[Article]]:
+        embeddings = self.embed_queries(queries)
 
-            article = Article(
-                url=_id,
-                content=content,
-                summary=summaries_data["documents"][0],
-                topics=article_topics,
+        searches = {
+            "articles": self._executor.submit(
+                self._query,
+                self.articles,
+                embeddings,
+                settings.search.articles_distance_threshold,
+            )
+        }
+        if settings.search.summaries_search:
+            searches["summaries"] = self._executor.submit(
+                self._query,
+                self.summaries,
+                embeddings,
+                settings.search.summaries_distance_threshold,
             )
+        if settings.search.topics_search:
+            searches["topics"] = self._executor.submit(self._query_topics, embeddings)
 
-            articles_list.append(article)
+        sources_hits: dict[str, list[list[SearchHit]]] = {
+            source: future.result() for source, future in searches.items()
+        }
+        weights: dict[str, float] = {
+            "articles": settings.search.articles_weight,
+            "summaries": settings.search.summaries_weight,
+            "topics": settings.search.topics_weight,
+        }
 
-        if not articles_list:
-            print(
-                f"No related articles found for the query. Vector distance threshold: {settings.search.articles_distance_threshold:.2f}"
+        queries_ids: list[list[str]] = []
+        for index in range(len(queries)):
+            rankings: dict[str, list[SearchHit]] = {
+                source: hits[index] for source, hits in sources_hits.items()
+            }
+
+            if settings.search.fusion == "rrf":
+                scores = reciprocal_rank_fusion(
+                    rankings, weights, k=settings.search.rrf_k
+                )
+            else:
+                scores = distance_fusion(rankings, weights)
+
+            ids = deduplicate(sorted(scores, key=scores.get, reverse=True))
+            queries_ids.append(ids[: settings.search.results])
+
+        articles = {
+            article.url: article
+            for article in self.get_articles(
+                list(dict.fromkeys(_id for ids in queries_ids for _id in ids))
+            )
+        }
+
+        return [
+            [articles[_id] for _id in ids if _id in articles] for ids in queries_ids
+        ]
+
+    def get_articles(
+        self, ids: list[str], topics: dict[str, str] | None = None
+    ) -> list[Article]:
+        """Return the stored articles with their summaries and topics, in the order of the IDs."""
+        if not ids:
+            return []
+        if topics is None:
+            topics = self.get_topics()
+
+        summaries = self.get_summaries(ids)
+        articles_data = self.articles.get(ids=ids, include=["documents", "metadatas"])
+        articles = {
+            _id: (content, metadata)
+            for _id, content, metadata in zip(
+                articles_data["ids"],
+                articles_data["documents"],
+                articles_data["metadatas"],
+                strict=True,
+            )
+        }
+
+        articles_list: list[Article] = []
+        for _id in ids:
+            if _id not in articles or _id not in summaries:
+                print(f"[{_id}] Unable to find the article or its summary")
+                continue
+
+            content, metadata = articles[_id]
+            articles_list.append(
+                Article(
+                    url=_id,
+                    content=content,
+                    summary=summaries[_id],
+                    topics=self.article_topics(metadata, topics),
+                )
             )
 
         return articles_list
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+from src.scraping.similarity import similarity
+
+# The number of the candidates read with a single query, below the SQLite limit of its variables.
+CANDIDATES_BATCH_SIZE: int = 500
+
+
+class DuplicateIndex:
+    """A locality-sensitive hashing index of the MinHash signatures of the stored articles.
+
+    Every signature is split into bands and every band is hashed into a bucket. The articles
+    that share a bucket with the new one are the candidates, and only their signatures are compared,
+    so a lookup doesn't depend on the number of stored articles.
+    It's stored in a SQLite file next to the Chroma database."""
+
+    path: str
+    bands: int
+
+    def __init__(self, path: str, bands: int):
+        self.path = path
+        self.bands = bands
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS signatures (
+                article_id TEXT PRIMARY KEY,
+                signature BLOB NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                article_id TEXT NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS buckets_band_bucket ON buckets (band, bucket)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS buckets_article_id ON buckets (article_id)"
+        )
+
+    def buckets(self, signature: bytes) -> list[tuple[int, int]]:
+        """Return the (band, bucket) pairs of the signature."""
+        if len(signature) % (self.bands * 4):
+            raise ValueError(
+                f"The signature of {len(signature) // 4} values can't be split into {self.bands} bands."
+            )
+
+        size = len(signature) // self.bands
+        return [
+            (
+                band,
+                int.from_bytes(
+                    hashlib.blake2b(
+                        signature[band * size : (band + 1) * size], digest_size=8
+                    ).digest(),
+                    "little",
+                    signed=True,
+                ),
+            )
+            for band in range(self.bands)
+        ]
+
+    def set_many(self, signatures: dict[str, bytes]) -> None:
+        """Replace the signatures of the articles (article ID -> signature)."""
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._delete(list(signatures))
+                self._connection.executemany(
+                    "INSERT INTO signatures (article_id, signature) VALUES (?, ?)",
+                    list(signatures.items()),
+                )
+                self._connection.executemany(
+                    "INSERT INTO buckets (band, bucket, article_id) VALUES (?, ?, ?)",
+                    [
+                        (band, bucket, article_id)
+                        for article_id, signature in signatures.items()
+                        for band, bucket in self.buckets(signature)
+                    ],
+                )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def remove_many(self, ids: list[str]) -> None:
+        """Remove the articles that are no longer the originals of their copies."""
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._delete(ids)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def _delete(self, ids: list[str]) -> None:
+        self._connection.executemany(
+            "DELETE FROM signatures WHERE article_id = ?", [(_id,) for _id in ids]
+        )
+        self._connection.executemany(
+            "DELETE FROM buckets WHERE article_id = ?", [(_id,) for _id in ids]
+        )
+
+    def find(
+        self, signature: bytes, threshold: float, exclude: str | None = None
+    ) -> tuple[str, float] | None:
+        """Return the most similar indexed article and its similarity, if it's above the threshold."""
+        with self._lock:
+            candidates: set[str] = set()
+            for band, bucket in self.buckets(signature):
+                rows = self._connection.execute(
+                    "SELECT article_id FROM buckets WHERE band = ? AND bucket = ?",
+                    (band, bucket),
+                )
+                candidates.update(article_id for (article_id,) in rows)
+
+            candidates.discard(exclude)
+            if not candidates:
+                return None
+
+            candidates_list = list(candidates)
+            rows: list[tuple[str, bytes]] = []
+            for start in range(0, len(candidates_list), CANDIDATES_BATCH_SIZE):
+                batch = candidates_list[start : start + CANDIDATES_BATCH_SIZE]
+                rows += self._connection.execute(
+                    "SELECT article_id, signature FROM signatures WHERE article_id IN "
+                    f"({', '.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+
+        best: tuple[str, float] | None = None
+        for article_id, candidate in rows:
+            if len(candidate) != len(signature):
+                continue
+
+            score = similarity(signature, candidate)
+            if score >= threshold and (best is None or score > best[1]):
+                best = (article_id, score)
+
+        return best
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,161 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils import embedding_functions
+
+from src.cache import DiskCache
+from src.settings import settings
+
+
+def create_embedding_model() -> EmbeddingFunction:
+    """Create the embedding model configured in the settings."""
+    match settings.embeddings.backend:
+        case "sentence-transformers":
+            return embedding_functions.SentenceTransformerEmbeddingFunction(
+                model_name=settings.embeddings.model
+            )
+        case "openai":
+            return OpenAIEmbeddingFunction(
+                model_name=settings.embeddings.model,
+                base_url=settings.embeddings.base_url or settings.llm.base_url,
+            )
+        case _:
+            return embedding_functions.DefaultEmbeddingFunction()
+
+
+class OpenAIEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Embed the texts with an OpenAI-compatible `/embeddings` endpoint.
+
+    Chroma's own OpenAI function only detects the 1.x versions of the `openai` client."""
+
+    model_name: str
+
+    def __init__(self, model_name: str, base_url: str | None = None):
+        from openai import OpenAI
+
+        self.model_name = model_name
+        self.client = OpenAI(
+            api_key=os.environ.get("OPENAI_API_KEY"), base_url=base_url
+        )
+
+    def __call__(self, input: Documents) -> Embeddings:
+        response = self.client.embeddings.create(
+            input=list(input), model=self.model_name
+        )
+
+        return [
+            np.asarray(item.embedding, dtype=np.float32)
+            for item in sorted(response.data, key=lambda item: item.index)
+        ]
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Compute the embeddings in large batches on a pool of workers and keep them in a disk cache.
+
+    The vectors are cached by the model and the hash of the text, so the repeated texts
+    (topics, unchanged articles, repeated search queries) are embedded only once.
+    The texts repeated within the same call are embedded once as well."""
+
+    model: EmbeddingFunction
+    model_name: str
+    batch_size: int
+
+    cache: DiskCache | None
+    embedded: int
+
+    def __init__(
+        self,
+        model: EmbeddingFunction | None = None,
+        model_name: str | None = None,
+        cache: bool | None = None,
+    ):
+        self.model = model or create_embedding_model()
+        self.model_name = (
+            model_name or f"{settings.embeddings.backend}/{settings.embeddings.model}"
+        )
+        self.batch_size = settings.embeddings.batch_size
+
+        if cache is None:
+            cache = settings.embeddings.cache
+        self.cache = (
+            DiskCache(
+                os.path.join(settings.storage.path, "embedding-cache.sqlite"),
+                max_size=settings.embeddings.cache_max_size,
+            )
+            if cache
+            else None
+        )
+        self.embedded = 0
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.embeddings.workers, thread_name_prefix="embedding"
+        )
+
+    def key(self, text: str) -> str:
+        return f"{self.model_name}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def __call__(self, input: Documents) -> Embeddings:
+        keys = [self.key(text) for text in input]
+        vectors: dict[str, np.ndarray] = {}
+
+        if self.cache is not None:
+            for key, value in self.cache.get_many(list(set(keys))).items():
+                vectors[key] = np.frombuffer(value, dtype=np.float32)
+
+        missing: dict[str, str] = {
+            key: text for key, text in zip(keys, input) if key not in vectors
+        }
+
+        if missing:
+            missing_keys = list(missing)
+            batches = [
+                missing_keys[start : start + self.batch_size]
+                for start in range(0, len(missing_keys), self.batch_size)
+            ]
+
+            for batch, embeddings in zip(
+                batches,
+                self._executor.map(
+                    lambda batch: self.model([missing[key] for key in batch]), batches
+                ),
+            ):
+                for key, embedding in zip(batch, embeddings, strict=True):
+                    vectors[key] = np.asarray(embedding, dtype=np.float32)
+
+            self.embedded += len(missing_keys)
+
+            if self.cache is not None:
+                self.cache.set_many(
+                    {key: vectors[key].tobytes() for key in missing_keys}
+                )
+
+        return [vectors[key] for key in keys]
+
+    @property
+    def hit_rate(self) -> float:
+        return self.cache.hit_rate if self.cache is not None else 0.0
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "computed": self.embedded,
+            "cached": self.cache.hits if self.cache is not None else 0,
+            "hit_rate": self.hit_rate,
+        }
+
+    def report(self) -> str:
+        """Return a short report of the embedding cache usage."""
+        if self.cache is None:
+            return f"Embeddings: {self.embedded} computed, the cache is disabled."
+
+        return (
+            f"Embeddings: {self.embedded} computed, {self.cache.hits} served from the cache "
+            f"(hit rate {self.hit_rate:.0%})."
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        if self.cache is not None:
+            self.cache.close()
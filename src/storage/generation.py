@@ -0,0 +1,56 @@
+import os
+import sqlite3
+import threading
+
+
+class WriteGeneration:
+    """A counter of the writes to the database, shared by all the processes that use it.
+
+    Every write bumps the counter, so anything computed from the stored data (search results,
+    the topics) can be kept until the counter changes. It's stored in a SQLite file next to the
+    Chroma database, so the increments of the concurrent processes are atomic."""
+
+    path: str
+
+    def __init__(self, path: str):
+        self.path = path
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS generation (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                value INTEGER NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "INSERT OR IGNORE INTO generation (id, value) VALUES (0, 0)"
+        )
+
+    @property
+    def value(self) -> int:
+        with self._lock:
+            (value,) = self._connection.execute(
+                "SELECT value FROM generation WHERE id = 0"
+            ).fetchone()
+            return value
+
+    def bump(self) -> int:
+        """Increment the counter and return its new value."""
+        with self._lock:
+            (value,) = self._connection.execute(
+                "UPDATE generation SET value = value + 1 WHERE id = 0 RETURNING value"
+            ).fetchone()
+            return value
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
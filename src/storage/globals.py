@@ -1,3 +1,16 @@
+from functools import cache
+
 from .client import Database
 
-database: Database = Database()
+
+@cache
+def get_database() -> Database:
+    """Return the database, opening the Chroma client and the collections on the first call."""
+    return Database()
+
+
+def __getattr__(name: str):
+    # `database` is created on the first access, so importing the module doesn't open the store.
+    if name == "database":
+        return get_database()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
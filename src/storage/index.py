@@ -0,0 +1,87 @@
+import os
+import sqlite3
+import threading
+
+
+class TopicIndex:
+    """An inverted index from the topic IDs to the IDs of the articles with that topic.
+
+    It's stored in a SQLite file next to the Chroma database, so a topic match can be expanded
+    to its articles without scanning the `topics` metadata of every article."""
+
+    path: str
+
+    def __init__(self, path: str):
+        self.path = path
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS topic_articles (
+                topic_id TEXT NOT NULL,
+                article_id TEXT NOT NULL,
+                PRIMARY KEY (topic_id, article_id)
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS topic_articles_article_id ON topic_articles (article_id)"
+        )
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return (
+                self._connection.execute(
+                    "SELECT 1 FROM topic_articles LIMIT 1"
+                ).fetchone()
+                is None
+            )
+
+    def set_many(self, articles: dict[str, list[str]]) -> None:
+        """Replace the topics of the articles (article ID -> topic IDs)."""
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "DELETE FROM topic_articles WHERE article_id = ?",
+                    [(article_id,) for article_id in articles],
+                )
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO topic_articles (topic_id, article_id) VALUES (?, ?)",
+                    [
+                        (topic_id, article_id)
+                        for article_id, topics_ids in articles.items()
+                        for topic_id in topics_ids
+                    ],
+                )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def articles(
+        self, topics_ids: list[str], limit: int | None = None
+    ) -> dict[str, list[str]]:
+        """Return the IDs of the most recently indexed articles of every topic."""
+        result: dict[str, list[str]] = {}
+
+        with self._lock:
+            for topic_id in topics_ids:
+                rows = self._connection.execute(
+                    "SELECT article_id FROM topic_articles WHERE topic_id = ? ORDER BY rowid DESC LIMIT ?",
+                    (topic_id, -1 if limit is None else limit),
+                )
+                result[topic_id] = [article_id for (article_id,) in rows]
+
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,63 @@
+from src.scraping.utils import normalize_url
+
+
+class SearchHit:
+    """A record matched in one of the collections, with its rank and vector distance there."""
+
+    id: str
+    rank: int
+    distance: float
+
+    def __init__(self, id: str, rank: int, distance: float):
+        self.id = id
+        self.rank = rank
+        self.distance = distance
+
+    def __repr__(self) -> str:
+        return f"SearchHit({self.id!r}, rank={self.rank}, distance={self.distance:.3f})"
+
+
+def reciprocal_rank_fusion(
+    rankings: dict[str, list[SearchHit]], weights: dict[str, float], k: int = 60
+) -> dict[str, float]:
+    """Score every URL by the sum of the weighted reciprocal ranks across the sources.
+
+    The score doesn't depend on the scale of the distances, so the sources are comparable even when
+    their embeddings are distributed differently."""
+    scores: dict[str, float] = {}
+
+    for source, hits in rankings.items():
+        for hit in hits:
+            scores[hit.id] = scores.get(hit.id, 0.0) + weights[source] / (k + hit.rank)
+
+    return scores
+
+
+def distance_fusion(
+    rankings: dict[str, list[SearchHit]], weights: dict[str, float]
+) -> dict[str, float]:
+    """Score every URL by its best weighted similarity (1 - cosine distance) across the sources."""
+    scores: dict[str, float] = {}
+
+    for source, hits in rankings.items():
+        for hit in hits:
+            score = weights[source] * (1 - hit.distance)
+            scores[hit.id] = max(scores.get(hit.id, score), score)
+
+    return scores
+
+
+def deduplicate(urls: list[str]) -> list[str]:
+    """Keep the first URL of every group of URLs that differ only in the case or the fragment."""
+    seen: set[str] = set()
+    unique: list[str] = []
+
+    for url in urls:
+        key = normalize_url(url)
+        if key in seen:
+            continue
+
+        seen.add(key)
+        unique.append(url)
+
+    return unique
@@ -1,3 +1,23 @@
-from .summarize import ArticleSummarization, summarize
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-__all__ = ["ArticleSummarization", "summarize"]
+if TYPE_CHECKING:
+    from .llm import create_llm
+    from .scheduler import SummarizationScheduler
+    from .summarize import ArticleSummarization, summarize
+
+# The submodules import langchain, so they are loaded on the first access to their names.
+_exports = {
+    "ArticleSummarization": ".summarize",
+    "SummarizationScheduler": ".scheduler",
+    "create_llm": ".llm",
+    "summarize": ".summarize",
+}
+
+__all__ = ["ArticleSummarization", "SummarizationScheduler", "create_llm", "summarize"]
+
+
+def __getattr__(name: str):
+    if name in _exports:
+        return getattr(import_module(_exports[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
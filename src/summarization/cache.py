@@ -0,0 +1,41 @@
+import os
+
+from src.cache import DiskCache
+from src.settings import settings
+
+from .summarize import PROMPT_VERSION, ArticleSummarization
+
+
+class SummaryCache:
+    """Keep the LLM summarizations keyed by the content fingerprint, the model and the prompt version.
+
+    The same text published on different URLs is summarized only once."""
+
+    model: str
+    storage: DiskCache
+
+    def __init__(self, model: str | None = None, path: str | None = None):
+        self.model = model or settings.llm.model
+        self.storage = DiskCache(
+            path or os.path.join(settings.storage.path, "summary-cache.sqlite"),
+            max_size=settings.llm.summary_cache_max_size,
+        )
+
+    def key(self, content_hash: str) -> str:
+        return f"{self.model}:{PROMPT_VERSION}:{content_hash}"
+
+    def get(self, content_hash: str) -> ArticleSummarization | None:
+        value = self.storage.get(self.key(content_hash))
+
+        if value is None:
+            return None
+
+        return ArticleSummarization.model_validate_json(value)
+
+    def set(self, content_hash: str, summarization: ArticleSummarization) -> None:
+        self.storage.set(
+            self.key(content_hash), summarization.model_dump_json().encode()
+        )
+
+    def close(self) -> None:
+        self.storage.close()
@@ -0,0 +1,128 @@
+import math
+import re
+from functools import cache
+from re import Pattern
+
+from langchain_core.documents import Document
+
+from src.settings import settings
+
+# A rough number of characters per token, used when the tokenizer is not available.
+CHARS_PER_TOKEN: int = 4
+
+# Markdown links and images: `[text](target)` is replaced with `text`.
+LINK_PATTERN: Pattern = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+URL_PATTERN: Pattern = re.compile(r"<?https?://[^\s>)]+>?")
+
+
+@cache
+def get_encoding(name: str):
+    """Load the tiktoken encoding, or return None if it can't be loaded (e.g. offline)."""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except (ImportError, OSError, ValueError) as e:
+        # Not installed, the encoding file can't be downloaded or the name is unknown.
+        print(
+            f"Unable to load the '{name}' tokenizer ({e}). The tokens are estimated by the length."
+        )
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Return the number of tokens of the text with the configured tokenizer."""
+    encoding = get_encoding(settings.llm.tokenizer)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_text(text: str, budget: int) -> str:
+    """Return the beginning of the text that fits `budget` tokens."""
+    encoding = get_encoding(settings.llm.tokenizer)
+    if encoding is None:
+        return text[: budget * CHARS_PER_TOKEN]
+
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= budget:
+        return text
+    return encoding.decode(tokens[:budget])
+
+
+def window_text(text: str, budget: int) -> list[str]:
+    """Split the text into consecutive windows of at most `budget` tokens, even within a word."""
+    encoding = get_encoding(settings.llm.tokenizer)
+    if encoding is None:
+        size = budget * CHARS_PER_TOKEN
+        return [text[start : start + size] for start in range(0, len(text), size)]
+
+    tokens = encoding.encode(text, disallowed_special=())
+    return [
+        encoding.decode(tokens[start : start + budget])
+        for start in range(0, len(tokens), budget)
+    ]
+
+
+def compact_content(document: Document) -> str:
+    """Return the content of the document without the reader comments and the link targets.
+
+    The stored document keeps its full content, only the LLM input is compacted."""
+    content = document.page_content
+    if not settings.llm.compact_input:
+        return content
+
+    comments_start: int | None = document.metadata.get("comments_start")
+    if comments_start is not None:
+        content = content[:comments_start]
+
+    content = LINK_PATTERN.sub(r"\1", content)
+    content = URL_PATTERN.sub("", content)
+
+    content = re.sub(r"[ \t]{2,}", " ", content)
+    return re.sub(r"\n{3,}", "\n\n", content).strip()
+
+
+def split_text(text: str, budget: int, max_chunks: int | None = None) -> list[str]:
+    """Split the text into chunks of at most `budget` tokens along the paragraphs.
+
+    The paragraphs longer than the budget are split along the words, and the parts that are still
+    longer (e.g. the text without spaces) into windows of tokens. Only the first `max_chunks` chunks are returned, so a huge page has a bounded cost."""
+    chunks: list[str] = []
+    chunk: list[str] = []
+    chunk_tokens = 0
+
+    def flush() -> None:
+        nonlocal chunk, chunk_tokens
+        if chunk:
+            chunks.append("\n\n".join(chunk))
+        chunk, chunk_tokens = [], 0
+
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+
+        tokens = count_tokens(paragraph)
+        if tokens > budget:
+            flush()
+            words = paragraph.split()
+            parts = math.ceil(tokens / budget)
+            size = math.ceil(len(words) / parts)
+            for start in range(0, len(words), size):
+                part = " ".join(words[start : start + size])
+                if count_tokens(part) > budget:
+                    chunks.extend(window_text(part, budget))
+                else:
+                    chunks.append(part)
+            continue
+
+        if chunk_tokens + tokens > budget:
+            flush()
+        chunk.append(paragraph)
+        chunk_tokens += tokens
+
+    flush()
+
+    return chunks[:max_chunks] if max_chunks else chunks
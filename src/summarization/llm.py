@@ -0,0 +1,13 @@
+from langchain_openai import ChatOpenAI
+
+from src.settings import settings
+
+
+def create_llm() -> ChatOpenAI:
+    """Create the chat model configured in the settings."""
+    return ChatOpenAI(
+        base_url=settings.llm.base_url,
+        model=settings.llm.model,
+        # The retries are handled by the summarization scheduler with respect to the rate limits.
+        max_retries=0,
+    )
@@ -0,0 +1,384 @@
+import asyncio
+import random
+import time
+
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.prompt_values import PromptValue
+from openai import APIConnectionError, APIStatusError
+
+from src.metrics import Reservoir, metrics, percentile
+from src.settings import settings
+
+from .cache import SummaryCache
+from .compaction import compact_content, count_tokens, split_text, truncate_text
+from .summarize import (
+    ArticleSummarization,
+    format_parts,
+    format_prompt,
+    format_reduce_prompt,
+    parse_response,
+)
+
+# The expected size of the JSON response, used to reserve the tokens budget before the request.
+RESPONSE_TOKENS_ESTIMATE: int = 256
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether the LLM request failed because of the server load and can be repeated later."""
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+
+    return isinstance(error, (APIConnectionError, TimeoutError, ConnectionError))
+
+
+def retry_after(error: Exception) -> float | None:
+    """Return the delay requested by the server with the Retry-After header, if any."""
+    if not isinstance(error, APIStatusError):
+        return None
+
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """A token bucket that refills a budget of requests or tokens every minute.
+
+    The bucket can go into debt when the actual usage exceeds the estimation made before the request.
+    """
+
+    capacity: float
+    available: float
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+
+        self._rate = per_minute / 60
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(
+            self.capacity, self.available + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until the budget allows to spend the given amount."""
+        amount = min(amount, self.capacity)
+
+        # The lock keeps the waiting requests in order, so the large ones are not starved.
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+
+                await asyncio.sleep((amount - self.available) / self._rate)
+
+    def adjust(self, amount: float) -> None:
+        """Account for the difference between the estimated and the actual usage."""
+        self._refill()
+        self.available -= amount
+
+
+class AdaptiveConcurrency:
+    """Limit the number of in-flight requests, adapting the limit to the observed latency.
+
+    The limit grows additively while the latency stays close to the best observed one,
+    shrinks multiplicatively when the latency degrades and halves when the server asks to back off.
+    """
+
+    minimum: int
+    maximum: int
+    limit: float
+    in_flight: int
+
+    tolerance: float
+    adaptive: bool
+    baseline: float | None
+
+    def __init__(
+        self,
+        minimum: int,
+        maximum: int,
+        tolerance: float = 2.0,
+        adaptive: bool = True,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(maximum if not adaptive else max(minimum, maximum // 4))
+        self.in_flight = 0
+
+        self.tolerance = tolerance
+        self.adaptive = adaptive
+        self.baseline = None
+
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(
+        self, latency: float | None = None, backoff: bool = False
+    ) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+
+            if self.adaptive:
+                self._update(latency, backoff)
+
+            self._condition.notify_all()
+
+    def _update(self, latency: float | None, backoff: bool) -> None:
+        if backoff:
+            self.limit = max(self.minimum, self.limit / 2)
+            return
+
+        if latency is None:
+            return
+
+        # The baseline slowly drifts towards the recent latencies, so it follows the changes of the server.
+        if self.baseline is None:
+            self.baseline = latency
+        else:
+            self.baseline = min(latency, self.baseline * 0.95 + latency * 0.05)
+
+        if latency <= self.baseline * self.tolerance:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        else:
+            self.limit = max(self.minimum, self.limit * 0.9)
+
+
+class SummarizationScheduler:
+    """Run many summarization requests concurrently within the limits of the LLM server.
+
+    The requests are throttled by the requests and tokens per minute budgets,
+    the number of in-flight requests adapts to the latency of the server,
+    and the requests rejected due to the server load (429, 5xx) are retried with exponential backoff.
+    The documents with already summarized content are served from the summary cache.
+
+    The LLM input is compacted (no reader comments and link targets) and limited by the tokens budget.
+    The longer articles are summarized in parts concurrently and the summaries of the parts
+    are combined with another request (map-reduce).
+    """
+
+    model: BaseChatModel
+    cache: SummaryCache | None
+
+    requests_limiter: RateLimiter | None
+    tokens_limiter: RateLimiter | None
+    concurrency: AdaptiveConcurrency
+
+    latencies: Reservoir
+    input_tokens: int
+    output_tokens: int
+    retries: int
+    failed: int
+    cached: int
+
+    def __init__(self, model: BaseChatModel, cache: bool | None = None):
+        self.model = model
+
+        if cache is None:
+            cache = settings.llm.summary_cache
+        self.cache = SummaryCache() if cache else None
+
+        self.requests_limiter = (
+            RateLimiter(settings.llm.requests_per_minute)
+            if settings.llm.requests_per_minute
+            else None
+        )
+        self.tokens_limiter = (
+            RateLimiter(settings.llm.tokens_per_minute)
+            if settings.llm.tokens_per_minute
+            else None
+        )
+        self.concurrency = AdaptiveConcurrency(
+            minimum=settings.llm.min_concurrency,
+            maximum=settings.llm.max_concurrency,
+            tolerance=settings.llm.latency_tolerance,
+            adaptive=settings.llm.adaptive_concurrency,
+        )
+
+        self.latencies = Reservoir()
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.retries = 0
+        self.failed = 0
+        self.cached = 0
+
+    def close(self) -> None:
+        if self.cache is not None:
+            self.cache.close()
+
+    @metrics.timed("summarize")
+    async def summarize(self, document: Document) -> ArticleSummarization:
+        """Summarize the document, waiting for the rate limits and retrying on the server overload."""
+        url: str = document.metadata.get("url", "")
+        content_hash: str | None = document.metadata.get("content_hash")
+
+        if self.cache is not None and content_hash:
+            summarization = await asyncio.to_thread(self.cache.get, content_hash)
+
+            if summarization is not None:
+                print(f"[{url}] Reusing the cached summarization of the same content.")
+                self.cached += 1
+                metrics.counter("summaries_cached").inc()
+                return summarization
+
+        summarization = await self._summarize(document)
+
+        if self.cache is not None and content_hash:
+            await asyncio.to_thread(self.cache.set, content_hash, summarization)
+
+        return summarization
+
+    async def _summarize(self, document: Document) -> ArticleSummarization:
+        url: str = document.metadata.get("url", "")
+        budget = settings.llm.input_token_budget
+
+        content = compact_content(document) or document.page_content
+        chunks = await asyncio.to_thread(
+            split_text, content, budget, settings.llm.max_chunks
+        )
+        if len(chunks) <= 1:
+            # The only chunk is the content itself, or its beginning if `llm.max_chunks` is 1.
+            text = chunks[0] if chunks else content
+            return await self._request(url, format_prompt(text), text)
+
+        print(
+            f"[{url}] The content is over the budget of {budget} tokens. Summarizing it in {len(chunks)} parts..."
+        )
+        metrics.counter("llm_map_reduce").inc()
+
+        parts: list[ArticleSummarization] = await asyncio.gather(
+            *(self._request(url, format_prompt(chunk), chunk) for chunk in chunks)
+        )
+
+        # The summaries of the parts are combined in groups until they fit a single request.
+        while True:
+            combined = format_parts(parts)
+            groups = await asyncio.to_thread(split_text, combined, budget)
+
+            if 1 < len(groups) < len(parts):
+                parts = await asyncio.gather(
+                    *(
+                        self._request(url, format_reduce_prompt(group), group)
+                        for group in groups
+                    )
+                )
+                continue
+
+            # The budget is a hard limit, so the summaries that can't be grouped any further are cut.
+            if len(groups) > 1:
+                print(
+                    f"[{url}] The summaries of the parts are over the budget of {budget} tokens. Cutting them."
+                )
+                metrics.counter("llm_truncated").inc()
+
+            combined = await asyncio.to_thread(truncate_text, combined, budget)
+            return await self._request(url, format_reduce_prompt(combined), combined)
+
+    async def _request(
+        self, url: str, request: PromptValue, content: str
+    ) -> ArticleSummarization:
+        estimate = count_tokens(content) + RESPONSE_TOKENS_ESTIMATE
+
+        attempt = 0
+        while True:
+            if self.requests_limiter is not None:
+                await self.requests_limiter.acquire()
+            if self.tokens_limiter is not None:
+                await self.tokens_limiter.acquire(estimate)
+
+            await self.concurrency.acquire()
+            start = time.monotonic()
+
+            try:
+                response = await self.model.ainvoke(request)
+            except Exception as e:
+                retryable = is_retryable(e)
+                await self.concurrency.release(backoff=retryable)
+
+                if not retryable or attempt >= settings.llm.max_retries:
+                    self.failed += 1
+                    metrics.counter("llm_requests", result="failed").inc()
+                    raise
+
+                # The delay requested by the server is capped, so it can't stall the worker.
+                delay = retry_after(e)
+                delay = (
+                    min(max(delay, 0.0), settings.llm.retry_backoff_max)
+                    if delay is not None
+                    else self._backoff(attempt)
+                )
+                print(f"[{url}] LLM request failed ({e}). Retrying in {delay:.1f}s...")
+
+                attempt += 1
+                self.retries += 1
+                metrics.counter("llm_requests", result="retried").inc()
+                await asyncio.sleep(delay)
+                continue
+
+            latency = time.monotonic() - start
+            await self.concurrency.release(latency)
+
+            usage = response.usage_metadata or {}
+            input_tokens: int = usage.get("input_tokens", 0)
+            output_tokens: int = usage.get("output_tokens", 0)
+
+            self.latencies.append(latency)
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+            metrics.timer("llm_request").observe(latency)
+            metrics.counter("llm_requests", result="succeeded").inc()
+            metrics.counter("llm_tokens", type="input").inc(input_tokens)
+            metrics.counter("llm_tokens", type="output").inc(output_tokens)
+
+            if self.tokens_limiter is not None and usage:
+                self.tokens_limiter.adjust(input_tokens + output_tokens - estimate)
+
+            print(
+                f"[{url}] Summarized in {latency:.2f}s "
+                f"({input_tokens} input / {output_tokens} output tokens, concurrency {int(self.concurrency.limit)})."
+            )
+
+            return parse_response(response)
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        # Exponential backoff with full jitter.
+        delay = min(
+            settings.llm.retry_backoff_max, settings.llm.retry_backoff * 2**attempt
+        )
+        return random.uniform(0, delay)
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "succeeded": len(self.latencies),
+            "failed": self.failed,
+            "retried": self.retries,
+            "cached": self.cached,
+            "latency_p50": percentile(self.latencies, 50),
+            "latency_p99": percentile(self.latencies, 99),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+    def report(self) -> str:
+        """Return a short report of the latency and the token usage of all the requests."""
+        return (
+            f"LLM requests: {len(self.latencies)} succeeded, {self.failed} failed, {self.retries} retried, "
+            f"{self.cached} served from the cache. "
+            f"Latency p50 {percentile(self.latencies, 50):.2f}s, p99 {percentile(self.latencies, 99):.2f}s. "
+            f"Tokens: {self.input_tokens} input, {self.output_tokens} output."
+        )
@@ -1,6 +1,8 @@
 from langchain_core.documents import Document
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
 from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.prompt_values import PromptValue
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 
@@ -14,6 +16,9 @@ class ArticleSummarization(BaseModel):
     )
 
 
+# Bump the version whenever the prompt changes, so the cached summarizations are not reused.
+PROMPT_VERSION: str = "2"
+
 ArticleSummarySchema: str = PydanticOutputParser(
     pydantic_object=ArticleSummarization
 ).get_output_jsonschema()
@@ -66,13 +71,71 @@ prompt = ChatPromptTemplate.from_messages(
 )
 
 
-async def summarize(document: Document, model: BaseChatModel) -> ArticleSummarization:
-    response = await model.ainvoke(
-        prompt.invoke(
-            {"content": document.page_content, "schema": ArticleSummarySchema}
-        )
+reduce_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """
+                You are tasked with combining the summaries of consecutive parts of a long news article
+                into a single summary of the whole article and identifying its main topics.
+
+                Please follow these steps:
+                1. Carefully read the summaries and the topics of all the parts.
+                2. Create a concise summary of the whole article that captures its main points and key information.
+                3. Identify main topics discussed in the article, merging the similar topics of the parts.
+
+                Important considerations:
+                - Ensure your summary is objective and factual, avoiding any personal opinions or biases.
+                - Do not include any information in the summary or topics that is not present in the parts.
+
+                Please provide your output in the following JSON schema:
+                <schema>
+                {schema}
+                </schema>
+
+                Do not include anything else except the JSON object.
+            """,
+        ),
+        (
+            "user",
+            """
+                The summaries of the article parts to combine:
+                <content>
+                {content}
+                </content>
+            """,
+        ),
+    ]
+)
+
+
+def format_prompt(content: str | Document) -> PromptValue:
+    """Build the summarization prompt for the content of the article (or a part of it)."""
+    if isinstance(content, Document):
+        content = content.page_content
+
+    return prompt.invoke({"content": content, "schema": ArticleSummarySchema})
+
+
+def format_parts(parts: list[ArticleSummarization]) -> str:
+    """Return the summaries and the topics of the article parts as the input of the reduce prompt."""
+    return "\n\n".join(
+        f"Part {number}: {part.summary}\nTopics: {', '.join(part.topics)}"
+        for number, part in enumerate(parts, start=1)
     )
 
-    summary = ArticleSummarization.model_validate_json(response.content)
 
-    return summary
+def format_reduce_prompt(content: str) -> PromptValue:
+    """Build the prompt that combines the summaries of the article parts."""
+    return reduce_prompt.invoke({"content": content, "schema": ArticleSummarySchema})
+
+
+def parse_response(response: BaseMessage) -> ArticleSummarization:
+    """Validate the LLM response against the summarization schema."""
+    return ArticleSummarization.model_validate_json(response.content)
+
+
+async def summarize(document: Document, model: BaseChatModel) -> ArticleSummarization:
+    response = await model.ainvoke(format_prompt(document))
+
+    return parse_response(response)
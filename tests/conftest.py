@@ -0,0 +1,19 @@
+import sys
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Run every test in its own directory, so the relative data paths of the settings stay out of the repo."""
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+
+    # The database of the test is opened once and cached, so the next test opens its own.
+    if "src.storage.globals" in sys.modules:
+        from chromadb.api.shared_system_client import SharedSystemClient
+
+        from src.storage.globals import get_database
+
+        get_database.cache_clear()
+        SharedSystemClient.clear_system_cache()
@@ -0,0 +1,33 @@
+import asyncio
+
+from src.ingestion.batch import BatchWriter
+
+
+def test_batch_writer_groups_items_by_size_and_interval():
+    batches: list[list[int]] = []
+
+    async def write(items: list[int]) -> None:
+        batches.append(items)
+
+    async def run() -> None:
+        # The last incomplete batch is written once the interval has passed.
+        writer = BatchWriter(write, size=3, interval=0.05)
+        await asyncio.gather(*(writer.add(item) for item in range(7)))
+        await writer.close()
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_batch_writer_reports_the_failure_to_every_item():
+    async def write(items: list[int]) -> None:
+        raise OSError("Disk is full")
+
+    async def run() -> list:
+        writer = BatchWriter(write, size=2, interval=60)
+        return await asyncio.gather(
+            writer.add(1), writer.add(2), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert [type(result) for result in results] == [OSError, OSError]
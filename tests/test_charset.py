@@ -0,0 +1,35 @@
+import codecs
+
+from src.scraping.utils import decode_html, detect_charset
+
+TEXT = "Café, naïve, Straße"
+
+
+def test_bom_takes_precedence_over_the_declared_charset():
+    body = codecs.BOM_UTF8 + TEXT.encode("utf-8")
+
+    assert detect_charset(body, "iso-8859-1") == "utf-8-sig"
+    assert decode_html(body, "iso-8859-1") == TEXT
+
+
+def test_declared_charset_is_used_before_the_meta_tag():
+    body = f'<meta charset="utf-8"><p>{TEXT}</p>'.encode("iso-8859-1")
+
+    assert detect_charset(body, "ISO-8859-1") == "iso8859-1"
+    assert TEXT in decode_html(body, "ISO-8859-1")
+
+
+def test_meta_tag_is_used_without_the_declared_charset():
+    body = (
+        '<meta http-equiv="Content-Type" content="text/html; charset=windows-1251">'
+        "<p>Новости</p>"
+    ).encode("cp1251")
+
+    assert detect_charset(body) == "cp1251"
+    assert "Новости" in decode_html(body)
+
+
+def test_unknown_charset_falls_back_to_utf8_and_windows_1252():
+    assert detect_charset(b"<p>text</p>", "x-unknown") is None
+    assert decode_html(TEXT.encode("utf-8"), "x-unknown") == TEXT
+    assert decode_html(TEXT.encode("cp1252")) == TEXT
@@ -0,0 +1,38 @@
+import sqlite3
+
+from src.cache.disk import DiskCache
+
+
+def test_get_many_updates_the_access_times_in_one_transaction(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"))
+    cache.set_many({f"key-{i}": b"value" for i in range(1200)})
+
+    statements: list[str] = []
+    cache._connection.set_trace_callback(statements.append)
+    found = cache.get_many([f"key-{i}" for i in range(0, 1400, 2)])
+
+    assert found == {f"key-{i}": b"value" for i in range(0, 1200, 2)}
+    assert (cache.hits, cache.misses) == (600, 100)
+    assert statements.count("BEGIN") == statements.count("COMMIT") == 1
+    # The UPDATE of every hit runs inside the transaction.
+    updates = [i for i, sql in enumerate(statements) if sql.startswith("UPDATE")]
+    assert len(updates) == 600
+    assert (
+        statements.index("BEGIN")
+        < updates[0]
+        < updates[-1]
+        < statements.index("COMMIT")
+    )
+
+
+def test_get_many_drops_the_expired_entries(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), ttl=60)
+    cache.set_many({"old": b"1234", "new": b"5678"})
+    cache._connection.execute("UPDATE entries SET created_at = 0 WHERE key = 'old'")
+
+    assert cache.get_many(["old", "new"]) == {"new": b"5678"}
+    assert cache.get("old") is None
+    assert cache.size == 4
+    assert sqlite3.connect(cache.path).execute(
+        "SELECT key FROM entries"
+    ).fetchall() == [("new",)]
@@ -0,0 +1,81 @@
+import sqlite3
+
+import pytest
+from pydantic import ValidationError
+
+from src.scraping import similarity as similarity_module
+from src.scraping.similarity import minhash, similarity
+from src.settings import DeduplicationSettings
+from src.storage.duplicates import DuplicateIndex
+
+ARTICLE = " ".join(
+    f"The council approved the budget for the district number {number} on Monday."
+    for number in range(40)
+)
+COPY = "Republished with the permission of the original site. " + ARTICLE
+OTHER = " ".join(
+    f"The team won the championship game number {number} after a long season."
+    for number in range(40)
+)
+
+
+def test_minhash_estimates_the_similarity_of_the_texts():
+    article, copy, other = (
+        minhash(text, 128, 5, 50) for text in (ARTICLE, COPY, OTHER)
+    )
+
+    assert similarity(article, copy) > 0.9
+    assert similarity(article, other) < 0.2
+    assert minhash("Too short to compare.", 128, 5, 50) is None
+
+
+def test_minhash_of_the_blocks_of_shingles_is_the_same(monkeypatch):
+    signature = minhash(ARTICLE, 128, 5, 50)
+
+    monkeypatch.setattr(similarity_module, "SHINGLES_BLOCK_SIZE", 7)
+    assert minhash(ARTICLE, 128, 5, 50) == signature
+
+
+def test_index_finds_the_copy_by_its_bands(workdir):
+    index = DuplicateIndex(str(workdir / "duplicates.sqlite"), bands=16)
+    index.set_many(
+        {
+            "https://example.com/article": minhash(ARTICLE, 128, 5, 50),
+            "https://example.com/other": minhash(OTHER, 128, 5, 50),
+        }
+    )
+
+    found = index.find(minhash(COPY, 128, 5, 50), 0.8)
+    assert found is not None
+    assert found[0] == "https://example.com/article"
+
+    # The article itself isn't its own duplicate.
+    assert (
+        index.find(
+            minhash(ARTICLE, 128, 5, 50), 0.8, exclude="https://example.com/article"
+        )
+        is None
+    )
+    index.close()
+
+
+def test_index_reads_more_candidates_than_the_sqlite_variables_limit(workdir):
+    index = DuplicateIndex(str(workdir / "duplicates.sqlite"), bands=16)
+    # The default limit of the SQLite builds before 3.32.
+    index._connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+    signature = minhash(ARTICLE, 128, 5, 50)
+    index.set_many(
+        {f"https://example.com/{number}": signature for number in range(1200)}
+    )
+
+    found = index.find(signature, 0.8, exclude="https://example.com/0")
+    assert found is not None
+    assert found[1] == 1.0
+    index.close()
+
+
+def test_bands_must_divide_the_permutations():
+    with pytest.raises(ValidationError, match="must divide"):
+        DeduplicationSettings(permutations=128, bands=10)
+
+    assert DeduplicationSettings(permutations=120, bands=10).bands == 10
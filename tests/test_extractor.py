@@ -0,0 +1,27 @@
+from src.scraping.extractor import parse_html
+
+BODY = "<p>" + " ".join(["A sentence of the body of the article."] * 20) + "</p>"
+
+
+def page(body: str, commenters: list[str]) -> str:
+    comments = "".join(
+        f'<div class="comment"><p>{name} said something long about the article.</p></div>'
+        for name in commenters
+    )
+    return (
+        f"<html><body><article><h1>Title</h1>{body}</article>"
+        f'<div id="comments" class="comments">{comments}</div></body></html>'
+    )
+
+
+def test_content_hash_ignores_the_comments():
+    content, metadata = parse_html("https://example.com/a", page(BODY, ["Alice"]))
+    _, commented = parse_html("https://example.com/a", page(BODY, ["Alice", "Bob"]))
+    _, edited = parse_html(
+        "https://example.com/a", page(BODY.replace("body", "text"), ["Alice"])
+    )
+
+    assert "Alice said" in content[metadata["comments_start"] :]
+    assert "Alice" not in content[: metadata["comments_start"]]
+    assert commented["content_hash"] == metadata["content_hash"]
+    assert edited["content_hash"] != metadata["content_hash"]
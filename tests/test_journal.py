@@ -0,0 +1,82 @@
+import asyncio
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from src.ingestion.journal import Journal
+from src.ingestion.reader import UrlsReader
+
+URLS = [f"https://example.com/articles/{number}" for number in range(200)]
+
+
+def read(reader: UrlsReader, journal: Journal, limit: int | None = None) -> list[str]:
+    """Read the URLs of the job, stopping after `limit` URLs as if the job was interrupted."""
+
+    async def run() -> list[str]:
+        urls: list[str] = []
+        async for chunk in reader.chunks(10):
+            urls += chunk
+            if limit is not None and len(urls) >= limit:
+                break
+        await journal.close()
+        return urls
+
+    return asyncio.run(run())
+
+
+def test_resumed_job_reads_the_rest_of_its_input(workdir: Path):
+    path = workdir / "urls.txt"
+    path.write_text("\n".join(URLS))
+
+    journal = Journal.create()
+    with path.open() as lines:
+        read(UrlsReader(lines, str(path), journal=journal), journal, limit=80)
+
+    resumed = Journal.open(journal.job)
+    assert resumed.input is not None
+    assert resumed.input.lines == 80
+    assert not resumed.input.complete
+    assert resumed.pending() == URLS[:80]
+
+    with path.open() as lines:
+        reader = UrlsReader(
+            lines, str(path), offset=resumed.input.lines, journal=resumed
+        )
+        rest = read(reader, resumed)
+
+    assert rest == URLS[80:]
+    assert Journal.open(journal.job).input.complete
+
+
+def test_resumed_job_skips_the_urls_it_already_queued(workdir: Path):
+    journal = Journal.create()
+    read(UrlsReader(URLS[:50], journal=journal), journal, limit=20)
+
+    # The rest of the input repeats the URLs queued before the interruption.
+    resumed = Journal.open(journal.job)
+    reader = UrlsReader(URLS[:50], offset=10, journal=resumed)
+    assert read(reader, resumed) == URLS[20:50]
+
+
+def test_journal_ignores_a_cut_last_line(workdir: Path):
+    journal = Journal.create()
+    journal.queue(URLS[:3])
+    asyncio.run(journal.close())
+
+    with open(journal.path, "ab") as file:
+        file.write(b'{"url": "https://example.com/cut", "sta')
+
+    assert Journal.open(journal.job).pending() == URLS[:3]
+
+
+def test_resume_is_refused_when_the_input_cant_be_read_again(workdir: Path):
+    from main import app
+
+    journal = Journal.create()
+    read(UrlsReader(URLS, journal=journal), journal, limit=10)
+
+    # The URLs were given as a list, so the rest of them is lost with the interrupted process.
+    result = CliRunner().invoke(app, ["extract", "--resume", journal.job])
+    assert result.exit_code == 1
+    assert "Aborted" in result.output
+    assert not Journal.open(journal.job).input.complete
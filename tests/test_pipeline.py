@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from src.ingestion.pipeline import Pipeline, Stage
+from src.scraping.errors import ExtractionError
+
+
+async def double(item: int) -> int:
+    return item * 2
+
+
+async def check(item: int) -> int:
+    if item == 4:
+        raise ExtractionError(str(item), "Broken page")
+    if item == 6:
+        raise ValueError("Invalid response")
+    return item
+
+
+def test_pipeline_reports_item_failures_and_keeps_going():
+    failures = []
+    results = []
+
+    async def collect(item: int) -> int:
+        results.append(item)
+        return item
+
+    async def run() -> Pipeline:
+        pipeline = Pipeline(
+            [
+                Stage("double", double, 2),
+                Stage("check", check, 2),
+                Stage("collect", collect),
+            ],
+            queue_size=2,
+            errors=(ValueError,),
+            on_error=lambda stage, item, error: failures.append((stage.name, item)),
+        )
+        async with pipeline:
+            for item in range(10):
+                await pipeline.put(item)
+        return pipeline
+
+    pipeline = asyncio.run(run())
+
+    assert sorted(results) == [0, 2, 8, 10, 12, 14, 16, 18]
+    assert sorted(failures) == [("check", 4), ("check", 6)]
+    assert pipeline.processed == 8
+    assert pipeline.failed == 2
+
+
+def test_pipeline_stops_on_unexpected_error():
+    async def broken(item: int) -> int:
+        if item == 3:
+            raise KeyError(item)
+        return item
+
+    async def run() -> None:
+        pipeline = Pipeline([Stage("broken", broken, 2)], queue_size=1)
+        async with pipeline:
+            # The producer isn't left waiting for room in the input of the stopped pipeline.
+            for item in range(100):
+                await pipeline.put(item)
+
+    with pytest.raises(KeyError):
+        asyncio.run(asyncio.wait_for(run(), 5))
@@ -0,0 +1,58 @@
+import pytest
+
+from src.settings import settings
+from src.storage.client import Database
+from src.storage.models import Article
+
+
+def open_database(monkeypatch) -> tuple[Database, list[list[str]]]:
+    """Open the database with a search that records its queries instead of querying Chroma."""
+    database = Database()
+    calls: list[list[str]] = []
+
+    def search(queries: list[str]) -> list[list[Article]]:
+        calls.append(queries)
+        return [
+            [
+                Article(
+                    url=f"https://example.com/{query}",
+                    content="",
+                    summary="",
+                    topics=[],
+                )
+            ]
+            for query in queries
+        ]
+
+    monkeypatch.setattr(database, "_search", search)
+    return database, calls
+
+
+@pytest.mark.parametrize("result_cache", [True, False])
+def test_results_are_reused_until_the_next_write(monkeypatch, result_cache):
+    monkeypatch.setattr(settings.search, "result_cache", result_cache)
+    monkeypatch.setattr(settings.search, "result_cache_size", 16)
+    database, calls = open_database(monkeypatch)
+
+    first = database.search_many(["a", "b"])
+    assert database.search_many(["b", "a"]) == first[::-1]
+    assert calls == [["a", "b"]]
+
+    database.generation.bump()
+    assert database.search("a") == first[0]
+    assert calls == [["a", "b"], ["a"]]
+
+
+def test_disk_cache_is_shared_between_the_processes(monkeypatch):
+    monkeypatch.setattr(settings.search, "result_cache", True)
+    monkeypatch.setattr(settings.search, "result_cache_size", 0)
+    database, calls = open_database(monkeypatch)
+    other, other_calls = open_database(monkeypatch)
+
+    assert other.search("a") == database.search("a")
+    assert calls == [] and other_calls == [["a"]]
+
+    # A write of any process invalidates the results cached by the others.
+    other.generation.bump()
+    database.search("a")
+    assert calls == [["a"]]
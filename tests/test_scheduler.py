@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import httpx
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from openai import RateLimitError
+from pydantic import Field
+
+from src.settings import settings
+from src.summarization import scheduler as scheduler_module
+from src.summarization.compaction import count_tokens, split_text
+from src.summarization.scheduler import SummarizationScheduler
+
+
+class FakeModel(BaseChatModel):
+    """Answer every request with the same summary, after raising the queued errors."""
+
+    summary: str
+    errors: list[Exception] = Field(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.errors:
+            raise self.errors.pop(0)
+
+        content = json.dumps({"summary": self.summary, "topics": ["Politics"]})
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=content))]
+        )
+
+
+def summarize(model: FakeModel, document: Document) -> list[str]:
+    """Summarize the document and return the content of every request."""
+    scheduler = SummarizationScheduler(model, cache=False)
+    contents: list[str] = []
+    request = scheduler._request
+
+    async def record(url, prompt, content):
+        contents.append(content)
+        return await request(url, prompt, content)
+
+    scheduler._request = record
+    asyncio.run(scheduler.summarize(document))
+    return contents
+
+
+def test_every_request_fits_the_token_budget(monkeypatch):
+    monkeypatch.setattr(settings.llm, "input_token_budget", 256)
+    monkeypatch.setattr(settings.llm, "max_chunks", 16)
+
+    paragraph = "The council discussed the budget of the city. " * 10
+    document = Document("\n\n".join([paragraph] * 40), metadata={"url": "https://a"})
+    # Every summary of a part takes most of the budget, so they can't be grouped together.
+    model = FakeModel(summary="The council discussed the budget. " * 25)
+
+    contents = summarize(model, document)
+
+    assert len(contents) == 17
+    assert all(count_tokens(content) <= 256 for content in contents)
+
+
+def test_paragraph_without_spaces_is_split_into_windows(monkeypatch):
+    monkeypatch.setattr(settings.llm, "input_token_budget", 256)
+    # About 6000 tokens of text without whitespace, like Chinese or Japanese.
+    paragraph = "市议会讨论了城市的预算。" * 2000
+
+    chunks = split_text(paragraph, 256)
+    assert len(chunks) > 1
+    assert "".join(chunks) == paragraph
+    assert all(count_tokens(chunk) <= 256 for chunk in chunks)
+
+    document = Document(paragraph, metadata={"url": "https://a"})
+    model = FakeModel(summary="The council discussed the budget.")
+
+    monkeypatch.setattr(settings.llm, "max_chunks", 16)
+    contents = summarize(model, document)
+    assert len(contents) == 17
+    assert all(count_tokens(content) <= 256 for content in contents)
+
+    monkeypatch.setattr(settings.llm, "max_chunks", 1)
+    assert summarize(model, document) == [chunks[0]]
+
+
+def test_retry_after_of_the_server_is_capped(monkeypatch):
+    monkeypatch.setattr(settings.llm, "retry_backoff_max", 5.0)
+    delays: list[float] = []
+
+    async def sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr(scheduler_module.asyncio, "sleep", sleep)
+
+    response = httpx.Response(
+        429,
+        headers={"retry-after": "3600"},
+        request=httpx.Request("POST", "https://llm.example.com"),
+    )
+    model = FakeModel(
+        summary="A summary.",
+        errors=[RateLimitError("Too many requests", response=response, body=None)],
+    )
+
+    summarize(model, Document("A short article.", metadata={"url": "https://a"}))
+    assert delays == [5.0]
@@ -0,0 +1,54 @@
+import pytest
+
+from src.storage.search import (
+    SearchHit,
+    deduplicate,
+    distance_fusion,
+    reciprocal_rank_fusion,
+)
+
+
+def test_reciprocal_rank_fusion_sums_weighted_ranks():
+    rankings = {
+        "topics": [SearchHit("a", 1, 0.1), SearchHit("b", 2, 0.2)],
+        "summaries": [SearchHit("b", 1, 0.3), SearchHit("c", 2, 0.4)],
+    }
+    scores = reciprocal_rank_fusion(rankings, {"topics": 1.0, "summaries": 2.0}, k=60)
+
+    assert scores["a"] == pytest.approx(1 / 61)
+    assert scores["b"] == pytest.approx(1 / 62 + 2 / 61)
+    assert scores["c"] == pytest.approx(2 / 62)
+    assert sorted(scores, key=scores.get, reverse=True) == ["b", "c", "a"]
+
+
+def test_reciprocal_rank_fusion_ignores_the_distance_scale():
+    close = {"topics": [SearchHit("a", 1, 0.01)], "articles": [SearchHit("b", 1, 0.01)]}
+    far = {"topics": [SearchHit("a", 1, 0.9)], "articles": [SearchHit("b", 1, 0.9)]}
+    weights = {"topics": 1.0, "articles": 1.0}
+
+    assert reciprocal_rank_fusion(close, weights) == reciprocal_rank_fusion(
+        far, weights
+    )
+
+
+def test_distance_fusion_keeps_the_best_similarity():
+    rankings = {
+        "topics": [SearchHit("a", 1, 0.5)],
+        "articles": [SearchHit("a", 1, 0.2), SearchHit("b", 2, 0.4)],
+    }
+    scores = distance_fusion(rankings, {"topics": 1.0, "articles": 0.5})
+
+    assert scores["a"] == pytest.approx(0.5)
+    assert scores["b"] == pytest.approx(0.3)
+
+
+def test_deduplicate_keeps_the_first_url_of_a_group():
+    urls = [
+        "https://example.com/a#comments",
+        "https://EXAMPLE.com/a",
+        "https://example.com/b",
+    ]
+    assert deduplicate(urls) == [
+        "https://example.com/a#comments",
+        "https://example.com/b",
+    ]
@@ -0,0 +1,82 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+
+from src.server.app import SearchService, read_duration
+
+
+@pytest.mark.parametrize(
+    ("value", "seconds"),
+    [(None, None), ("", None), (0, 0.0), (90, 90.0), (1.5, 1.5), ("12h", 43200.0)],
+)
+def test_read_duration(value, seconds):
+    assert read_duration({"refresh_older_than": value}, "refresh_older_than") == seconds
+
+
+@pytest.mark.parametrize("value", [True, -1, ["7d"], {"days": 7}, "7 days"])
+def test_read_duration_rejects_invalid_values(value):
+    with pytest.raises(web.HTTPBadRequest):
+        read_duration({"refresh_older_than": value}, "refresh_older_than")
+
+
+class FakeDatabase:
+    def __init__(self, stored: dict[str, float]):
+        self.stored = stored
+        self.lookups: list[list[str]] = []
+
+    async def ingested_at(self, ids: list[str]) -> dict[str, float]:
+        self.lookups.append(ids)
+        return {id: self.stored[id] for id in ids if id in self.stored}
+
+
+class FakePipeline:
+    def __init__(self, error: BaseException | None = None):
+        self.pipeline = SimpleNamespace(error=error)
+        self.urls: list[str] = []
+
+    async def put(self, url: str) -> None:
+        if self.pipeline.error is not None:
+            raise self.pipeline.error
+        self.urls.append(url)
+
+
+def ingest(service: SearchService, urls: list[str]) -> dict:
+    async def run() -> dict:
+        result = await service.ingest(urls)
+        await asyncio.gather(*service._puts, return_exceptions=True)
+        return result
+
+    return asyncio.run(run())
+
+
+def test_ingest_looks_the_stored_urls_up_in_the_service_database():
+    database = FakeDatabase({"https://example.com/a": 1.0})
+    service = SearchService(database)
+    service.ingestion = FakePipeline()
+
+    result = ingest(service, ["example.com/a", "example.com/b"])
+
+    assert (result["queued"], result["stored"]) == (1, 1)
+    assert database.lookups == [["https://example.com/a", "https://example.com/b"]]
+    assert service.ingestion.urls == ["https://example.com/b"]
+
+
+def test_ingest_is_refused_once_the_pipeline_stopped(capsys):
+    service = SearchService(FakeDatabase({}))
+    service.ingestion = FakePipeline()
+
+    # The pipeline stops while the URLs of a request are being put.
+    async def put(url: str) -> None:
+        service.ingestion.pipeline.error = KeyError("bug")
+        raise service.ingestion.pipeline.error
+
+    service.ingestion.put = put
+    ingest(service, ["example.com/a"])
+    assert "Unable to queue the URLs for the ingestion: KeyError('bug')" in (
+        capsys.readouterr().out
+    )
+
+    with pytest.raises(web.HTTPServiceUnavailable):
+        ingest(service, ["example.com/b"])
@@ -0,0 +1,115 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.ingestion.sharding import ChildProcess, ShardedIngestion, shard_of
+from src.settings import settings
+
+
+class FakeSender:
+    def __init__(self):
+        self.messages = []
+
+    def send(self, message):
+        self.messages.append(message)
+
+    def close(self):
+        pass
+
+
+def fake_child(shard: int | None) -> ChildProcess:
+    return ChildProcess(
+        shard, SimpleNamespace(exitcode=-9), FakeSender(), receiver=None
+    )
+
+
+def start(monkeypatch, processes: int = 2) -> ShardedIngestion:
+    """Set up the coordinator with fake child processes instead of spawning them."""
+    ingestion = ShardedIngestion(processes)
+    monkeypatch.setattr(ingestion, "_spawn_worker", fake_child)
+    monkeypatch.setattr(ingestion, "_spawn_writer", lambda: fake_child(None))
+
+    ingestion.writer = ingestion._spawn_writer()
+    ingestion.workers = [ingestion._spawn_worker(shard) for shard in range(processes)]
+    return ingestion
+
+
+def test_shard_of_is_stable_and_keeps_a_host_together():
+    assert shard_of("https://example.com/a", 8) == shard_of("http://example.com/b", 8)
+    assert {shard_of(f"https://host-{i}.com/", 4) for i in range(100)} == {0, 1, 2, 3}
+    # The shards must not change between the processes and the runs (no `hash()` salt).
+    shards = [shard_of(f"https://host-{i}.com/", 4) for i in range(8)]
+    assert shards == [0, 0, 1, 0, 1, 1, 3, 3]
+
+
+def test_crashed_worker_is_restarted_with_its_unfinished_urls(monkeypatch):
+    ingestion = start(monkeypatch)
+    crashed = ingestion.workers[1]
+    ingestion._pending[1] = {
+        "https://a.com/1": (None, None),
+        "https://a.com/2": ("hash", "summarization"),
+    }
+    ingestion._input_closed = True
+
+    ingestion._worker_exited(crashed)
+
+    replacement = ingestion.workers[1]
+    assert replacement is not crashed
+    assert ingestion.restarts == 1
+    assert replacement.sender.messages == [
+        (
+            "urls",
+            [
+                ("https://a.com/1", None, None),
+                ("https://a.com/2", "hash", "summarization"),
+            ],
+        ),
+        None,
+    ]
+
+
+def test_worker_crashing_too_often_fails_its_urls(monkeypatch):
+    monkeypatch.setattr(settings.ingestion, "max_restarts", 0)
+    ingestion = start(monkeypatch)
+    ingestion._pending[0] = {"https://a.com/1": (None, None)}
+
+    ingestion._worker_exited(ingestion.workers[0])
+
+    assert ingestion._broken == {0}
+    assert ingestion.states == {"failed": 1}
+    assert ingestion._finished[0].is_set()
+
+
+def test_reads_of_a_worker_are_served_by_the_restarted_writer(monkeypatch):
+    ingestion = start(monkeypatch)
+    worker = ingestion.workers[0]
+
+    ingestion._handle(worker, ("read", 7, "existing_ids", (["https://a.com/1"],)))
+    assert ingestion.writer.sender.messages == [
+        ("read", 0, "existing_ids", (["https://a.com/1"],))
+    ]
+
+    ingestion._writer_exited(ingestion.writer)
+    assert ingestion.writer.sender.messages == [
+        ("read", 0, "existing_ids", (["https://a.com/1"],))
+    ]
+
+    ingestion._handle(ingestion.writer, ("result", 0, {"https://a.com/1"}, None))
+    assert worker.sender.messages == [("result", 7, {"https://a.com/1"}, None)]
+    assert not ingestion._reads
+
+
+def test_coordinator_reads_through_the_writer(monkeypatch):
+    ingestion = start(monkeypatch)
+
+    async def lookup() -> dict[str, float]:
+        read = asyncio.create_task(ingestion.database.ingested_at(["https://a.com/1"]))
+        await asyncio.sleep(0)
+
+        ((_, read_id, method, _),) = ingestion.writer.sender.messages
+        assert method == "ingested_at"
+        ingestion._handle(
+            ingestion.writer, ("result", read_id, {"https://a.com/1": 1.0}, None)
+        )
+        return await read
+
+    assert asyncio.run(lookup()) == {"https://a.com/1": 1.0}
@@ -0,0 +1,84 @@
+import pytest
+
+from src.scraping.utils import UrlValidator, canonicalize_url
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://example.com/news/article",
+        "http://example.com/news/article",
+        "example.com/news/article",
+        "  https://EXAMPLE.com:443/news/article/  ",
+        "https://example.com/news/article#comments",
+        "https://example.com/news/article?utm_source=feed&utm_medium=rss",
+        "https://example.com/news/article?fbclid=abc",
+    ],
+)
+def test_variants_of_a_url_have_the_same_canonical_form(url: str):
+    assert canonicalize_url(url) == "https://example.com/news/article"
+
+
+def test_query_parameters_are_sorted_and_kept():
+    assert (
+        canonicalize_url("https://example.com/search?q=news&page=2&utm_campaign=x")
+        == "https://example.com/search?page=2&q=news"
+    )
+
+
+def test_custom_port_keeps_the_scheme():
+    assert canonicalize_url("http://example.com:8080/a/") == "http://example.com:8080/a"
+    assert (
+        canonicalize_url("http://example.com/a", https_upgrade=False)
+        == "http://example.com/a"
+    )
+
+
+def test_different_pages_stay_different():
+    assert canonicalize_url("https://example.com/a?id=1") != canonicalize_url(
+        "https://example.com/a?id=2"
+    )
+    assert canonicalize_url("https://example.com/a") != canonicalize_url(
+        "https://www.example.com/a"
+    )
+
+
+def test_validator_skips_invalid_urls_and_duplicates_across_chunks():
+    validator = UrlValidator()
+
+    first = validator.validate(
+        ["example.com/a", "not a url", "", "https://example.com/a/"]
+    )
+    second = validator.validate(["http://EXAMPLE.com/a#top", "example.com/b"])
+
+    assert first == ["https://example.com/a"]
+    assert second == ["https://example.com/b"]
+    assert (validator.valid, validator.invalid, validator.duplicates) == (2, 1, 2)
+
+
+def test_bounded_validator_forgets_the_least_recently_seen_urls():
+    validator = UrlValidator(max_seen=2)
+
+    assert validator.validate(["example.com/a", "example.com/b"]) == [
+        "https://example.com/a",
+        "https://example.com/b",
+    ]
+    # Seeing `a` again keeps it, so `b` is the one forgotten for `c`.
+    assert validator.validate(["example.com/a", "example.com/c"]) == [
+        "https://example.com/c"
+    ]
+    assert validator.validate(["example.com/a", "example.com/b"]) == [
+        "https://example.com/b"
+    ]
+    assert len(validator._recent) == 2
+
+
+def test_validator_counts_the_invalid_ports_as_invalid_urls():
+    validator = UrlValidator()
+
+    valid = validator.validate(
+        ["example.com:99999/a", "example.com:abc/b", "example.com:8080/c"]
+    )
+
+    assert valid == ["https://example.com:8080/c"]
+    assert (validator.valid, validator.invalid) == (1, 2)
@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.ingestion.watch import Watcher
+from src.scraping.errors import ExtractionError
+
+FEED = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>News</title>
+<item><link>https://example.com/news/1</link></item>
+<item><link>https://example.com/news/2</link></item>
+</channel></rss>"""
+
+
+class FakeFetcher:
+    def __init__(self, error: Exception | None = None, html: str = ""):
+        self.error = error
+        self.html = html
+        self.calls = 0
+
+    async def fetch_url(self, url: str, content_types: list[str]):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(not_modified=False, html=self.html)
+
+
+class FakeDatabase:
+    def __init__(self, stored: set[str]):
+        self.stored = stored
+
+    async def ingested_at(self, ids: list[str]) -> dict[str, float]:
+        return {id: 1.0 for id in ids if id in self.stored}
+
+
+class FakeIngestion:
+    def __init__(
+        self,
+        error: Exception | None = None,
+        html: str = "",
+        stored: frozenset[str] = frozenset(),
+    ):
+        self.fetcher = FakeFetcher(error, html)
+        self.database = FakeDatabase(set(stored))
+        self.journal = None
+        self.urls: list[str] = []
+
+    async def put(self, url: str) -> None:
+        self.urls.append(url)
+
+
+async def watch(watcher: Watcher, seconds: float) -> None:
+    try:
+        await asyncio.wait_for(watcher.run(), seconds)
+    except TimeoutError:
+        pass
+
+
+def test_failed_poll_is_rescheduled():
+    ingestion = FakeIngestion(ExtractionError("https://example.com/", "Timeout"))
+    watcher = Watcher(ingestion)
+    watcher.add("https://example.com/")
+
+    asyncio.run(watch(watcher, 0.2))
+
+    source = watcher.sources["https://example.com/"]
+    assert ingestion.fetcher.calls == 1
+    assert (watcher.failed, source.failures, source.polls) == (1, 1, 1)
+    assert source.next_poll > 0
+
+
+def test_unexpected_error_stops_the_watcher():
+    ingestion = FakeIngestion(KeyError("bug"))
+    watcher = Watcher(ingestion)
+    watcher.add("https://example.com/")
+
+    with pytest.raises(KeyError):
+        asyncio.run(watch(watcher, 5))
+    assert watcher.failed == 0
+
+
+def test_poll_skips_the_urls_stored_in_the_database_of_the_ingestion():
+    ingestion = FakeIngestion(html=FEED, stored={"https://example.com/news/1"})
+    watcher = Watcher(ingestion)
+    watcher.add("https://example.com/feed.xml")
+
+    articles = asyncio.run(
+        watcher.poll(watcher.sources["https://example.com/feed.xml"])
+    )
+
+    assert articles == 1
+    assert ingestion.urls == ["https://example.com/news/2"]